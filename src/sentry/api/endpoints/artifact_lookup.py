@@ -87,7 +87,7 @@ class ProjectArtifactLookupEndpoint(ProjectEndpoint):
         file = file.file
 
         try:
-            fp = file.getfile()
+            fp = file.getfile(stream=True)
             response = StreamingHttpResponse(
                 iter(lambda: fp.read(4096), b""), content_type="application/octet-stream"
             )
@@ -74,7 +74,7 @@ class ReleaseFileDetailsMixin:
     @staticmethod
     def download(releasefile):
         file = releasefile.file
-        fp = file.getfile()
+        fp = file.getfile(stream=True)
         response = FileResponse(
             fp,
             content_type=file.headers.get("content-type", "application/octet-stream"),
@@ -91,7 +91,7 @@ class ReleaseFileDetailsMixin:
 
         # Do not use ReleaseFileCache here, we view download as a singular event
         archive_file = ReleaseFile.objects.get(release_id=release.id, ident=archive_ident)
-        archive_file_fp = archive_file.file.getfile()
+        archive_file_fp = archive_file.file.getfile(stream=True)
         fp = ZipFile(archive_file_fp).open(entry["filename"])
         headers = entry.get("headers", {})
 
@@ -194,6 +194,11 @@ class GroupSerializerBase(Serializer, ABC):
         # Note that organization is necessary here for use in `_get_permalink` to avoid
         # making unnecessary queries.
         prefetch_related_objects(item_list, "project__organization")
+        features.prefetch(
+            ["projects:issue-priority"],
+            projects=list({item.project for item in item_list}),
+            call_site="group_serializer.priority",
+        )
 
         if user.is_authenticated and item_list:
             bookmarks = set(
@@ -350,7 +355,12 @@ class GroupSerializerBase(Serializer, ABC):
             "issueCategory": obj.issue_category.name.lower(),
         }
 
-        if features.has("projects:issue-priority", obj.project, actor=None):
+        if features.has(
+            "projects:issue-priority",
+            obj.project,
+            actor=None,
+            call_site="group_serializer.priority",
+        ):
             priority_label = PriorityLevel(obj.priority).to_str() if obj.priority else None
             group_dict["priority"] = priority_label
             group_dict["priorityLockedAt"] = obj.priority_locked_at
@@ -1,4 +1,6 @@
+import io
 import zlib
+from collections.abc import Iterator
 
 import sentry_sdk
 import zstandard
@@ -10,6 +12,9 @@ ATTACHMENT_META_KEY = "{key}:a"
 ATTACHMENT_UNCHUNKED_DATA_KEY = "{key}:a:{id}"
 ATTACHMENT_DATA_CHUNK_KEY = "{key}:a:{id}:{chunk_index}"
 
+# Number of chunks fetched from the cache in a single round trip when streaming.
+ATTACHMENT_CHUNK_BATCH_SIZE = 8
+
 UNINITIALIZED_DATA = object()
 
 
@@ -66,6 +71,26 @@ class CachedAttachment:
         assert self._data is not UNINITIALIZED_DATA
         return self._data
 
+    def iter_chunks(self) -> Iterator[bytes]:
+        """
+        Yields the attachment's data in chunks without loading all of it into
+        memory. Raises ``MissingAttachmentChunks`` once a missing chunk is
+        reached.
+        """
+        if self._data is UNINITIALIZED_DATA and self._cache is not None:
+            yield from self._cache.get_chunks(self)
+            return
+
+        data = self.data
+        if data:
+            yield data
+
+    def open(self) -> "CachedAttachmentReader":
+        """
+        Returns a read-only file object streaming the attachment's data.
+        """
+        return CachedAttachmentReader(self)
+
     def delete(self):
         for key in self.chunk_keys:
             self._cache.inner.delete(key)
@@ -157,20 +182,26 @@ class BaseAttachmentCache:
             attachment.setdefault("key", key)
             yield CachedAttachment(cache=self, **attachment)
 
-    def get_data(self, attachment) -> bytes:
-        data = bytearray()
-
-        for key in attachment.chunk_keys:
-            raw_data = self.inner.get(key, raw=True)
-            if raw_data is None:
-                raise MissingAttachmentChunks()
-            if raw_data.startswith(b"\x28\xb5\x2f\xfd"):
-                decompressed = zstandard.decompress(raw_data)
-            else:
-                decompressed = zlib.decompress(raw_data)
-            data.extend(decompressed)
+    def get_chunks(self, attachment) -> Iterator[bytes]:
+        """
+        Yields the decompressed chunks of the attachment. Chunks are fetched
+        from the cache in batches of ``ATTACHMENT_CHUNK_BATCH_SIZE`` and
+        decompressed as they are consumed.
+        """
+        keys = list(attachment.chunk_keys)
+
+        for start in range(0, len(keys), ATTACHMENT_CHUNK_BATCH_SIZE):
+            batch = self.inner.get_many(keys[start : start + ATTACHMENT_CHUNK_BATCH_SIZE], raw=True)
+            for raw_data in batch:
+                if raw_data is None:
+                    raise MissingAttachmentChunks()
+                if raw_data.startswith(b"\x28\xb5\x2f\xfd"):
+                    yield zstandard.decompress(raw_data)
+                else:
+                    yield zlib.decompress(raw_data)
 
-        return bytes(data)
+    def get_data(self, attachment) -> bytes:
+        return b"".join(self.get_chunks(attachment))
 
     @sentry_sdk.tracing.trace
     def delete(self, key):
@@ -180,5 +211,63 @@ class BaseAttachmentCache:
         self.inner.delete(ATTACHMENT_META_KEY.format(key=key))
 
 
+class CachedAttachmentReader(io.RawIOBase):
+    """
+    Read-only file object over the data of a ``CachedAttachment``, streaming
+    its chunks from the cache. Seeking is only supported back to the start,
+    which fetches the chunks again.
+    """
+
+    def __init__(self, attachment: CachedAttachment) -> None:
+        self.attachment = attachment
+        self.name = attachment.name
+        self._rewind()
+
+    def _rewind(self) -> None:
+        self._chunks = self.attachment.iter_chunks()
+        self._buffer = memoryview(b"")
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        while not self._buffer:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return 0
+            self._buffer = memoryview(chunk)
+
+        size = min(len(b), len(self._buffer))
+        b[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        self._position += size
+        return size
+
+    def read(self, size: int | None = -1) -> bytes:
+        # Unlike raw streams, do not return short reads at chunk boundaries.
+        if size is None or size < 0:
+            return self.readall()
+
+        result = bytearray()
+        while len(result) < size:
+            data = super().read(size - len(result))
+            if not data:
+                break
+            result += data
+        return bytes(result)
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR and offset == 0:
+            return self._position
+        if whence != io.SEEK_SET or offset != 0:
+            raise io.UnsupportedOperation("can only seek to the start")
+        self._rewind()
+        return 0
+
+
 def compress_chunk(chunk_data: bytes) -> bytes:
     return zstandard.compress(chunk_data)
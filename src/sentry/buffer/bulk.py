@@ -0,0 +1,187 @@
+"""
+Helpers for flushing many buffered rows at once.
+
+`RedisBuffer` hands every buffered hash of a flush batch to this module as a
+`BufferedRow`. Rows for the same database row are merged in memory and rows that
+are filtered by primary key only are written with a single
+``UPDATE ... FROM (VALUES ...)`` statement per model. Everything else goes through
+the regular `Buffer.process` path.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Any
+
+from django.db import connections, router
+from django.db.models.signals import post_save
+
+from sentry.db import models
+
+
+@dataclass
+class BufferedRow:
+    model: type[models.Model]
+    filters: dict[str, str | datetime | date | int | float]
+    columns: dict[str, int] = field(default_factory=dict)
+    extra: dict[str, Any] = field(default_factory=dict)
+    signal_only: bool | None = None
+
+    @property
+    def pk(self) -> Any | None:
+        """
+        The primary key of the row if it is filtered by primary key only.
+        """
+        if len(self.filters) != 1:
+            return None
+        ((name, value),) = self.filters.items()
+        if name in ("pk", self.model._meta.pk.name):
+            return value
+        return None
+
+    def merge(self, other: BufferedRow) -> None:
+        """
+        Folds a later write for the same row into this one. Counters add up, extra
+        values are last write wins. The result is only signal-only if both rows are,
+        otherwise the counters of either row would be dropped.
+        """
+        for column, amount in other.columns.items():
+            self.columns[column] = self.columns.get(column, 0) + amount
+        self.extra.update(other.extra)
+        self.signal_only = self.signal_only and other.signal_only
+
+
+def merge_rows(rows: Iterable[BufferedRow]) -> list[BufferedRow]:
+    """
+    Merges all rows that address the same database row, preserving the order in
+    which rows were first seen.
+    """
+    merged: dict[tuple[Any, ...], BufferedRow] = {}
+    for row in rows:
+        pk = row.pk
+        if pk is not None:
+            merge_key: tuple[Any, ...] = (row.model, "pk", pk)
+        else:
+            merge_key = (row.model, *sorted(row.filters.items()))
+
+        if merge_key in merged:
+            merged[merge_key].merge(row)
+        else:
+            merged[merge_key] = row
+    return list(merged.values())
+
+
+def can_bulk_update(row: BufferedRow) -> bool:
+    """
+    Rows can only be bulk updated if they address a single existing row by primary key.
+    Signal-only rows and rows that both increment and set the same column keep using
+    `Buffer.process`.
+    """
+    return (
+        row.pk is not None
+        and not row.signal_only
+        and bool(row.columns or row.extra)
+        and not (row.columns.keys() & row.extra.keys())
+    )
+
+
+def bulk_update(model: type[models.Model], rows: Sequence[BufferedRow]) -> list[BufferedRow]:
+    """
+    Applies all `rows` of `model` with a single ``UPDATE ... FROM (VALUES ...)``
+    statement. Returns the rows that did not match any row in the database.
+    """
+    from sentry.models.group import Group
+
+    opts = model._meta
+    using = router.db_for_write(model)
+    connection = connections[using]
+    qn = connection.ops.quote_name
+
+    incr_columns = sorted({c for row in rows for c in row.columns})
+    extra_columns = sorted({c for row in rows for c in row.extra})
+    fields = (
+        [opts.pk]
+        + [opts.get_field(c) for c in incr_columns]
+        + [opts.get_field(c) for c in extra_columns]
+    )
+    # Use positional aliases for the VALUES list so that column names never have
+    # to be quoted twice.
+    aliases = [f"c{i}" for i in range(len(fields))]
+    alias_for = dict(zip(incr_columns + extra_columns, aliases[1:]))
+    # Rows in one statement may set different extra columns. A flag per extra
+    # column tells whether the row sets it, so that an explicit `None` still
+    # writes NULL like `Buffer.process` does.
+    set_aliases = [f"s{i}" for i in range(len(extra_columns))]
+    set_alias_for = dict(zip(extra_columns, set_aliases))
+
+    row_sql = "({})".format(
+        ", ".join(
+            [f"%s::{f.cast_db_type(connection)}" for f in fields]
+            + ["%s::boolean"] * len(set_aliases)
+        )
+    )
+    params: list[Any] = []
+    for row in rows:
+        params.append(opts.pk.get_db_prep_save(row.pk, connection))
+        for column in incr_columns:
+            params.append(row.columns.get(column))
+        for column in extra_columns:
+            value = row.extra.get(column)
+            params.append(
+                None
+                if value is None
+                else opts.get_field(column).get_db_prep_save(value, connection)
+            )
+        for column in extra_columns:
+            params.append(column in row.extra)
+
+    assignments = []
+    for column in incr_columns:
+        col = qn(opts.get_field(column).column)
+        assignments.append(f"{col} = t.{col} + COALESCE(v.{alias_for[column]}, 0)")
+    for column in extra_columns:
+        col = qn(opts.get_field(column).column)
+        assignments.append(
+            f"{col} = CASE WHEN v.{set_alias_for[column]} "
+            f"THEN v.{alias_for[column]} ELSE t.{col} END"
+        )
+
+    # HACK: mirrors the `ScoreClause` special case in `Buffer.process`.
+    if model is Group and "times_seen" in alias_for and "last_seen" in alias_for:
+        times_seen = alias_for["times_seen"]
+        last_seen = alias_for["last_seen"]
+        assignments.append(
+            f"{qn('score')} = CASE WHEN v.{times_seen} IS NOT NULL AND v.{last_seen} IS NOT NULL "
+            f"THEN log(t.{qn('times_seen')} + v.{times_seen}) * 600 "
+            f"+ floor(extract(epoch from v.{last_seen})) "
+            f"ELSE t.{qn('score')} END"
+        )
+
+    pk_column = qn(opts.pk.column)
+    sql = (
+        f"UPDATE {qn(opts.db_table)} AS t SET {', '.join(assignments)} "
+        f"FROM (VALUES {', '.join([row_sql] * len(rows))}) "
+        f"AS v({', '.join(aliases + set_aliases)}) "
+        f"WHERE t.{pk_column} = v.{aliases[0]} "
+        f"RETURNING t.{pk_column}"
+    )
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        updated = {result[0] for result in cursor.fetchall()}
+
+    if model is Group and updated:
+        # `Buffer.process` uses `Group.update` for groups, which pushes the new state
+        # into the model cache through `post_save`. Do the same for the whole batch.
+        update_fields = incr_columns + extra_columns
+        for instance in model.objects.using(using).filter(pk__in=updated):
+            post_save.send(
+                sender=model,
+                instance=instance,
+                created=False,
+                update_fields=update_fields,
+            )
+
+    return [row for row in rows if opts.pk.to_python(row.pk) not in updated]
@@ -7,10 +7,13 @@ from datetime import date, datetime, timezone
 from time import time
 from typing import Any
 
+from django.db import OperationalError, router, transaction
 from django.utils.encoding import force_bytes, force_str
 
 from sentry.buffer.base import Buffer
+from sentry.buffer.bulk import BufferedRow, bulk_update, can_bulk_update, merge_rows
 from sentry.db import models
+from sentry.signals import buffer_incr_complete
 from sentry.tasks.process_buffer import process_incr, process_pending
 from sentry.utils import json, metrics
 from sentry.utils.compat import crc32
@@ -77,15 +80,31 @@ class PendingBuffer:
 
 
 class RedisBuffer(Buffer):
+    """
+    Buffers counters in Redis hashes which are periodically flushed to the database.
+
+    With ``batch_flush`` enabled, each `process_incr` task reads its whole batch of
+    hashes in one pipelined pass, merges writes for the same row and applies them with
+    one bulk ``UPDATE`` per model. This is meant to be combined with a large
+    ``incr_batch_size``.
+    """
+
     key_expire = 60 * 60  # 1 hour
     pending_key = "b:p"
 
-    def __init__(self, pending_partitions: int = 1, incr_batch_size: int = 2, **options: object):
+    def __init__(
+        self,
+        pending_partitions: int = 1,
+        incr_batch_size: int = 2,
+        batch_flush: bool = False,
+        **options: object,
+    ):
         self.is_redis_cluster, self.cluster, options = get_dynamic_cluster_from_options(
             "SENTRY_BUFFER_OPTIONS", options
         )
         self.pending_partitions = pending_partitions
         self.incr_batch_size = incr_batch_size
+        self.batch_flush = batch_flush
         assert self.pending_partitions > 0
         assert self.incr_batch_size > 0
 
@@ -296,7 +315,12 @@ class RedisBuffer(Buffer):
         try:
             keycount = 0
             if is_instance_redis_cluster(self.cluster, self.is_redis_cluster):
-                keys = self.cluster.zrange(pending_key, 0, -1)
+                if self.batch_flush:
+                    keys_with_scores = self.cluster.zrange(pending_key, 0, -1, withscores=True)
+                    self._record_flush_lag(partition, [s for _, s in keys_with_scores])
+                    keys = [k for k, _ in keys_with_scores]
+                else:
+                    keys = self.cluster.zrange(pending_key, 0, -1)
                 keycount += len(keys)
 
                 for key in keys:
@@ -307,7 +331,14 @@ class RedisBuffer(Buffer):
                 self.cluster.zrem(pending_key, *keys)
             elif is_instance_rb_cluster(self.cluster, self.is_redis_cluster):
                 with self.cluster.all() as conn:
-                    results = conn.zrange(pending_key, 0, -1)
+                    results = conn.zrange(pending_key, 0, -1, withscores=self.batch_flush)
+
+                if self.batch_flush:
+                    scores = []
+                    for host_id, keys_with_scores in results.value.items():
+                        scores.extend(s for _, s in keys_with_scores)
+                        results.value[host_id] = [k for k, _ in keys_with_scores]
+                    self._record_flush_lag(partition, scores)
 
                 with self.cluster.all() as conn:
                     for host_id, keysb in results.value.items():
@@ -332,6 +363,19 @@ class RedisBuffer(Buffer):
         finally:
             client.delete(lock_key)
 
+    def _record_flush_lag(self, partition: int | None, scores: list[float]) -> None:
+        """
+        Records how long the oldest key of a pending buffer has been waiting for a flush.
+        """
+        if not scores:
+            return
+        metrics.distribution(
+            "buffer.flush-lag",
+            time() - min(scores),
+            tags={"partition": "none" if partition is None else str(partition)},
+            unit="second",
+        )
+
     def process(self, key: str | None = None, batch_keys: list[str] | None = None) -> None:  # type: ignore[override]
         assert not (key is None and batch_keys is None)
         assert not (key is not None and batch_keys is not None)
@@ -340,6 +384,9 @@ class RedisBuffer(Buffer):
             batch_keys = [key]
 
         if batch_keys is not None:
+            if self.batch_flush:
+                self._process_batch(batch_keys)
+                return
             for key in batch_keys:
                 self._process_single_incr(key)
 
@@ -388,29 +435,165 @@ class RedisBuffer(Buffer):
                 logger.debug("buffer.revoked.empty", extra={"redis_key": key})
                 return
 
-            model = import_string(force_str(values.pop("m")))
-
-            if values["f"].startswith(b"{" if not self.is_redis_cluster else "{"):
-                filters = self._load_values(json.loads(force_str(values.pop("f"))))
-            else:
-                # TODO(dcramer): legacy pickle support - remove in Sentry 9.1
-                filters = pickle.loads(force_bytes(values.pop("f")))
-
-            incr_values = {}
-            extra_values = {}
-            signal_only = None
-            for k, v in values.items():
-                if k.startswith("i+"):
-                    incr_values[k[2:]] = int(v)
-                elif k.startswith("e+"):
-                    if v.startswith(b"[" if not self.is_redis_cluster else "["):
-                        extra_values[k[2:]] = self._load_value(json.loads(force_str(v)))
-                    else:
-                        # TODO(dcramer): legacy pickle support - remove in Sentry 9.1
-                        extra_values[k[2:]] = pickle.loads(force_bytes(v))
-                elif k == "s":
-                    signal_only = bool(int(v))  # Should be 1 if set
-
-            self._process(model, incr_values, filters, extra_values, signal_only)
+            self._process(*self._load_buffered_values(values))
         finally:
             client.delete(lock_key)
+
+    def _execute_pipelined(
+        self, commands: list[tuple[str, tuple[Any, ...], dict[str, Any]]]
+    ) -> list[Any]:
+        """
+        Runs `commands` with one round trip per Redis node and returns their results in order.
+        """
+        if is_instance_redis_cluster(self.cluster, self.is_redis_cluster):
+            # Cluster pipelines split commands by slot and send one batch per node.
+            pipe = self.cluster.pipeline(transaction=False)
+            for name, args, kwargs in commands:
+                getattr(pipe, name)(*args, **kwargs)
+            return pipe.execute()
+        elif is_instance_rb_cluster(self.cluster, self.is_redis_cluster):
+            with self.cluster.map() as client:
+                promises = [
+                    getattr(client, name)(*args, **kwargs) for name, args, kwargs in commands
+                ]
+            return [promise.value for promise in promises]
+        else:
+            raise AssertionError("unreachable")
+
+    def _process_batch(self, keys: list[str]) -> None:
+        """
+        Flushes a batch of buffered keys with pipelined reads and bulk database writes.
+        """
+        lock_keys = [self._make_lock_key(key) for key in keys]
+        acquired = self._execute_pipelined(
+            [("set", (lock_key, "1"), {"nx": True, "ex": 10}) for lock_key in lock_keys]
+        )
+        locked_keys = [key for key, ok in zip(keys, acquired) if ok]
+        if len(locked_keys) < len(keys):
+            metrics.incr(
+                "buffer.revoked",
+                amount=len(keys) - len(locked_keys),
+                tags={"reason": "locked"},
+                skip_internal=False,
+            )
+
+        try:
+            commands: list[tuple[str, tuple[Any, ...], dict[str, Any]]] = []
+            for key in locked_keys:
+                commands.append(("hgetall", (key,), {}))
+                commands.append(("zrem", (self._make_pending_key_from_key(key), key), {}))
+                commands.append(("delete", (key,), {}))
+            results = self._execute_pipelined(commands)[::3]
+
+            rows = []
+            for key, values in zip(locked_keys, results):
+                values = {force_str(k): v for k, v in values.items()}
+                if not values:
+                    metrics.incr("buffer.revoked", tags={"reason": "empty"}, skip_internal=False)
+                    logger.debug("buffer.revoked.empty", extra={"redis_key": key})
+                    continue
+                model, columns, filters, extra, signal_only = self._load_buffered_values(values)
+                rows.append(BufferedRow(model, filters, columns, extra, signal_only))
+
+            self._apply_rows(rows)
+        finally:
+            if locked_keys:
+                self._execute_pipelined(
+                    [("delete", (self._make_lock_key(key),), {}) for key in locked_keys]
+                )
+
+    def _apply_rows(self, rows: list[BufferedRow]) -> None:
+        merged = merge_rows(rows)
+        metrics.distribution("buffer.batch.rows", len(rows))
+        metrics.distribution("buffer.batch.merged-rows", len(merged))
+
+        by_model: dict[type[models.Model], list[BufferedRow]] = {}
+        fallback: list[BufferedRow] = []
+        for row in merged:
+            if can_bulk_update(row):
+                by_model.setdefault(row.model, []).append(row)
+            else:
+                fallback.append(row)
+
+        for model, model_rows in by_model.items():
+            tags = {"module": model.__module__, "model": model.__name__}
+            start = time()
+            try:
+                with transaction.atomic(using=router.db_for_write(model)):
+                    missing = bulk_update(model, model_rows)
+            except Exception:
+                # Apply the rows one by one instead, so that a single bad row does
+                # not take the rest of the batch down with it.
+                logger.exception("buffer.batch.bulk-update-failed", extra=tags)
+                metrics.incr("buffer.batch.bulk-update-failed", tags=tags)
+                fallback.extend(model_rows)
+                continue
+            duration = time() - start
+            written = len(model_rows) - len(missing)
+            metrics.incr("buffer.batch.rows-written", amount=written, tags=tags)
+            if duration > 0:
+                metrics.distribution("buffer.batch.rows-per-second", written / duration, tags=tags)
+
+            missing_ids = {id(row) for row in missing}
+            for row in model_rows:
+                if id(row) in missing_ids:
+                    # Rows that do not exist (yet) need `create_or_update` semantics.
+                    fallback.append(row)
+                else:
+                    buffer_incr_complete.send_robust(
+                        model=model,
+                        columns=row.columns,
+                        filters=row.filters,
+                        extra=row.extra,
+                        created=False,
+                        sender=model,
+                    )
+
+        for row in fallback:
+            try:
+                self._process(row.model, row.columns, row.filters, row.extra, row.signal_only)
+            except OperationalError:
+                # The hash of this row is already gone. Buffer the row again so that
+                # a transient database error does not lose its counts.
+                logger.exception("buffer.batch.row-failed", extra={"filters": row.filters})
+                metrics.incr("buffer.batch.rebuffered", tags={"model": row.model.__name__})
+                self.incr(row.model, row.columns, row.filters, row.extra, row.signal_only)
+            except Exception:
+                logger.exception("buffer.batch.row-failed", extra={"filters": row.filters})
+
+    def _load_buffered_values(
+        self, values: dict[str, Any]
+    ) -> tuple[
+        type[models.Model],
+        dict[str, int],
+        dict[str, str | datetime | date | int | float],
+        dict[str, Any],
+        bool | None,
+    ]:
+        """
+        Decodes the contents of a buffered hash into the arguments of `Buffer.process`.
+        """
+        model = import_string(force_str(values.pop("m")))
+
+        if values["f"].startswith(b"{" if not self.is_redis_cluster else "{"):
+            filters = self._load_values(json.loads(force_str(values.pop("f"))))
+        else:
+            # TODO(dcramer): legacy pickle support - remove in Sentry 9.1
+            filters = pickle.loads(force_bytes(values.pop("f")))
+
+        incr_values = {}
+        extra_values = {}
+        signal_only = None
+        for k, v in values.items():
+            if k.startswith("i+"):
+                incr_values[k[2:]] = int(v)
+            elif k.startswith("e+"):
+                if v.startswith(b"[" if not self.is_redis_cluster else "["):
+                    extra_values[k[2:]] = self._load_value(json.loads(force_str(v)))
+                else:
+                    # TODO(dcramer): legacy pickle support - remove in Sentry 9.1
+                    extra_values[k[2:]] = pickle.loads(force_bytes(v))
+            elif k == "s":
+                signal_only = bool(int(v))  # Should be 1 if set
+
+        return model, incr_values, filters, extra_values, signal_only
@@ -16,3 +16,8 @@ class DjangoCache(BaseCache):
         result = cache.get(key, version=version or self.version)
         self._mark_transaction("get")
         return result
+
+    def get_many(self, keys, version=None, raw=False):
+        result = cache.get_many(keys, version=version or self.version)
+        self._mark_transaction("get")
+        return [result.get(key) for key in keys]
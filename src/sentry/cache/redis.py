@@ -69,3 +69,16 @@ class RedisClusterCache(CommonRedisCache):
         client = redis_clusters.get(cluster_id)
         raw_client = redis_clusters.get(cluster_id, decode_responses=False)
         super().__init__(client=client, raw_client=raw_client, **options)
+
+    def get_many(self, keys, version=None, raw=False):
+        with self._client(raw=raw).pipeline(transaction=False) as pipeline:
+            for key in keys:
+                pipeline.get(self.make_key(key, version=version))
+            results = pipeline.execute()
+
+        if not raw:
+            results = [json.loads(result) if result is not None else None for result in results]
+
+        self._mark_transaction("get")
+
+        return results
@@ -2252,6 +2252,9 @@ SENTRY_SNUBA_CACHE_TTL_SECONDS = 60
 # Node storage backend
 SENTRY_NODESTORE = "sentry.nodestore.django.DjangoNodeStorage"
 SENTRY_NODESTORE_OPTIONS: dict[str, Any] = {}
+# Optional in-process LRU in front of the ``nodedata`` cache, e.g.
+# {"max_bytes": 64 * 1024 * 1024, "ttl": 60, "max_item_bytes": 1024 * 1024}
+SENTRY_NODESTORE_LOCAL_CACHE: dict[str, int] | None = None
 
 # Node storage backend used for ArtifactBundle indexing (aka FlatFileIndex aka BundleIndex)
 SENTRY_INDEXSTORE = "sentry.nodestore.django.DjangoNodeStorage"
@@ -2302,6 +2305,8 @@ SENTRY_METRICS_DISALLOW_BAD_TAGS = IS_DEV
 SENTRY_METRICS_INDEXER = "sentry.sentry_metrics.indexer.postgres.postgres_v2.PostgresIndexer"
 SENTRY_METRICS_INDEXER_OPTIONS: dict[str, Any] = {}
 SENTRY_METRICS_INDEXER_CACHE_TTL = 3600 * 2
+# Optional in-process LRU in front of the indexer cache, e.g. {"maxsize": 100000, "ttl": 600}
+SENTRY_METRICS_INDEXER_LOCAL_CACHE: dict[str, int] | None = None
 SENTRY_METRICS_INDEXER_TRANSACTIONS_SAMPLE_RATE = 0.1
 
 SENTRY_METRICS_INDEXER_SPANNER_OPTIONS: dict[str, Any] = {}
@@ -2694,6 +2699,13 @@ SENTRY_OPTIONS: dict[str, Any] = {}
 SENTRY_DEFAULT_OPTIONS: dict[str, Any] = {}
 # Raise an error in dev on failed lookups
 SENTRY_OPTIONS_COMPLAIN_ON_ERRORS = True
+# Load all stored options into an in-process snapshot at startup and only
+# reload the options that changed, instead of fetching each option lazily
+# whenever its local cache entry expires.
+SENTRY_OPTIONS_SNAPSHOT = False
+# How often (in seconds) a process with an options snapshot checks whether
+# options have changed.
+SENTRY_OPTIONS_SNAPSHOT_INTERVAL = 10
 
 # You should not change this setting after your database has been created
 # unless you have altered all schemas first
@@ -3865,6 +3877,12 @@ SENTRY_ORGANIZATION_ONBOARDING_TASK = "sentry.onboarding_tasks.backends.organiza
 # lost as a result of toggling this setting.
 SENTRY_REPLAYS_ATTEMPT_LEGACY_FILESTORE_LOOKUP = True
 
+# Index of the locations of replay recording segments uploaded in packed objects. Deployments
+# enabling packed uploads should use a durable backend, e.g.
+# "sentry.replays.lib.storage.BigtablePackedSegmentIndex".
+SENTRY_REPLAYS_PACKED_SEGMENT_INDEX = "sentry.replays.lib.storage.RedisPackedSegmentIndex"
+SENTRY_REPLAYS_PACKED_SEGMENT_INDEX_OPTIONS: dict[str, Any] = {}
+
 SENTRY_FEATURE_ADOPTION_CACHE_OPTIONS = {
     "path": "sentry.models.featureadoption.FeatureAdoptionRedisBackend",
     "options": {"cluster": "default"},
@@ -182,7 +182,7 @@ _POST_PROCESS_FORWARDER_OPTIONS = multiprocessing_options(
     click.Option(
         ["--mode"],
         default="multithreaded",
-        type=click.Choice(["multithreaded", "multiprocess"]),
+        type=click.Choice(["multithreaded", "multiprocess", "partitioned"]),
         help="Mode to run post process forwarder in.",
     ),
 ]
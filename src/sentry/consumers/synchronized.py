@@ -19,6 +19,10 @@ logger = logging.getLogger(__name__)
 
 commit_codec = CommitCodec()
 
+# How often (in seconds) the per-partition lag behind the commit log is
+# reported.
+LAG_METRIC_INTERVAL = 10.0
+
 
 T = TypeVar("T")
 
@@ -94,6 +98,11 @@ class SynchronizedConsumer(Consumer[TStrategyPayload]):
             Mapping[str, MutableMapping[Partition, int]]
         ] = Synchronized({group: {} for group in commit_log_groups})
 
+        # The lowest offset committed by all followed groups, per partition.
+        # This is maintained by the commit log worker so that polling only
+        # needs a single lookup per partition.
+        self.__watermarks: Synchronized[MutableMapping[Partition, int]] = Synchronized({})
+
         self.__commit_log_worker_stop_requested = Event()
         self.__commit_log_worker_subscription_received = Event()
         self.__commit_log_worker = execute(self.__run_commit_log_worker)
@@ -112,6 +121,11 @@ class SynchronizedConsumer(Consumer[TStrategyPayload]):
         # due to offset synchronization.
         self.__paused: set[Partition] = set()
 
+        # The time at which each partition was paused after reaching the
+        # commit log watermark, used to measure how long it waited.
+        self.__fenced_since: MutableMapping[Partition, float] = {}
+        self.__last_lag_report = 0.0
+
     def __run_commit_log_worker(self) -> None:
         # TODO: This needs to roll back to the initial offset.
 
@@ -148,6 +162,12 @@ class SynchronizedConsumer(Consumer[TStrategyPayload]):
                 # initial load of the topic and makes the implementation
                 # quite a bit simpler.
                 remote_offsets[commit.group][commit.partition] = commit.offset
+                watermark = min(
+                    offsets.get(commit.partition, 0) for offsets in remote_offsets.values()
+                )
+
+            with self.__watermarks.get() as watermarks:
+                watermarks[commit.partition] = watermark
 
             if commit.orig_message_ts is not None:
                 metrics.distribution(
@@ -189,6 +209,7 @@ class SynchronizedConsumer(Consumer[TStrategyPayload]):
         def assignment_callback(offsets: Mapping[Partition, int]) -> None:
             for partition in offsets:
                 self.__paused.discard(partition)
+                self.__fenced_since.pop(partition, None)
 
             if on_assign is not None:
                 on_assign(offsets)
@@ -196,6 +217,7 @@ class SynchronizedConsumer(Consumer[TStrategyPayload]):
         def revocation_callback(partitions: Sequence[Partition]) -> None:
             for partition in partitions:
                 self.__paused.discard(partition)
+                self.__fenced_since.pop(partition, None)
 
             if on_revoke is not None:
                 on_revoke(partitions)
@@ -215,19 +237,18 @@ class SynchronizedConsumer(Consumer[TStrategyPayload]):
         resume_candidates = set(self.__consumer.paused()) - self.__paused
         if resume_candidates:
             local_offsets = self.tell()
-            resume_partitions = []
-
-            with self.__remote_offsets.get() as remote_offsets:
-                for partition in resume_candidates:
-                    remote_offset = min(
-                        (offsets.get(partition, 0) for offsets in remote_offsets.values()),
-                        default=0,
-                    )
-                    if remote_offset > local_offsets[partition]:
-                        resume_partitions.append(partition)
+            with self.__watermarks.get() as watermarks:
+                resume_partitions = [
+                    partition
+                    for partition in resume_candidates
+                    if watermarks.get(partition, 0) > local_offsets[partition]
+                ]
 
             if resume_partitions:
                 self.__consumer.resume(resume_partitions)
+                self.__record_commit_log_wait(resume_partitions)
+
+        self.__report_lag()
 
         # We don't need to explicitly handle ``EndOfPartition`` here -- even if
         # we receive the next message before the leader, we will roll back our
@@ -236,21 +257,59 @@ class SynchronizedConsumer(Consumer[TStrategyPayload]):
         if message is None:
             return None
 
-        with self.__remote_offsets.get() as remote_offsets:
-            remote_offset = min(
-                (offsets.get(message.partition, 0) for offsets in remote_offsets.values()),
-                default=0,
-            )
+        with self.__watermarks.get() as watermarks:
+            remote_offset = watermarks.get(message.partition, 0)
 
         # Check to make sure the message does not exceed the remote offset. If
         # it does, pause the partition and seek back to the message offset.
+        # Only this partition is held back, all other partitions keep being
+        # consumed up to their own watermark.
         if message.offset >= remote_offset:
             self.__consumer.pause([message.partition])
             self.__consumer.seek({message.partition: message.offset})
+            self.__fenced_since.setdefault(message.partition, time())
             return None
 
         return message
 
+    def __record_commit_log_wait(self, partitions: Sequence[Partition]) -> None:
+        now = time()
+        for partition in partitions:
+            fenced_since = self.__fenced_since.pop(partition, None)
+            if fenced_since is None:
+                continue
+            metrics.distribution(
+                "synchronized_consumer.commit_log_wait",
+                (now - fenced_since) * 1000,
+                tags={"partition": str(partition.index)},
+                unit="millisecond",
+            )
+
+    def __report_lag(self) -> None:
+        now = time()
+        if now - self.__last_lag_report < LAG_METRIC_INTERVAL:
+            return
+        self.__last_lag_report = now
+
+        local_offsets = self.tell()
+        with self.__watermarks.get() as watermarks:
+            lag = {
+                partition: max(watermarks.get(partition, 0) - offset, 0)
+                for partition, offset in local_offsets.items()
+            }
+
+        for partition, value in lag.items():
+            metrics.gauge(
+                "synchronized_consumer.lag",
+                value,
+                tags={"partition": str(partition.index)},
+            )
+            metrics.gauge(
+                "synchronized_consumer.fenced",
+                int(partition in self.__fenced_since),
+                tags={"partition": str(partition.index)},
+            )
+
     def pause(self, partitions: Sequence[Partition]) -> None:
         if self.closed:
             raise RuntimeError("consumer is closed")
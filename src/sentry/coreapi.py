@@ -56,7 +56,7 @@ def insert_data_to_database_legacy(
     if isinstance(data, CANONICAL_TYPES):
         data = dict(data.items())
 
-    cache_key = event_processing_store.store(data)
+    cache_key = event_processing_store.store(data, stage="ingest")
 
     # Attachments will be empty or None if the "event-attachments" feature
     # is turned off. For native crash reports it will still contain the
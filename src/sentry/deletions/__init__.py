@@ -76,6 +76,15 @@ For example, when you delete a Group, it will cascade in a more traditional mann
 each child (such as Event). However, when you delete a project, it won't actually cascade to the
 registered Group task. It will instead take a more efficient approach of batch deleting its indirect
 descendants, such as Event, so it can more efficiently bulk delete rows.
+
+Set-based Deletions
+-------------------
+
+When the ``deletions.planner.enabled`` option is set, scheduled deletions are run by
+``sentry.deletions.planner.DeletionPlanner`` instead of ``task.chunk()``. The planner uses the
+same ``get_child_relations`` hooks, but evaluates them for batches of parents at once, deletes
+children by id ranges, backs off when replicas fall behind and checkpoints its progress so that
+an interrupted deletion resumes where it stopped.
 """
 
 from .base import BulkModelDeletionTask, ModelDeletionTask, ModelRelation  # NOQA
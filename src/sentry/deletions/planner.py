@@ -0,0 +1,380 @@
+"""
+Set-based execution of deletion tasks.
+
+``ModelDeletionTask.chunk`` discovers child relations one parent instance at a
+time and deletes each relation through its own task and query loop. For large
+roots (a project with millions of rows below it) that means millions of small
+queries against the primary. The ``DeletionPlanner`` runs the same deletion,
+driven by the same ``get_child_relations`` hooks, but:
+
+- evaluates the relation hooks once per batch of parents and merges the
+  per-instance relations into one relation per child model
+  (``{"project_id": 1}``, ``{"project_id": 2}`` -> ``{"project_id__in": [1, 2]}``),
+- walks every relation by ascending id ranges and deletes rows of
+  ``BulkModelDeletionTask`` relations by id list, without loading them,
+- sizes batches by the replication lag of the database it writes to, and
+  waits for replicas to catch up when the lag exceeds a limit,
+- records the id it has reached for every relation, so that a deletion that is
+  interrupted resumes where it stopped.
+
+Tasks that replace ``delete_bulk`` (e.g. ``GroupDeletionTask``) or that are not
+model based are opaque to the planner and are run through ``chunk``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import time
+from collections.abc import Callable, MutableMapping, Sequence
+from typing import Any
+
+from django.db import connections, router
+
+from sentry import options
+from sentry.cache import default_cache
+from sentry.utils import metrics
+
+from .base import (
+    BaseDeletionTask,
+    BaseRelation,
+    BulkModelDeletionTask,
+    ModelDeletionTask,
+    ModelRelation,
+)
+
+logger = logging.getLogger("sentry.deletions.planner")
+
+CHECKPOINT_TTL = 7 * 24 * 60 * 60
+
+
+def get_replication_lag(using: str) -> float:
+    """
+    Returns how many seconds the slowest replica of the database ``using`` is
+    behind, or 0 if it has no replicas or the lag is not visible to us.
+    """
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            "SELECT COALESCE(EXTRACT(EPOCH FROM MAX(replay_lag)), 0) FROM pg_stat_replication"
+        )
+        return float(cursor.fetchone()[0])
+
+
+class ReplicationLagThrottle:
+    """
+    Adapts the batch size to the replication lag.
+
+    The batch size doubles (up to ``max_batch_size``) while the lag stays below
+    half of ``max_lag`` and halves (down to ``min_batch_size``) whenever it
+    exceeds ``max_lag``, in which case the caller also sleeps to let replicas
+    catch up.
+    """
+
+    def __init__(
+        self,
+        max_lag: float,
+        min_batch_size: int,
+        max_batch_size: int,
+        get_lag: Callable[[str], float] = get_replication_lag,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.max_lag = max_lag
+        self.min_batch_size = min_batch_size
+        self.max_batch_size = max_batch_size
+        self.batch_size = min_batch_size
+        self._get_lag = get_lag
+        self._sleep = sleep
+
+    def wait(self, using: str) -> None:
+        try:
+            lag = self._get_lag(using)
+        except Exception:
+            logger.exception("deletions.planner.replication_lag_failed", extra={"using": using})
+            return
+
+        metrics.distribution(
+            "deletions.planner.replication_lag", lag, tags={"using": using}, unit="second"
+        )
+        if lag > self.max_lag:
+            self.batch_size = max(self.min_batch_size, self.batch_size // 2)
+            metrics.incr("deletions.planner.throttled", tags={"using": using})
+            self._sleep(min(lag, self.max_lag * 2))
+        elif lag < self.max_lag / 2:
+            self.batch_size = min(self.max_batch_size, self.batch_size * 2)
+
+
+class DeletionCheckpoint:
+    """
+    The id every relation of a deletion has been deleted up to.
+
+    Stored in the cache under the deletion's transaction id, so that the next
+    run of an interrupted deletion can skip rows that are known to be gone.
+    Deletions without a transaction id are only tracked in memory.
+    """
+
+    def __init__(self, transaction_id: str | None) -> None:
+        self.key = f"deletions:checkpoint:{transaction_id}" if transaction_id else None
+        self.positions: MutableMapping[str, int] = (
+            (default_cache.get(self.key) or {}) if self.key is not None else {}
+        )
+
+    def get(self, node: str) -> int:
+        return self.positions.get(node, 0)
+
+    def set(self, node: str, position: int) -> None:
+        self.positions[node] = position
+        self.save()
+
+    def complete(self, node: str) -> None:
+        if self.positions.pop(node, None) is not None:
+            self.save()
+
+    def save(self) -> None:
+        if self.key is not None:
+            default_cache.set(self.key, self.positions, CHECKPOINT_TTL)
+
+    def clear(self) -> None:
+        self.positions = {}
+        if self.key is not None:
+            default_cache.delete(self.key)
+
+
+def _stable(value: Any) -> Any:
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return [_stable(v) for v in value]
+    return getattr(value, "pk", value)
+
+
+def _node_key(task: ModelDeletionTask) -> str:
+    query = repr(sorted((k, _stable(v)) for k, v in task.query.items()))
+    digest = hashlib.md5(query.encode("utf-8")).hexdigest()
+    return f"{task.model._meta.label}:{type(task).__name__}:{digest}"
+
+
+def _varying_key(query: MutableMapping[str, Any]) -> str | None:
+    for key, value in query.items():
+        if key.endswith("__in") or isinstance(value, bool):
+            continue
+        if isinstance(value, int) or hasattr(value, "pk"):
+            return key
+    return None
+
+
+def merge_relations(relations: Sequence[BaseRelation]) -> list[BaseRelation]:
+    """
+    Merges relations that only differ in the parent they point at into a
+    single relation over all parents, preserving the order in which relations
+    first appear.
+
+    Only model relations whose query selects the parent by a single id or
+    instance are merged; everything else is passed through unchanged.
+    """
+    merged: dict[Any, tuple[BaseRelation, str, list[Any]] | BaseRelation] = {}
+
+    for relation in relations:
+        params = relation.params
+        query = params.get("query")
+        key = _varying_key(query) if "model" in params and query is not None else None
+        if key is None:
+            merged[len(merged), id(relation)] = relation
+            continue
+
+        try:
+            group = (
+                params["model"],
+                relation.task,
+                key,
+                frozenset((k, v) for k, v in query.items() if k != key),
+                frozenset((params.get("partition_key") or {}).items()),
+            )
+            hash(group)
+        except TypeError:
+            merged[len(merged), id(relation)] = relation
+            continue
+
+        entry = merged.get(group)
+        if entry is None:
+            merged[group] = (relation, key, [query[key]])
+        else:
+            assert isinstance(entry, tuple)
+            entry[2].append(query[key])
+
+    result: list[BaseRelation] = []
+    for entry in merged.values():
+        if not isinstance(entry, tuple):
+            result.append(entry)
+            continue
+
+        relation, key, values = entry
+        if len(values) == 1:
+            result.append(relation)
+            continue
+
+        query = {k: v for k, v in relation.params["query"].items() if k != key}
+        query[f"{key}__in"] = values
+        result.append(
+            ModelRelation(
+                relation.params["model"],
+                query,
+                task=relation.task,
+                partition_key=relation.params.get("partition_key"),
+            )
+        )
+    return result
+
+
+class DeletionPlanner:
+    """
+    Runs a deletion task and everything below it set-based, until done or
+    until ``time_budget`` seconds have passed.
+    """
+
+    def __init__(
+        self,
+        task: BaseDeletionTask,
+        time_budget: float | None = None,
+        throttle: ReplicationLagThrottle | None = None,
+        checkpoint: DeletionCheckpoint | None = None,
+    ) -> None:
+        self.task = task
+        self.time_budget = (
+            time_budget if time_budget is not None else options.get("deletions.planner.time-budget")
+        )
+        self.throttle = throttle or ReplicationLagThrottle(
+            max_lag=options.get("deletions.planner.max-replication-lag"),
+            min_batch_size=options.get("deletions.planner.min-batch-size"),
+            max_batch_size=options.get("deletions.planner.max-batch-size"),
+        )
+        self.checkpoint = checkpoint or DeletionCheckpoint(task.transaction_id)
+        self._deadline = 0.0
+
+    def run(self) -> bool:
+        """
+        Returns ``True`` if there is more work, or ``False`` if everything
+        has been removed, like ``chunk``.
+        """
+        self._deadline = time.monotonic() + self.time_budget
+        done = self._run_task(self.task)
+        if done:
+            self.checkpoint.clear()
+        return not done
+
+    def _expired(self) -> bool:
+        return time.monotonic() >= self._deadline
+
+    def _run_relation(self, relation: BaseRelation) -> bool:
+        task = self.task.manager.get(
+            transaction_id=self.task.transaction_id,
+            actor_id=self.task.actor_id,
+            task=relation.task,
+            **relation.params,
+        )
+        return self._run_task(task)
+
+    def _run_task(self, task: BaseDeletionTask) -> bool:
+        if isinstance(task, BulkModelDeletionTask):
+            return self._run_bulk(task)
+        if isinstance(task, ModelDeletionTask) and type(task).delete_bulk is (
+            BaseDeletionTask.delete_bulk
+        ):
+            return self._run_model(task)
+        return self._run_opaque(task)
+
+    def _queryset(self, task: ModelDeletionTask):
+        queryset = getattr(task.model, task.manager_name).filter(**task.query)
+        partition_key = getattr(task, "partition_key", None)
+        if partition_key:
+            queryset = queryset.filter(**partition_key)
+        return queryset
+
+    def _run_bulk(self, task: BulkModelDeletionTask) -> bool:
+        node = _node_key(task)
+        using = router.db_for_write(task.model)
+        queryset = self._queryset(task)
+
+        while not self._expired():
+            position = self.checkpoint.get(node)
+            ids = list(
+                queryset.filter(id__gt=position)
+                .order_by("id")
+                .values_list("id", flat=True)[: self.throttle.batch_size]
+            )
+            if not ids:
+                self.checkpoint.complete(node)
+                return True
+
+            self._delete_ids(task, ids, using)
+            self.checkpoint.set(node, ids[-1])
+            self.throttle.wait(using)
+        return False
+
+    def _delete_ids(self, task: BulkModelDeletionTask, ids: list[int], using: str) -> None:
+        connection = connections[using]
+        quote_name = connection.ops.quote_name
+
+        where = ["id = ANY(%s)"]
+        params: list[Any] = [ids]
+        for column, value in (task.partition_key or {}).items():
+            where.append(f"{quote_name(column)} = %s")
+            params.append(value)
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {quote_name(task.model._meta.db_table)} WHERE {' AND '.join(where)}",
+                params,
+            )
+            deleted = cursor.rowcount
+
+        metrics.incr(
+            "deletions.planner.rows_deleted",
+            amount=max(deleted, 0),
+            tags={"model": task.model.__name__},
+        )
+
+    def _run_model(self, task: ModelDeletionTask) -> bool:
+        node = _node_key(task)
+        using = router.db_for_write(task.model)
+        queryset = self._queryset(task)
+
+        while not self._expired():
+            position = self.checkpoint.get(node)
+            instances = list(
+                queryset.filter(id__gt=position).order_by("id")[: self.throttle.batch_size]
+            )
+            if not instances:
+                self.checkpoint.complete(node)
+                return True
+
+            task.mark_deletion_in_progress(instances)
+
+            relations = list(
+                task.filter_relations(
+                    task.extend_relations_bulk(task.get_child_relations_bulk(instances), instances)
+                )
+            )
+            for instance in instances:
+                relations.extend(
+                    task.filter_relations(
+                        task.extend_relations(task.get_child_relations(instance), instance)
+                    )
+                )
+
+            for relation in merge_relations(relations):
+                if not self._run_relation(relation):
+                    return False
+
+            task.delete_instance_bulk(instances)
+            self.checkpoint.set(node, instances[-1].id)
+            self.throttle.wait(using)
+        return False
+
+    def _run_opaque(self, task: BaseDeletionTask) -> bool:
+        model = getattr(task, "model", None)
+        using = router.db_for_write(model) if model is not None else None
+
+        while not self._expired():
+            if not task.chunk():
+                return True
+            if using is not None:
+                self.throttle.wait(using)
+        return False
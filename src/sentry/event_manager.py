@@ -58,6 +58,7 @@ from sentry.grouping.ingest import (
     find_existing_grouphash,
     find_existing_grouphash_new,
     get_hash_values,
+    get_or_create_grouphashes,
     is_in_transition,
     maybe_run_background_grouping,
     maybe_run_secondary_grouping,
@@ -109,7 +110,8 @@ from sentry.signals import (
 from sentry.tasks.integrations import kick_off_status_syncs
 from sentry.tasks.process_buffer import buffer_incr
 from sentry.tasks.relay import schedule_invalidate_project_config
-from sentry.tsdb.base import TSDBModel
+from sentry.tsdb.aggregator import TSDBWriteAggregator, get_ingest_aggregator
+from sentry.tsdb.base import BaseTSDB, TSDBModel
 from sentry.types.activity import ActivityType
 from sentry.types.group import GroupSubStatus, PriorityLevel
 from sentry.usage_accountant import record
@@ -1056,6 +1058,10 @@ def _tsdb_record_all_metrics(jobs: Sequence[Job]) -> None:
 
     # XXX: validate whether anybody actually uses those metrics
 
+    writer: BaseTSDB | TSDBWriteAggregator = tsdb.backend
+    if options.get("tsdb.ingest-aggregation.enabled"):
+        writer = get_ingest_aggregator()
+
     for job in jobs:
         incrs = []
         frequencies = []
@@ -1095,12 +1101,10 @@ def _tsdb_record_all_metrics(jobs: Sequence[Job]) -> None:
             records.append((TSDBModel.users_affected_by_project, project_id, (user.tag_value,)))
 
         if incrs:
-            tsdb.backend.incr_multi(incrs, timestamp=event.datetime, environment_id=environment.id)
+            writer.incr_multi(incrs, timestamp=event.datetime, environment_id=environment.id)
 
         if records:
-            tsdb.backend.record_multi(
-                records, timestamp=event.datetime, environment_id=environment.id
-            )
+            writer.record_multi(records, timestamp=event.datetime, environment_id=environment.id)
 
         if frequencies:
             tsdb.backend.record_frequency_multi(frequencies, timestamp=event.datetime)
@@ -1119,6 +1123,7 @@ def _nodestore_save_many(jobs: Sequence[Job], app_feature: str) -> None:
             unprocessed = event_processing_store.get(
                 cache_key_for_event({"project": event.project_id, "event_id": event.event_id}),
                 unprocessed=True,
+                stage="save",
             )
             if unprocessed is not None:
                 subkeys["unprocessed"] = unprocessed
@@ -1379,9 +1384,7 @@ def _save_aggregate(
         and not primary_hashes.hierarchical_hashes
     )
 
-    flat_grouphashes = [
-        GroupHash.objects.get_or_create(project=project, hash=hash)[0] for hash in hashes.hashes
-    ]
+    flat_grouphashes = get_or_create_grouphashes(project, hashes.hashes)
 
     # The root_hierarchical_hash is the least specific hash within the tree, so
     # typically hierarchical_hashes[0], unless a hash `n` has been split in
@@ -1674,10 +1677,7 @@ def create_and_seek_grouphashes(
     grouping_config, hashes = hash_calculation_function(project, job, metric_tags)
 
     if extract_hashes(hashes):
-        grouphashes = [
-            GroupHash.objects.get_or_create(project=project, hash=hash)[0]
-            for hash in extract_hashes(hashes)
-        ]
+        grouphashes = get_or_create_grouphashes(project, extract_hashes(hashes))
 
         existing_grouphash = find_existing_grouphash_new(grouphashes)
 
@@ -2590,7 +2590,7 @@ def save_attachment(
         timestamp = datetime.now(timezone.utc)
 
     try:
-        attachment.data
+        file = EventAttachment.putfile(project.id, attachment)
     except MissingAttachmentChunks:
         track_outcome(
             org_id=project.organization_id,
@@ -2606,8 +2606,6 @@ def save_attachment(
         logger.exception("Missing chunks for cache_key=%s", cache_key)
         return
 
-    file = EventAttachment.putfile(project.id, attachment)
-
     EventAttachment.objects.create(
         # lookup:
         project_id=project.id,
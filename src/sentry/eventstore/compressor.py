@@ -3,11 +3,13 @@ Eventstore compressor is responsible for pulling out repeating data across
 events such that they can be stored only once. For example SDK modules list, or
 debug_meta.
 
-This is not used in production yet, we are still collecting metrics there.
+`NodeStorage` uses it to store the deduplicated parts as separate,
+content-addressed nodes when ``nodestore.deduplication.interfaces`` is set.
 """
 from __future__ import annotations
 
 import hashlib
+from collections.abc import Callable, Collection, Mapping
 from typing import Any
 
 from sentry.utils import json
@@ -33,11 +35,17 @@ class DebugMeta:
     def encode(data):
         dedup: dict[str, list[str | Any]] = {}
 
-        if data:
-            for image in data.get("images") or []:
-                image = image or {}
+        if data and data.get("images"):
+            # Copy what is changed, `data` may still be referenced by the caller.
+            images = []
+            for image in data["images"]:
+                if isinstance(image, dict):
+                    image = dict(image)
                 for name in DebugMeta._DEDUP_FIELDS:
-                    dedup.setdefault(name, []).append(image.pop(name, None))
+                    value = image.pop(name, None) if isinstance(image, dict) else None
+                    dedup.setdefault(name, []).append(value)
+                images.append(image)
+            data = {**data, "images": images}
 
         return dedup, data
 
@@ -53,16 +61,44 @@ class DebugMeta:
         return data
 
 
-def deduplicate(data):
+@_deduplicate_interface("modules", "contexts", "breadcrumbs")
+class WholeInterface:
+    """
+    Deduplicates the entire interface, for data that is repeated verbatim
+    across events, such as the modules of a release.
+    """
+
+    @staticmethod
+    def encode(data):
+        return data, None
+
+    @staticmethod
+    def decode(dedup, data):
+        return dedup
+
+
+def deduplicate(
+    data: dict[str, Any], interfaces: Collection[str] | None = None, min_size: int = 0
+) -> tuple[dict[str, Any], dict[str, Any]]:
+    """
+    Pulls the repeating parts of `interfaces` (all known interfaces by default)
+    out of `data`, and returns the remaining data together with the pulled out
+    parts, keyed by their checksum. Parts smaller than `min_size` bytes stay
+    inline.
+    """
     patchsets = []
     extra_keys = {}
 
     for key, interface in _INTERFACES.items():
-        if key not in data:
+        if key not in data or (interfaces is not None and key not in interfaces):
             continue
 
-        to_deduplicate, to_inline = interface.encode(data.pop(key))
+        to_deduplicate, to_inline = interface.encode(data[key])
         to_deduplicate_serialized = json.dumps(to_deduplicate).encode()
+        if len(to_deduplicate_serialized) < min_size:
+            continue
+
+        del data[key]
         checksum = hashlib.md5(to_deduplicate_serialized).hexdigest()
         extra_keys[checksum] = to_deduplicate
         patchsets.append([key, checksum, to_inline])
@@ -73,19 +109,33 @@ def deduplicate(data):
     return data, extra_keys
 
 
-def assemble(data, get_extra_keys):
+def get_checksums(data: Any) -> list[str]:
+    """
+    Returns the checksums of the parts that `data` references.
+    """
+    if not isinstance(data, dict):
+        return []
+    return [checksum for _, checksum, _ in data.get("__nodestore_patchsets") or ()]
+
+
+def assemble(
+    data: dict[str, Any], get_extra_keys: Callable[[list[str]], Mapping[str, Any]]
+) -> dict[str, Any]:
+    """
+    Reverses `deduplicate`. Interfaces whose part `get_extra_keys` does not
+    return are left out.
+    """
     if not data.get("__nodestore_patchsets"):
         return data
 
-    checksums = []
-    for key, checksum, inlined in data["__nodestore_patchsets"]:
-        checksums.append(checksum)
+    checksums = get_checksums(data)
 
     deduplicated_interfaces = get_extra_keys(checksums)
 
     for key, checksum, inlined in data["__nodestore_patchsets"]:
-        deduplicated = deduplicated_interfaces[checksum]
-        data[key] = _INTERFACES[key].decode(deduplicated, inlined)
+        if checksum not in deduplicated_interfaces:
+            continue
+        data[key] = _INTERFACES[key].decode(deduplicated_interfaces[checksum], inlined)
 
     del data["__nodestore_patchsets"]
     return data
@@ -1,9 +1,21 @@
+from collections.abc import Generator
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import timedelta
 from typing import Any
 
 import sentry_sdk
 
 from sentry.utils.cache import cache_key_for_event
+from sentry.utils.codecs import (
+    BytesCodec,
+    Codec,
+    InstrumentedCodec,
+    JSONCodec,
+    MsgpackCodec,
+    VersionedCodec,
+    ZstdCodec,
+)
 from sentry.utils.kvstore.abstract import KVStorage
 from sentry.utils.services import Service
 
@@ -12,6 +24,83 @@ DEFAULT_TIMEOUT = 60 * 60 * 24
 
 Event = Any
 
+# Versions written into the header of encoded values. Never reuse a version
+# for a different encoding, values may outlive a deploy by `DEFAULT_TIMEOUT`.
+CODEC_VERSION_MSGPACK = 1
+CODEC_VERSION_MSGPACK_ZSTD = 2
+CODEC_VERSION_MSGPACK_ZSTD_DICT = 3
+
+CODEC_METRICS_PREFIX = "eventstore.processing.codec"
+
+
+# The processing stage (e.g. ``preprocess``, ``process`` or ``save``) on whose
+# behalf the store is encoding or decoding, see `EventProcessingStore`.
+_processing_stage: ContextVar[str] = ContextVar("eventstore.processing.stage", default="unknown")
+
+
+@contextmanager
+def _stage(stage: str | None) -> Generator[None, None, None]:
+    if stage is None:
+        yield
+        return
+    token = _processing_stage.set(stage)
+    try:
+        yield
+    finally:
+        _processing_stage.reset(token)
+
+
+def _get_stage_tags() -> dict[str, str]:
+    return {"stage": _processing_stage.get()}
+
+
+def _instrument(codec: Codec[Any, Any], name: str) -> Codec[Any, Any]:
+    return InstrumentedCodec(codec, CODEC_METRICS_PREFIX, name, get_tags=_get_stage_tags)
+
+
+def get_codec(codec: str | None = None, zstd_dictionary: str | None = None) -> Codec[Event, bytes]:
+    """
+    Returns the codec used to encode events written to the processing store.
+
+    `codec` is one of ``json``, ``msgpack`` and ``msgpack-zstd``. Regardless of
+    the codec used for writing, values written by any of them can be read, as
+    can the plain JSON values written before the codec was configurable. To
+    switch to a binary codec, first roll out ``json`` (which keeps writing
+    plain JSON) so that every reader understands the binary formats before
+    they are written.
+
+    `zstd_dictionary` is the path to a dictionary trained on event payloads
+    (see ``zstd --train``). Values compressed with a dictionary cannot be read
+    without it, so keep it available for `DEFAULT_TIMEOUT` after replacing it.
+    """
+    msgpack_codec = _instrument(MsgpackCodec(), "msgpack")
+    codecs: dict[int, Codec[Event, bytes]] = {
+        CODEC_VERSION_MSGPACK: msgpack_codec,
+        CODEC_VERSION_MSGPACK_ZSTD: msgpack_codec | _instrument(ZstdCodec(), "zstd"),
+    }
+
+    if zstd_dictionary is not None:
+        with open(zstd_dictionary, "rb") as f:
+            dictionary = f.read()
+        codecs[CODEC_VERSION_MSGPACK_ZSTD_DICT] = msgpack_codec | _instrument(
+            ZstdCodec(dictionary=dictionary), "zstd-dict"
+        )
+
+    version: int | None
+    if codec is None or codec == "json":
+        version = None
+    elif codec == "msgpack":
+        version = CODEC_VERSION_MSGPACK
+    elif codec == "msgpack-zstd":
+        if zstd_dictionary is not None:
+            version = CODEC_VERSION_MSGPACK_ZSTD_DICT
+        else:
+            version = CODEC_VERSION_MSGPACK_ZSTD
+    else:
+        raise ValueError(f"Unknown event processing store codec: {codec!r}")
+
+    return VersionedCodec(codecs, version, legacy=_instrument(JSONCodec() | BytesCodec(), "json"))
+
 
 class EventProcessingStore(Service):
     """
@@ -24,6 +113,9 @@ class EventProcessingStore(Service):
 
     Separating processing store from the cache allows use of different
     implementations.
+
+    Callers pass the processing `stage` they run in, which tags the codec
+    metrics.
     """
 
     def __init__(self, inner: KVStorage[str, Event]):
@@ -33,21 +125,21 @@ class EventProcessingStore(Service):
     def __get_unprocessed_key(self, key: str) -> str:
         return key + ":u"
 
-    def exists(self, event: Event) -> bool:
+    def exists(self, event: Event, stage: str | None = None) -> bool:
         key = cache_key_for_event(event)
-        return self.get(key) is not None
+        return self.get(key, stage=stage) is not None
 
     @sentry_sdk.tracing.trace
-    def store(self, event: Event, unprocessed: bool = False) -> str:
-        with sentry_sdk.start_span(op="eventstore.processing.store"):
+    def store(self, event: Event, unprocessed: bool = False, stage: str | None = None) -> str:
+        with sentry_sdk.start_span(op="eventstore.processing.store"), _stage(stage):
             key = cache_key_for_event(event)
             if unprocessed:
                 key = self.__get_unprocessed_key(key)
             self.inner.set(key, event, self.timeout)
             return key
 
-    def get(self, key: str, unprocessed: bool = False) -> Event | None:
-        with sentry_sdk.start_span(op="eventstore.processing.get"):
+    def get(self, key: str, unprocessed: bool = False, stage: str | None = None) -> Event | None:
+        with sentry_sdk.start_span(op="eventstore.processing.get"), _stage(stage):
             if unprocessed:
                 key = self.__get_unprocessed_key(key)
             return self.inner.get(key)
@@ -1,8 +1,8 @@
-from sentry.utils.codecs import BytesCodec, JSONCodec
+from sentry.utils.codecs import BytesCodec, Codec, JSONCodec
 from sentry.utils.kvstore.bigtable import BigtableKVStorage
 from sentry.utils.kvstore.encoding import KVStorageCodecWrapper
 
-from .base import EventProcessingStore
+from .base import Event, EventProcessingStore, get_codec
 
 
 class BigtableEventProcessingStore(EventProcessingStore):
@@ -10,13 +10,15 @@ class BigtableEventProcessingStore(EventProcessingStore):
     Creates an instance of the processing store which uses Bigtable as its
     backend.
 
-    Keyword argument are forwarded to the ``BigtableKVStorage`` constructor.
+    The ``codec`` and ``zstd_dictionary`` options select the codec as
+    described in ``get_codec``, other keyword arguments are forwarded to the
+    ``BigtableKVStorage`` constructor.
     """
 
     def __init__(self, **options):
-        super().__init__(
-            KVStorageCodecWrapper(
-                BigtableKVStorage(**options),
-                JSONCodec() | BytesCodec(),  # maintains functional parity with cache backend
-            )
-        )
+        codec: Codec[Event, bytes]
+        if "codec" in options:
+            codec = get_codec(options.pop("codec"), options.pop("zstd_dictionary", None))
+        else:
+            codec = JSONCodec() | BytesCodec()  # maintains functional parity with cache backend
+        super().__init__(KVStorageCodecWrapper(BigtableKVStorage(**options), codec))
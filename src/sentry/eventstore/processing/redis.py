@@ -3,18 +3,29 @@ from sentry.utils.kvstore.encoding import KVStorageCodecWrapper
 from sentry.utils.kvstore.redis import RedisKVStorage
 from sentry.utils.redis import redis_clusters
 
-from .base import EventProcessingStore
+from .base import EventProcessingStore, get_codec
 
 
 class RedisClusterEventProcessingStore(EventProcessingStore):
     """
     Creates an instance of the processing store which uses a Redis Cluster
     client as its backend.
+
+    If the ``codec`` option is provided, events are encoded with the
+    versioned codec returned by ``get_codec`` (see there for the supported
+    options and how to roll them out). Otherwise, events are stored as JSON.
     """
 
     def __init__(self, **options):
-        super().__init__(
-            KVStorageCodecWrapper(
-                RedisKVStorage(redis_clusters.get(options.pop("cluster", "default"))), JSONCodec()
+        cluster = options.pop("cluster", "default")
+        if "codec" in options:
+            super().__init__(
+                KVStorageCodecWrapper(
+                    RedisKVStorage(redis_clusters.get(cluster, decode_responses=False)),
+                    get_codec(options.pop("codec"), options.pop("zstd_dictionary", None)),
+                )
+            )
+        else:
+            super().__init__(
+                KVStorageCodecWrapper(RedisKVStorage(redis_clusters.get(cluster)), JSONCodec())
             )
-        )
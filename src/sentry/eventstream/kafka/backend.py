@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import functools
 import logging
 from collections.abc import Mapping, MutableMapping, Sequence
 from typing import TYPE_CHECKING, Any
@@ -11,9 +12,10 @@ from confluent_kafka import Producer
 from sentry import options
 from sentry.conf.types.kafka_definition import Topic
 from sentry.eventstream.base import EventStreamEventType, GroupStates
+from sentry.eventstream.kafka.producer import BatchingProducer
 from sentry.eventstream.snuba import KW_SKIP_SEMANTIC_PARTITIONING, SnubaProtocolEventStream
 from sentry.killswitches import killswitch_matches_context
-from sentry.utils import json
+from sentry.utils import json, metrics
 from sentry.utils.kafka_config import get_kafka_producer_cluster_options, get_topic_definition
 
 logger = logging.getLogger(__name__)
@@ -21,28 +23,95 @@ logger = logging.getLogger(__name__)
 if TYPE_CHECKING:
     from sentry.eventstore.models import Event, GroupEvent
 
+#: Headers with few distinct values, their encoded values are cached. Headers
+#: such as ``project_id`` would only churn the cache.
+CACHED_HEADERS = frozenset(
+    (
+        "operation",
+        "version",
+        "is_new",
+        "is_new_group_environment",
+        "is_regression",
+        "skip_consume",
+        "queue",
+    )
+)
+
+
+@functools.lru_cache(maxsize=1024)
+def _encode_cached_header(value: str) -> bytes:
+    return value.encode("utf-8")
+
+
+def encode_headers(headers: Mapping[str, str]) -> list[tuple[str, bytes]]:
+    return [
+        (k, _encode_cached_header(v) if k in CACHED_HEADERS else v.encode("utf-8"))
+        for k, v in headers.items()
+    ]
+
 
 class KafkaEventStream(SnubaProtocolEventStream):
-    def __init__(self, **options: Any) -> None:
+    """
+    With ``batching`` enabled, messages are buffered in process memory for up
+    to ``max_batch_time`` seconds before they are handed to the producer (see
+    `BatchingProducer`). This trades durability for throughput: the buffers
+    are only flushed on a clean exit, so messages buffered when the process is
+    killed are lost, in addition to what librdkafka has not delivered yet.
+    """
+
+    def __init__(
+        self,
+        batching: bool = False,
+        max_batch_size: int = 1000,
+        max_batch_time: float = 0.05,
+        **options: Any,
+    ) -> None:
         self.topic = Topic.EVENTS
         self.transactions_topic = Topic.TRANSACTIONS
         self.issue_platform_topic = Topic.EVENTSTREAM_GENERIC
-        self.__producers: MutableMapping[Topic, Producer] = {}
+        self.batching = batching
+        self.max_batch_size = max_batch_size
+        self.max_batch_time = max_batch_time
+        self.__producers: MutableMapping[Topic, Producer | BatchingProducer] = {}
+        self.__real_topic_names: MutableMapping[Topic, str] = {}
 
     def get_transactions_topic(self, project_id: int) -> Topic:
         return self.transactions_topic
 
-    def get_producer(self, topic: Topic) -> Producer:
+    def get_producer(self, topic: Topic) -> Producer | BatchingProducer:
         if topic not in self.__producers:
             cluster_name = get_topic_definition(topic)["cluster"]
             cluster_options = get_kafka_producer_cluster_options(cluster_name)
-            self.__producers[topic] = Producer(cluster_options)
+            producer = Producer(cluster_options)
+            if self.batching:
+                self.__producers[topic] = BatchingProducer(
+                    producer,
+                    max_batch_size=self.max_batch_size,
+                    max_batch_time=self.max_batch_time,
+                )
+            else:
+                self.__producers[topic] = producer
 
         return self.__producers[topic]
 
+    def get_real_topic_name(self, topic: Topic) -> str:
+        if topic not in self.__real_topic_names:
+            self.__real_topic_names[topic] = get_topic_definition(topic)["real_topic_name"]
+
+        return self.__real_topic_names[topic]
+
     def delivery_callback(self, error: KafkaError | None, message: KafkaMessage) -> None:
+        tags = {"topic": message.topic()}
         if error is not None:
+            metrics.incr("eventstream.kafka.delivery_error", tags=tags)
             logger.warning("Could not publish message (error: %s): %r", error, message)
+            return
+
+        latency = message.latency()
+        if latency is not None:
+            metrics.distribution(
+                "eventstream.kafka.delivery_latency", latency, tags=tags, unit="second"
+            )
 
     def _get_headers_for_insert(
         self,
@@ -199,19 +268,25 @@ class KafkaEventStream(SnubaProtocolEventStream):
         # a heartbeat for the purposes of any sort of session expiration.)
         # Note that this call to poll() is *only* dealing with earlier
         # asynchronous produce() calls from the same process.
-        producer.poll(0.0)
+        #
+        # The batching producer polls once per batch instead.
+        if not self.batching:
+            producer.poll(0.0)
 
         assert isinstance(extra_data, tuple)
 
-        real_topic = get_topic_definition(topic)["real_topic_name"]
+        real_topic = self.get_real_topic_name(topic)
 
         try:
             producer.produce(
                 topic=real_topic,
                 key=str(project_id).encode("utf-8") if not skip_semantic_partitioning else None,
-                value=json.dumps((self.EVENT_PROTOCOL_VERSION, _type) + extra_data),
+                value=json.dumps(
+                    (self.EVENT_PROTOCOL_VERSION, _type) + extra_data,
+                    use_rapid_json=options.get("eventstream:kafka-rapidjson"),
+                ),
                 on_delivery=self.delivery_callback,
-                headers=[(k, v.encode("utf-8")) for k, v in headers.items()],
+                headers=encode_headers(headers),
             )
         except Exception as error:
             logger.exception("Could not publish message: %s", error)
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import atexit
+import logging
+import threading
+import time
+from collections.abc import Callable, Sequence
+from typing import Any
+
+from confluent_kafka import Producer
+
+from sentry.utils import metrics
+
+logger = logging.getLogger(__name__)
+
+# (value, key, headers, on_delivery)
+BufferedMessage = tuple[str | bytes, bytes | None, Sequence[tuple[str, bytes]], Callable[..., Any]]
+
+
+class BatchingProducer:
+    """
+    Buffers messages per topic in process memory and hands them to the
+    wrapped producer in batches.
+
+    librdkafka already groups messages into produce requests by itself, so
+    this does not change what goes over the wire. It moves the per-message
+    overhead off the calling thread instead: the producer is polled for
+    delivery reports once per batch rather than once per message.
+
+    A buffer is handed to the producer once it holds `max_batch_size`
+    messages, or once its oldest message is `max_batch_time` seconds old. The
+    latter is enforced by a background thread so that messages do not linger
+    when traffic stops. Buffers are also handed over on `flush` and when the
+    process exits cleanly. Messages still buffered when the process is killed
+    are lost.
+    """
+
+    def __init__(
+        self, producer: Producer, max_batch_size: int = 1000, max_batch_time: float = 0.05
+    ) -> None:
+        self.producer = producer
+        self.max_batch_size = max_batch_size
+        self.max_batch_time = max_batch_time
+
+        self._lock = threading.Condition()
+        self._buffers: dict[str, list[BufferedMessage]] = {}
+        self._deadlines: dict[str, float] = {}
+        self._thread: threading.Thread | None = None
+
+        atexit.register(self.flush)
+
+    def __len__(self) -> int:
+        with self._lock:
+            buffered = sum(len(buffer) for buffer in self._buffers.values())
+        return buffered + len(self.producer)
+
+    def produce(
+        self,
+        topic: str,
+        value: str | bytes,
+        key: bytes | None = None,
+        headers: Sequence[tuple[str, bytes]] = (),
+        on_delivery: Callable[..., Any] | None = None,
+    ) -> None:
+        with self._lock:
+            buffer = self._buffers.get(topic)
+            if buffer is None:
+                buffer = self._buffers[topic] = []
+                self._deadlines[topic] = time.monotonic() + self.max_batch_time
+                self._ensure_thread()
+                self._lock.notify()
+            buffer.append((value, key, headers, on_delivery))
+
+            if len(buffer) < self.max_batch_size:
+                return
+            batch = self._take(topic)
+
+        self._produce_batch(topic, batch)
+
+    def poll(self, timeout: float = 0.0) -> int:
+        return self.producer.poll(timeout)
+
+    def flush(self, timeout: float | None = None) -> int:
+        """
+        Hands all buffered messages to the producer and waits for their
+        delivery.
+        """
+        with self._lock:
+            batches = [(topic, self._take(topic)) for topic in list(self._buffers)]
+        for topic, batch in batches:
+            self._produce_batch(topic, batch)
+
+        if timeout is None:
+            return self.producer.flush()
+        return self.producer.flush(timeout)
+
+    def _take(self, topic: str) -> list[BufferedMessage]:
+        del self._deadlines[topic]
+        return self._buffers.pop(topic)
+
+    def _produce_batch(self, topic: str, batch: list[BufferedMessage]) -> None:
+        for value, key, headers, on_delivery in batch:
+            try:
+                self.producer.produce(
+                    topic=topic,
+                    key=key,
+                    value=value,
+                    on_delivery=on_delivery,
+                    headers=headers,
+                )
+            except Exception as error:
+                logger.exception("Could not publish message: %s", error)
+
+        # Serve delivery callbacks of earlier batches.
+        self.producer.poll(0.0)
+
+        metrics.distribution("eventstream.kafka.batch_size", len(batch), tags={"topic": topic})
+        metrics.distribution(
+            "eventstream.kafka.queue_depth", len(self.producer), tags={"topic": topic}
+        )
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._run, name="eventstream-batching-producer", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                while not self._deadlines:
+                    self._lock.wait()
+
+                now = time.monotonic()
+                expired = [topic for topic, deadline in self._deadlines.items() if deadline <= now]
+                if not expired:
+                    self._lock.wait(min(self._deadlines.values()) - now)
+                    continue
+                batches = [(topic, self._take(topic)) for topic in expired]
+
+            for topic, batch in batches:
+                try:
+                    self._produce_batch(topic, batch)
+                except Exception:
+                    logger.exception("eventstream.kafka.batch_failed")
@@ -5,6 +5,7 @@ import logging
 __all__ = ["FeatureManager"]
 
 import abc
+import time
 from collections import defaultdict
 from collections.abc import Iterable, Mapping, MutableMapping, MutableSet, Sequence
 from typing import TYPE_CHECKING, Any
@@ -14,6 +15,7 @@ from django.conf import settings
 
 from .base import Feature, FeatureHandlerStrategy
 from .exceptions import FeatureNotRegistered
+from .memo import FeatureMemo, get_feature_memo
 
 if TYPE_CHECKING:
     from sentry.features.handler import FeatureHandler
@@ -179,7 +181,14 @@ class FeatureManager(RegisteredFeatureManager):
         """
         self._entity_handler = handler
 
-    def has(self, name: str, *args: Any, skip_entity: bool | None = False, **kwargs: Any) -> bool:
+    def has(
+        self,
+        name: str,
+        *args: Any,
+        skip_entity: bool | None = False,
+        call_site: str | None = None,
+        **kwargs: Any,
+    ) -> bool:
         """
         Determine if a feature is enabled. If a handler returns None, then the next
         mechanism is used for feature checking.
@@ -209,30 +218,58 @@ class FeatureManager(RegisteredFeatureManager):
 
         >>> FeatureManager.has('organizations:feature', organization, actor=request.user)
 
+        Within a ``sentry.features.memo.feature_memo`` context the result is
+        memoized for the remainder of the context. Checks that pass
+        ``call_site`` are also counted separately in the memo metrics.
         """
-        try:
-            actor = kwargs.pop("actor", None)
-            feature = self.get(name, *args, **kwargs)
-
-            # Check registered feature handlers
-            rv = self._get_handler(feature, actor)
+        memo = get_feature_memo()
+        if memo is None:
+            try:
+                return self._has(name, *args, skip_entity=skip_entity, **kwargs)
+            except Exception:
+                logging.exception("Failed to run feature check")
+                return False
+
+        key = memo.key(name, args, kwargs, skip_entity)
+        if key is not None:
+            rv = memo.results.get(key)
             if rv is not None:
+                memo.record(hit=True, call_site=call_site)
                 return rv
 
-            if self._entity_handler and not skip_entity:
-                rv = self._entity_handler.has(feature, actor)
-                if rv is not None:
-                    return rv
+        start = time.perf_counter()
+        try:
+            rv = self._has(name, *args, skip_entity=skip_entity, **kwargs)
+        except Exception:
+            logging.exception("Failed to run feature check")
+            return False
+        finally:
+            memo.record(hit=False, handler_time=time.perf_counter() - start, call_site=call_site)
+
+        if key is not None:
+            memo.results[key] = rv
+        return rv
 
-            rv = settings.SENTRY_FEATURES.get(feature.name, False)
+    def _has(self, name: str, *args: Any, skip_entity: bool | None = False, **kwargs: Any) -> bool:
+        actor = kwargs.pop("actor", None)
+        feature = self.get(name, *args, **kwargs)
+
+        # Check registered feature handlers
+        rv = self._get_handler(feature, actor)
+        if rv is not None:
+            return rv
+
+        if self._entity_handler and not skip_entity:
+            rv = self._entity_handler.has(feature, actor)
             if rv is not None:
                 return rv
 
-            # Features are by default disabled if no plugin or default enables them
-            return False
-        except Exception:
-            logging.exception("Failed to run feature check")
-            return False
+        rv = settings.SENTRY_FEATURES.get(feature.name, False)
+        if rv is not None:
+            return rv
+
+        # Features are by default disabled if no plugin or default enables them
+        return False
 
     def batch_has(
         self,
@@ -254,7 +291,7 @@ class FeatureManager(RegisteredFeatureManager):
             )
         else:
             # Fall back to default handler if no entity handler available.
-            project_features = filter(lambda name: name.startswith("projects:"), feature_names)
+            project_features = [name for name in feature_names if name.startswith("projects:")]
             if projects and project_features:
                 results: MutableMapping[str, Mapping[str, bool]] = {}
                 for project in projects:
@@ -263,18 +300,18 @@ class FeatureManager(RegisteredFeatureManager):
                         proj_results[feature_name] = self.has(feature_name, project, actor=actor)
                 return results
 
-            org_features = filter(lambda name: name.startswith("organizations:"), feature_names)
+            org_features = [name for name in feature_names if name.startswith("organizations:")]
             if organization and org_features:
                 org_results = {}
                 for feature_name in org_features:
                     org_results[feature_name] = self.has(feature_name, organization, actor=actor)
                 return {f"organization:{organization.id}": org_results}
 
-            unscoped_features = filter(
-                lambda name: not name.startswith("organizations:")
-                and not name.startswith("projects:"),
-                feature_names,
-            )
+            unscoped_features = [
+                name
+                for name in feature_names
+                if not name.startswith("organizations:") and not name.startswith("projects:")
+            ]
             if unscoped_features:
                 unscoped_results = {}
                 for feature_name in unscoped_features:
@@ -282,6 +319,89 @@ class FeatureManager(RegisteredFeatureManager):
                 return {"unscoped": unscoped_results}
             return None
 
+    def prefetch(
+        self,
+        feature_names: Sequence[str],
+        actor: User | None = None,
+        projects: Sequence[Project] | None = None,
+        organization: Organization | None = None,
+        call_site: str | None = None,
+    ) -> None:
+        """
+        Evaluate organization and project features for a set of entities up
+        front, so that later calls to ``has`` within the active
+        ``sentry.features.memo.feature_memo`` context are served from the memo.
+
+        Features are evaluated through ``batch_has``, one call per scope. This
+        is a no-op when no memo is active.
+
+        >>> features.prefetch(["projects:feature"], projects=projects, actor=request.user)
+        """
+        memo = get_feature_memo()
+        if memo is None:
+            return
+
+        # Registered handlers take precedence over the entity handler in `has`,
+        # which `batch_has` does not know about. Leave those features to `has`.
+        feature_names = [
+            name
+            for name in feature_names
+            if name in self._feature_registry and not self._handler_registry.get(name)
+        ]
+        scopes: list[tuple[list[str], Mapping[str, Any], dict[str, Any]]] = []
+        if organization is not None:
+            scopes.append(
+                (
+                    [name for name in feature_names if name.startswith("organizations:")],
+                    {"organization": organization},
+                    {f"organization:{organization.id}": organization},
+                )
+            )
+        if projects:
+            scopes.append(
+                (
+                    [name for name in feature_names if name.startswith("projects:")],
+                    {"projects": projects},
+                    {f"project:{project.id}": project for project in projects},
+                )
+            )
+
+        for names, scope, entities in scopes:
+            if not names:
+                continue
+
+            start = time.perf_counter()
+            try:
+                results = self.batch_has(names, actor=actor, **scope)
+            except Exception:
+                logging.exception("Failed to prefetch features")
+                continue
+            finally:
+                memo.record(
+                    hit=False, handler_time=time.perf_counter() - start, call_site=call_site
+                )
+
+            self._memoize_batch(memo, results or {}, entities, actor)
+
+    @staticmethod
+    def _memoize_batch(
+        memo: FeatureMemo,
+        results: Mapping[str, Mapping[str, bool | None]],
+        entities: Mapping[str, Any],
+        actor: User | None,
+    ) -> None:
+        for entity_key, entity_results in results.items():
+            entity = entities.get(entity_key)
+            if entity is None:
+                continue
+            for name, rv in entity_results.items():
+                # Unhandled features fall through to the next mechanism in `has`.
+                if rv is None:
+                    continue
+                key = memo.key(name, (entity,), {"actor": actor}, False)
+                if key is not None:
+                    memo.results[key] = rv
+
     @staticmethod
     def _shim_feature_strategy(
         entity_feature_strategy: bool | FeatureHandlerStrategy,
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import dataclasses
+from collections import defaultdict
+from collections.abc import Generator, Hashable, Mapping, MutableMapping, Sequence
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+from sentry import options
+from sentry.utils import metrics
+
+__all__ = ["FeatureMemo", "feature_memo", "get_feature_memo"]
+
+
+@dataclasses.dataclass
+class MemoStats:
+    hits: int = 0
+    misses: int = 0
+    handler_time: float = 0.0
+
+
+class FeatureMemo:
+    """
+    Results of the feature checks made within one request or task.
+
+    Results are keyed by feature name, the entities the feature is checked
+    for and the actor. Checks with arguments that can not be identified
+    (anything without an ``id``) are never memoized.
+
+    Hits, misses and handler time are counted for the whole memo, and
+    separately for every call site that identifies itself with ``call_site``.
+    """
+
+    def __init__(self) -> None:
+        self.results: MutableMapping[Hashable, bool] = {}
+        self.totals = MemoStats()
+        self.call_sites: MutableMapping[str, MemoStats] = defaultdict(MemoStats)
+
+    @staticmethod
+    def key(
+        name: str, args: Sequence[Any], kwargs: Mapping[str, Any], skip_entity: bool | None
+    ) -> Hashable | None:
+        # `has(name, organization)` and `has(name, organization, actor=None)` are
+        # the same check.
+        kwargs = {"actor": None, **kwargs}
+        try:
+            return (
+                name,
+                tuple(_entity_key(arg) for arg in args),
+                tuple(sorted((k, _entity_key(v)) for k, v in kwargs.items())),
+                bool(skip_entity),
+            )
+        except _Unmemoizable:
+            return None
+
+    def record(self, hit: bool, handler_time: float = 0.0, call_site: str | None = None) -> None:
+        stats = [self.totals]
+        if call_site is not None:
+            stats.append(self.call_sites[call_site])
+        for s in stats:
+            if hit:
+                s.hits += 1
+            else:
+                s.misses += 1
+            s.handler_time += handler_time
+
+    def flush(self, scope: str) -> None:
+        if self.totals.hits or self.totals.misses:
+            _emit(self.totals, {"scope": scope})
+        for site, stats in self.call_sites.items():
+            _emit(stats, {"scope": scope, "call_site": site})
+        self.totals = MemoStats()
+        self.call_sites.clear()
+
+
+def _emit(stats: MemoStats, tags: Mapping[str, str]) -> None:
+    metrics.incr("features.memo.hits", amount=stats.hits, tags=tags)
+    metrics.incr("features.memo.misses", amount=stats.misses, tags=tags)
+    metrics.distribution(
+        "features.memo.handler_time", stats.handler_time * 1000, tags=tags, unit="millisecond"
+    )
+
+
+class _Unmemoizable(Exception):
+    pass
+
+
+def _entity_key(value: Any) -> Hashable:
+    if value is None or isinstance(value, (str, int)):
+        return value
+
+    entity_id = getattr(value, "id", None)
+    if entity_id is None and not getattr(value, "is_anonymous", False):
+        raise _Unmemoizable
+    return (type(value).__name__, entity_id)
+
+
+_memo: ContextVar[FeatureMemo | None] = ContextVar("feature_memo", default=None)
+
+
+def get_feature_memo() -> FeatureMemo | None:
+    return _memo.get()
+
+
+@contextmanager
+def feature_memo(scope: str) -> Generator[FeatureMemo | None, None, None]:
+    """
+    Memoize feature checks made by this thread while the context is active.
+
+    Wraps the lifetime of a single API request or task, so that repeated checks
+    of the same feature for the same entities are only evaluated once. A
+    feature that is flipped while the context is active is picked up by the
+    next request or task. Counters of memo hits and misses are emitted when the
+    context exits, tagged with ``scope``, and additionally with ``call_site``
+    for checks that pass one.
+
+    Nested contexts start from an empty memo and restore the outer memo on exit.
+    """
+    if not options.get("features.memoize-checks"):
+        yield None
+        return
+
+    memo = FeatureMemo()
+    token = _memo.set(memo)
+    try:
+        yield memo
+    finally:
+        _memo.reset(token)
+        memo.flush(scope)
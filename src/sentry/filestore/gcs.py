@@ -344,6 +344,25 @@ class GoogleCloudStorage(Storage):
         blob = self._get_blob(self._encode_name(name))
         return blob.size
 
+    def read_range(self, name, offset, length):
+        """
+        Returns `length` bytes of the file starting at `offset` without
+        downloading the entire file.
+        """
+        if length <= 0:
+            return b""
+
+        result = []
+
+        def _try_download():
+            normalized_name = self._normalize_name(clean_name(name))
+            blob = FancyBlob(self.download_url, self._encode_name(normalized_name), self.bucket)
+            result.append(blob.download_as_bytes(start=offset, end=offset + length - 1))
+
+        with metrics.timer("filestore.read_range", instance="gcs"):
+            self.try_get(_try_download)
+        return result[-1]
+
     def modified_time(self, name):
         name = self._normalize_name(clean_name(name))
         blob = self._get_blob(self._encode_name(name))
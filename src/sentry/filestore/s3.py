@@ -562,6 +562,19 @@ class S3Boto3Storage(Storage):
             return 0
         return self.bucket.Object(self._encode_name(name)).content_length
 
+    def read_range(self, name, offset, length):
+        """
+        Returns `length` bytes of the file starting at `offset` without
+        downloading the entire file.
+        """
+        if length <= 0:
+            return b""
+
+        name = self._normalize_name(self._clean_name(name))
+        with metrics.timer("filestore.read_range", instance="s3"):
+            obj = self.bucket.Object(self._encode_name(name))
+            return obj.get(Range=f"bytes={offset}-{offset + length - 1}")["Body"].read()
+
     def get_modified_time(self, name):
         """
         Returns an (aware) datetime object containing the last modified time if
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import functools
 import re
 from collections.abc import Sequence
 from dataclasses import dataclass
@@ -233,13 +234,26 @@ def get_fingerprinting_config_for_project(
     Merges the project's custom fingerprinting rules (if any) with the default built-in rules.
     """
 
-    from sentry.grouping.fingerprinting import FingerprintingRules, InvalidFingerprintingConfig
+    from sentry.grouping.fingerprinting import FingerprintingRules
 
     bases = get_projects_default_fingerprinting_bases(project, config_id=config_id)
     rules = project.get_option("sentry:fingerprinting_rules")
     if not rules:
         return FingerprintingRules([], bases=bases)
 
+    return _get_compiled_fingerprinting_rules(rules, tuple(bases) if bases else None)
+
+
+@functools.lru_cache(maxsize=256)
+def _get_compiled_fingerprinting_rules(
+    rules: str, bases: tuple[str, ...] | None
+) -> FingerprintingRules:
+    """
+    Parses a project's fingerprinting config, memoized per process so that the
+    rule and matcher objects are built once per config rather than once per event.
+    The returned object is shared and must not be modified.
+    """
+    from sentry.grouping.fingerprinting import FingerprintingRules, InvalidFingerprintingConfig
     from sentry.utils.cache import cache
     from sentry.utils.hashlib import md5_text
 
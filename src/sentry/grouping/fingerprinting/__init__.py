@@ -25,6 +25,9 @@ VERSION = 1
 
 CONFIGS_DIR: Path = Path(__file__).with_name("configs")
 
+# Characters that make a pattern a glob rather than a literal.
+GLOB_CHARACTERS = frozenset("*?[]{}\\")
+
 # Grammar is defined in EBNF syntax.
 fingerprinting_grammar = Grammar(
     r"""
@@ -81,6 +84,8 @@ class EventAccess:
         self._tags = None
         self._sdk = None
         self._family = None
+        # (match group, index of the values, matcher signature) -> result
+        self._match_results = {}
 
     def get_messages(self):
         if self._messages is None:
@@ -138,8 +143,7 @@ class EventAccess:
     def get_frames(self, with_functions=False):
         if self._frames is None:
             self._frames = []
-
-        find_stack_frames(self.event.data, self._push_frame)
+            find_stack_frames(self.event.data, self._push_frame)
         return self._frames
 
     def get_toplevel(self):
@@ -168,6 +172,18 @@ class EventAccess:
     def get_values(self, match_group):
         return getattr(self, "get_" + match_group)()
 
+    def matches(self, matcher, match_group, index, values):
+        """
+        Tests `matcher` against the `index`-th values of `match_group`. Results are
+        memoized per event, so identical matchers shared by many rules are only
+        evaluated once per frame, exception, tag set, etc.
+        """
+        cache_key = (match_group, index, matcher.signature)
+        rv = self._match_results.get(cache_key)
+        if rv is None:
+            rv = self._match_results[cache_key] = matcher.matches(values)
+        return rv
+
 
 class FingerprintingRules:
     def __init__(
@@ -298,9 +314,15 @@ class Match:
                 raise InvalidFingerprintingConfig("Unknown matcher '%s'" % key)
         self.pattern = pattern
         self.negated = negated
-
-    @property
-    def match_group(self):
+        self.signature = (self.key, self.pattern, self.negated)
+        self.match_group = self._get_match_group()
+        # Precomputed forms of the pattern, so that matching does not have to
+        # parse it again for every value.
+        self._flags = frozenset(pattern.split(","))
+        self._rule_bool = get_rule_bool(pattern)
+        self._is_literal = not (GLOB_CHARACTERS & set(pattern))
+
+    def _get_match_group(self):
         if self.key == "message":
             return "toplevel"
         if self.key in ("logger", "level"):
@@ -358,19 +380,20 @@ class Match:
         elif self.key == "package":
             if self._positive_path_match(value):
                 return True
-        elif self.key == "family":
-            flags = self.pattern.split(",")
-            if "all" in flags or value in flags:
-                return True
-        elif self.key == "sdk":
-            flags = self.pattern.split(",")
-            if "all" in flags or value in flags:
+        elif self.key in ("family", "sdk"):
+            if "all" in self._flags or value in self._flags:
                 return True
         elif self.key == "app":
-            ref_val = get_rule_bool(self.pattern)
+            ref_val = self._rule_bool
             if ref_val is not None and ref_val == value:
                 return True
-        elif glob_match(value, self.pattern, ignorecase=self.key in ("level", "value")):
+        elif self.key in ("level", "value"):
+            if glob_match(value, self.pattern, ignorecase=True):
+                return True
+        elif self._is_literal and isinstance(value, str):
+            # A case-sensitive pattern without wildcards only matches itself.
+            return value == self.pattern
+        elif glob_match(value, self.pattern):
             return True
         return False
 
@@ -406,14 +429,14 @@ class Rule:
         self.attributes = attributes
         self.is_builtin = is_builtin
 
-    def get_fingerprint_values_for_event_access(self, access):
-        by_match_group = {}
-        for matcher in self.matchers:
-            by_match_group.setdefault(matcher.match_group, []).append(matcher)
+        self.matchers_by_match_group = {}
+        for matcher in matchers:
+            self.matchers_by_match_group.setdefault(matcher.match_group, []).append(matcher)
 
-        for match_group, matchers in by_match_group.items():
-            for values in access.get_values(match_group):
-                if all(x.matches(values) for x in matchers):
+    def get_fingerprint_values_for_event_access(self, access):
+        for match_group, matchers in self.matchers_by_match_group.items():
+            for index, values in enumerate(access.get_values(match_group)):
+                if all(access.matches(x, match_group, index, values) for x in matchers):
                     break
             else:
                 return
@@ -321,6 +321,48 @@ def _calculate_primary_hash(
     return _calculate_event_grouping(project, job["event"], grouping_config)
 
 
+def get_or_create_grouphashes(project: Project, hashes: Sequence[str]) -> list[GroupHash]:
+    """
+    Get or create the `GroupHash` rows for all of the given hashes, in the order of `hashes`.
+
+    Existing rows are fetched with a single query, and only the missing ones are inserted, in a
+    single statement. Conflicting inserts from concurrent processes are ignored, and the rows they
+    created are picked up by a second lookup.
+
+    This only batches the hashes of a single event: `EventManager.save` is called once per event,
+    so hashes are not deduplicated across events and every event still takes its own row locks
+    when a group is assigned.
+    """
+    unique_hashes = list(dict.fromkeys(hashes))
+    grouphashes = {
+        gh.hash: gh for gh in GroupHash.objects.filter(project=project, hash__in=unique_hashes)
+    }
+
+    missing_hashes = [hash for hash in unique_hashes if hash not in grouphashes]
+    if missing_hashes:
+        GroupHash.objects.bulk_create(
+            [GroupHash(project=project, hash=hash) for hash in missing_hashes],
+            ignore_conflicts=True,
+        )
+        # `ignore_conflicts` means the created objects don't get their primary keys back.
+        grouphashes.update(
+            (gh.hash, gh)
+            for gh in GroupHash.objects.filter(project=project, hash__in=missing_hashes)
+        )
+
+    metrics.incr(
+        "grouping.grouphashes.get_or_create",
+        amount=len(unique_hashes) - len(missing_hashes),
+        tags={"created": "false"},
+    )
+    metrics.incr(
+        "grouping.grouphashes.get_or_create",
+        amount=len(missing_hashes),
+        tags={"created": "true"},
+    )
+    return [grouphashes[hash] for hash in hashes]
+
+
 def find_existing_grouphash(
     project: Project,
     flat_grouphashes: Sequence[GroupHash],
@@ -143,11 +143,11 @@ def process_event(
         # If we only want to reprocess "stuck" events, we check if this event is already in the
         # `processing_store`. We only continue here if the event *is* present, as that will eventually
         # process and consume the event from the `processing_store`, whereby getting it "unstuck".
-        if reprocess_only_stuck_events and not event_processing_store.exists(data):
+        if reprocess_only_stuck_events and not event_processing_store.exists(data, stage="ingest"):
             return
 
         with metrics.timer("ingest_consumer._store_event"):
-            cache_key = event_processing_store.store(data)
+            cache_key = event_processing_store.store(data, stage="ingest")
 
         try:
             # Records rc-processing usage broken down by
@@ -17,7 +17,7 @@ from sentry.ingest.transaction_clusterer.datasource import (
     TRANSACTION_SOURCE_URL,
 )
 from sentry.models.project import Project
-from sentry.utils import redis
+from sentry.utils import json, redis
 from sentry.utils.safe import safe_execute
 
 #: Maximum number of transaction names per project that we want
@@ -28,6 +28,9 @@ MAX_SET_SIZE = 4000
 #: Remove the set if it has not received any updates for 24 hours.
 SET_TTL = 24 * 60 * 60
 
+#: Retention of the clusterer tree carried over between clusterer runs.
+STATE_TTL = 7 * 24 * 60 * 60
+
 
 # TODO(iker): accept multiple values to add to the set. Right now, multiple
 # calls for each individual value are required, producing too many Redis calls.
@@ -46,6 +49,12 @@ def _get_projects_key(namespace: ClustererNamespace) -> str:
     return f"{prefix}:projects"
 
 
+def _get_state_key(namespace: ClustererNamespace, project: Project) -> str:
+    """The key for the clusterer tree of a project"""
+    prefix = namespace.value.data
+    return f"{prefix}:state:o:{project.organization_id}:p:{project.id}"
+
+
 def get_redis_client() -> RedisCluster:
     # XXX(iker): we may want to revisit the decision of having a single Redis cluster.
     cluster_key = settings.SENTRY_TRANSACTION_NAMES_REDIS_CLUSTER
@@ -102,6 +111,20 @@ def clear_samples(namespace: ClustererNamespace, project: Project) -> None:
     client.unlink(redis_key)
 
 
+def get_clusterer_state(namespace: ClustererNamespace, project: Project) -> Any | None:
+    """Return the clusterer tree stored by the previous run, if any"""
+    client = get_redis_client()
+    state = client.get(_get_state_key(namespace, project))
+    if state is None:
+        return None
+    return json.loads(state)
+
+
+def set_clusterer_state(namespace: ClustererNamespace, project: Project, state: Any) -> None:
+    client = get_redis_client()
+    client.set(_get_state_key(namespace, project), json.dumps(state), ex=STATE_TTL)
+
+
 def record_transaction_name(project: Project, event_data: Mapping[str, Any], **kwargs: Any) -> None:
     if transaction_name := _should_store_transaction_name(event_data):
         safe_execute(
@@ -1,11 +1,12 @@
 import logging
+import time
 from collections.abc import Sequence
 from itertools import islice
 from typing import Any
 
 import sentry_sdk
 
-from sentry import features
+from sentry import features, options
 from sentry.ingest.transaction_clusterer.base import ReplacementRule
 from sentry.models.project import Project
 from sentry.tasks.base import instrumented_task
@@ -39,6 +40,43 @@ PROJECTS_PER_TASK = 100
 #: this estimation for project batches instead.
 CLUSTERING_TIMEOUT_PER_PROJECT = 0.3
 
+#: Branches of the incremental clusterer tree that received no input for this
+#: long, in seconds, are dropped at the start of a run.
+TREE_MAX_AGE = 7 * 24 * 60 * 60
+
+
+def _run_clusterer(
+    namespace: ClustererNamespace, project: Project, inputs: list[str], merge_threshold: int
+) -> list[ReplacementRule]:
+    """Returns the rules for the given inputs.
+
+    In incremental mode, the inputs are added to the tree of the previous run,
+    which is stored again for the next one. The tree is aged before adding the
+    inputs, and only the rules that received input in this run are returned so
+    that rules without new samples expire.
+    """
+    if not options.get("txnames.clusterer.incremental"):
+        if len(inputs) < merge_threshold:
+            return []
+        clusterer = TreeClusterer(merge_threshold=merge_threshold)
+        clusterer.add_input(inputs)
+        return clusterer.get_rules()
+
+    state = redis.get_clusterer_state(namespace, project)
+    if state is None:
+        clusterer = TreeClusterer(merge_threshold=merge_threshold)
+    else:
+        clusterer = TreeClusterer.from_dict(state, merge_threshold=merge_threshold)
+    now = int(time.time())
+    clusterer.age(before=now - TREE_MAX_AGE)
+    clusterer.add_input(inputs, timestamp=now)
+    new_rules = clusterer.get_rules(since=now)
+    redis.set_clusterer_state(namespace, project, clusterer.to_dict())
+    metrics.distribution(
+        "txcluster.tree_size", len(clusterer), tags={"namespace": namespace.value.name}
+    )
+    return new_rules
+
 
 @instrumented_task(
     name="sentry.ingest.transaction_clusterer.tasks.spawn_clusterers",
@@ -74,11 +112,9 @@ def cluster_projects(projects: Sequence[Project]) -> None:
             with sentry_sdk.start_span(op="txcluster_project") as span:
                 span.set_data("project_id", project.id)
                 tx_names = list(redis.get_transaction_names(project))
-                new_rules = []
-                if len(tx_names) >= MERGE_THRESHOLD:
-                    clusterer = TreeClusterer(merge_threshold=MERGE_THRESHOLD)
-                    clusterer.add_input(tx_names)
-                    new_rules = clusterer.get_rules()
+                new_rules = _run_clusterer(
+                    ClustererNamespace.TRANSACTIONS, project, tx_names, MERGE_THRESHOLD
+                )
 
                 track_clusterer_run(ClustererNamespace.TRANSACTIONS, project)
 
@@ -158,17 +194,15 @@ def cluster_projects_span_descs(projects: Sequence[Project]) -> None:
             with sentry_sdk.start_span(op="span_descs-cluster") as span:
                 span.set_data("project_id", project.id)
                 descriptions = list(redis.get_span_descriptions(project))
-                new_rules = []
-                if len(descriptions) >= MERGE_THRESHOLD_SPANS:
-                    clusterer = TreeClusterer(merge_threshold=MERGE_THRESHOLD_SPANS)
-                    clusterer.add_input(descriptions)
-                    new_rules = clusterer.get_rules()
-                    # Span description rules must match a prefix in the string
-                    # (HTTP verb, domain...), but we only feed the URL path to
-                    # the clusterer to avoid scrubbing other tokens. The prefix
-                    # `**` in the glob ensures we match the prefix but we don't
-                    # scrub it.
-                    new_rules = [ReplacementRule(r) for r in new_rules]
+                new_rules = _run_clusterer(
+                    ClustererNamespace.SPANS, project, descriptions, MERGE_THRESHOLD_SPANS
+                )
+                # Span description rules must match a prefix in the string
+                # (HTTP verb, domain...), but we only feed the URL path to
+                # the clusterer to avoid scrubbing other tokens. The prefix
+                # `**` in the glob ensures we match the prefix but we don't
+                # scrub it.
+                new_rules = [ReplacementRule(r) for r in new_rules]
 
                 track_clusterer_run(ClustererNamespace.SPANS, project)
 
@@ -43,15 +43,31 @@ Resulting in the following replacement rules:
 
 The replacement rules are interpreted by Relay to match and replace `*`, and to match but ignore `**`.
 
+Nodes are merged while the input is added rather than in a separate pass, so
+high-cardinality subtrees are collapsed as soon as they cross the threshold and
+the tree only grows with the number of distinct patterns. Merging is monotonic
+(adding input never un-merges a node), which makes the incremental result
+identical to merging the complete tree at once. Rules are cached per node and
+only recomputed for subtrees that changed since the last call to `get_rules`,
+and the tree can be serialized to carry it over to the next clustering run.
+
+Every node remembers when it last received input. A tree carried over between
+runs is aged with `age` before new input is added: branches without recent
+input are dropped and the input counts decay, so old samples eventually leave
+the tree. `get_rules(since=...)` only returns the rules of merged nodes that
+received input since then.
+
 """
 
 import logging
-from collections import UserDict, defaultdict
-from collections.abc import Iterable
-from typing import TypeAlias, Union
+import time
+from collections.abc import Iterable, Mapping
+from typing import Any, TypeAlias, Union
 
 import sentry_sdk
 
+from sentry.utils import metrics
+
 from .base import Clusterer, ReplacementRule
 from .rule_validator import RuleValidator
 
@@ -72,40 +88,306 @@ SEP = "/"
 #: and we occasionally run into `RecursionError`s.
 MAX_DEPTH = 200
 
+#: Maximum number of nodes kept in the tree. Once exceeded, the branches with
+#: the fewest inputs are pruned until the tree is back at ``PRUNE_RATIO`` of
+#: this size.
+MAX_NODES = 100_000
+
+#: Fraction of ``MAX_NODES`` the tree is pruned down to.
+PRUNE_RATIO = 0.75
+
+#: Version of the serialization format produced by `TreeClusterer.to_dict`.
+STATE_VERSION = 2
+
+#: Index of the root node.
+ROOT = 0
+
 
 logger = logging.getLogger(__name__)
 
+#: Represents the edges between graph nodes. These edges serve as keys in the
+#: children dictionaries.
+Edge: TypeAlias = Union[str, Merged]
+
 
 class TreeClusterer(Clusterer):
-    def __init__(self, *, merge_threshold: int) -> None:
+    """Incremental clusterer backed by a radix tree stored in parallel arrays.
+
+    Node ``i`` is described by ``_children[i]`` (edge to child index),
+    ``_counts[i]`` (number of inputs that passed through the node),
+    ``_seen[i]`` (timestamp of the last input that passed through the node) and
+    ``_suffixes[i]`` (cached rule paths below the node, ``None`` when the
+    subtree changed). Indices of removed nodes are recycled.
+    """
+
+    def __init__(self, *, merge_threshold: int, max_nodes: int = MAX_NODES) -> None:
         self._merge_threshold = merge_threshold
-        self._tree = Node()
+        self._max_nodes = max_nodes
+        self._children: list[dict[Edge, int]] = []
+        self._counts: list[int] = []
+        self._seen: list[int] = []
+        self._suffixes: list[list[tuple[Edge, ...]] | None] = []
+        self._free: list[int] = []
+        self._new_node()
         self._rules: list[ReplacementRule] | None = None
 
-    def add_input(self, strings: Iterable[str]) -> None:
+    def __len__(self) -> int:
+        """Number of nodes in the tree."""
+        return len(self._children) - len(self._free)
+
+    def add_input(self, strings: Iterable[str], timestamp: int | None = None) -> None:
+        """Adds the strings to the tree, as received at ``timestamp`` (now by default)."""
+        if timestamp is None:
+            timestamp = int(time.time())
         for string in strings:
-            parts = string.split(SEP, maxsplit=MAX_DEPTH)
-            node = self._tree
-            for part in parts:
-                node = node.setdefault(part, Node())
-
-    def get_rules(self) -> list[ReplacementRule]:
-        """Computes the rules for the current tree."""
-        self._extract_rules()
+            self._insert(string.split(SEP, maxsplit=MAX_DEPTH), timestamp)
+            if len(self) > self._max_nodes:
+                self._prune(int(self._max_nodes * PRUNE_RATIO))
+
+    def get_rules(self, since: int | None = None) -> list[ReplacementRule]:
+        """Computes the rules for the current tree.
+
+        With ``since``, only the rules of merged nodes that received input at or
+        after that timestamp are returned.
+        """
+        if since is None:
+            self._extract_rules()
+        else:
+            self._extract_recent_rules(since)
         self._clean_rules()
         self._sort_rules()
 
         assert self._rules is not None  # Keep mypy happy
         return self._rules
 
+    def age(self, before: int) -> None:
+        """Drops the branches without input since ``before`` and halves the input counts.
+
+        Merged nodes whose children were all dropped become regular nodes again,
+        and are merged again once they receive enough distinct input.
+        """
+        stack = [ROOT]
+        while stack:
+            node = stack.pop()
+            self._counts[node] //= 2
+            children = self._children[node]
+            for edge, child in list(children.items()):
+                if self._seen[child] < before:
+                    del children[edge]
+                    self._release_subtree(child)
+                    self._suffixes[node] = None
+                else:
+                    stack.append(child)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serializes the tree so that a later run can continue from it."""
+        nodes: list[list[Any]] = []
+        index = {ROOT: 0}
+        queue = [ROOT]
+        for node in queue:
+            edges = []
+            for edge, child in self._children[node].items():
+                index[child] = len(queue)
+                queue.append(child)
+                edges.append([None if edge is MERGED else edge, index[child]])
+            nodes.append([self._counts[node], self._seen[node], edges])
+
+        return {
+            "version": STATE_VERSION,
+            "merge_threshold": self._merge_threshold,
+            "nodes": nodes,
+        }
+
+    @classmethod
+    def from_dict(
+        cls, data: Mapping[str, Any], *, merge_threshold: int, max_nodes: int = MAX_NODES
+    ) -> "TreeClusterer":
+        """Restores a tree produced by `to_dict`.
+
+        State written with a different format or threshold cannot be continued
+        and results in an empty tree.
+        """
+        clusterer = cls(merge_threshold=merge_threshold, max_nodes=max_nodes)
+        if data.get("version") != STATE_VERSION or data.get("merge_threshold") != merge_threshold:
+            return clusterer
+
+        nodes = data["nodes"]
+        clusterer._children = [
+            {MERGED if edge is None else edge: child for edge, child in edges}
+            for _, _, edges in nodes
+        ]
+        clusterer._counts = [count for count, _, _ in nodes]
+        clusterer._seen = [seen for _, seen, _ in nodes]
+        clusterer._suffixes = [None] * len(nodes)
+        if len(clusterer) > max_nodes:
+            clusterer._prune(int(max_nodes * PRUNE_RATIO))
+        return clusterer
+
+    def _new_node(self) -> int:
+        if self._free:
+            node = self._free.pop()
+            self._children[node] = {}
+            self._counts[node] = 0
+            self._seen[node] = 0
+            self._suffixes[node] = None
+            return node
+
+        self._children.append({})
+        self._counts.append(0)
+        self._seen.append(0)
+        self._suffixes.append(None)
+        return len(self._children) - 1
+
+    def _release(self, node: int) -> None:
+        self._children[node] = {}
+        self._suffixes[node] = None
+        self._free.append(node)
+
+    def _release_subtree(self, node: int) -> None:
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            stack.extend(self._children[node].values())
+            self._release(node)
+
+    def _insert(self, parts: list[str], timestamp: int) -> None:
+        node = ROOT
+        self._counts[node] += 1
+        self._seen[node] = max(self._seen[node], timestamp)
+        self._suffixes[node] = None
+        for part in parts:
+            children = self._children[node]
+            child = children.get(MERGED)
+            if child is None:
+                child = children.get(part)
+                if child is None:
+                    child = children[part] = self._new_node()
+                    if len(children) >= self._merge_threshold:
+                        child = self._collapse(node)
+            node = child
+            self._counts[node] += 1
+            self._seen[node] = max(self._seen[node], timestamp)
+            self._suffixes[node] = None
+
+    def _collapse(self, node: int) -> int:
+        """Replaces the children of ``node`` with a single merged child."""
+        first, *others = self._children[node].values()
+        self._children[node] = {MERGED: first}
+        for other in others:
+            self._fold(first, other)
+        return first
+
+    def _fold(self, target: int, source: int) -> None:
+        """Merges the subtree at ``source`` into ``target`` and releases it.
+
+        A node is merged if either side already was, or if the union of their
+        children reaches the threshold. The distinct children of a merged node
+        are at least the threshold, so this is the same result as merging the
+        union of the original subtrees.
+        """
+        stack = [(target, source)]
+        while stack:
+            target, source = stack.pop()
+            self._counts[target] += self._counts[source]
+            self._seen[target] = max(self._seen[target], self._seen[source])
+            self._suffixes[target] = None
+
+            groups: dict[Edge, list[int]] = {}
+            for children in (self._children[target], self._children[source]):
+                for edge, child in children.items():
+                    groups.setdefault(edge, []).append(child)
+            self._release(source)
+
+            if MERGED in groups or len(groups) >= self._merge_threshold:
+                merged = groups.pop(MERGED, [])
+                for nodes in groups.values():
+                    merged.extend(nodes)
+                groups = {MERGED: merged}
+
+            self._children[target] = {edge: nodes[0] for edge, nodes in groups.items()}
+            for first, *others in groups.values():
+                stack.extend((first, other) for other in others)
+
+    def _prune(self, max_nodes: int) -> None:
+        """Keeps the ``max_nodes`` nodes with the most inputs and compacts the arrays.
+
+        A node never has more inputs than its parent, so ranking by count and
+        then depth keeps every surviving node connected to the root.
+        """
+        order = []
+        queue = [(ROOT, 0)]
+        for node, depth in queue:
+            order.append((-self._counts[node], depth, node))
+            queue.extend((child, depth + 1) for child in self._children[node].values())
+        order.sort()
+        keep = {node for _, _, node in order[:max_nodes]}
+
+        index = {ROOT: 0}
+        kept = [ROOT]
+        children: list[dict[Edge, int]] = []
+        for node in kept:
+            edges = {}
+            for edge, child in self._children[node].items():
+                if child in keep:
+                    index[child] = len(kept)
+                    kept.append(child)
+                    edges[edge] = index[child]
+            children.append(edges)
+
+        metrics.incr("txcluster.pruned_nodes", amount=len(self) - len(kept), sample_rate=1.0)
+
+        self._children = children
+        self._counts = [self._counts[node] for node in kept]
+        self._seen = [self._seen[node] for node in kept]
+        self._suffixes = [None] * len(kept)
+        self._free = []
+
     def _extract_rules(self) -> None:
-        """Merge high-cardinality nodes in the graph and extract rules"""
+        """Extract rules from the merged nodes, revisiting only changed subtrees"""
         with sentry_sdk.start_span(op="cluster_merge"):
-            self._tree.merge(self._merge_threshold)
-
-        # Generate exactly 1 rule for every merge
-        rule_paths = [path for path in self._tree.paths() if path[-1] is MERGED]
-        self._rules = [self._build_rule(path) for path in rule_paths]
+            stack = [(ROOT, False)]
+            while stack:
+                node, expanded = stack.pop()
+                if self._suffixes[node] is not None:
+                    continue
+                children = self._children[node]
+                if not expanded:
+                    stack.append((node, True))
+                    stack.extend((child, False) for child in children.values())
+                    continue
+
+                # Generate exactly 1 rule for every merge
+                suffixes: list[tuple[Edge, ...]] = []
+                for edge, child in children.items():
+                    if edge is MERGED:
+                        suffixes.append((edge,))
+                    child_suffixes = self._suffixes[child]
+                    assert child_suffixes is not None  # Computed before the parent
+                    suffixes.extend((edge,) + suffix for suffix in child_suffixes)
+                self._suffixes[node] = suffixes
+
+        root_suffixes = self._suffixes[ROOT]
+        assert root_suffixes is not None
+        self._rules = [self._build_rule(path) for path in root_suffixes]
+
+    def _extract_recent_rules(self, since: int) -> None:
+        """Extract the rules of merged nodes that received input since ``since``.
+
+        A node never received input later than its parent, so only branches
+        with recent input are visited.
+        """
+        with sentry_sdk.start_span(op="cluster_merge"):
+            rules = []
+            stack: list[tuple[int, tuple[Edge, ...]]] = [(ROOT, ())]
+            while stack:
+                node, path = stack.pop()
+                for edge, child in self._children[node].items():
+                    if self._seen[child] < since:
+                        continue
+                    if edge is MERGED:
+                        rules.append(self._build_rule(path + (edge,)))
+                    stack.append((child, path + (edge,)))
+        self._rules = rules
 
     def _clean_rules(self) -> None:
         """Deletes the rules that are not valid."""
@@ -120,46 +402,7 @@ class TreeClusterer(Clusterer):
         self._rules.sort(key=len, reverse=True)
 
     @staticmethod
-    def _build_rule(path: list["Edge"]) -> ReplacementRule:
+    def _build_rule(path: Iterable[Edge]) -> ReplacementRule:
         path_str = SEP.join(["*" if isinstance(key, Merged) else key for key in path])
         path_str += "/**"
         return ReplacementRule(path_str)
-
-
-#: Represents the edges between graph nodes. These edges serve as keys in the
-#: node dictionary.
-Edge: TypeAlias = Union[str, Merged]
-
-
-class Node(UserDict):
-    """Keys in this dict are names of the children"""
-
-    def paths(self, ancestors: list[Edge] | None = None) -> Iterable[list[Edge]]:
-        """Collect all paths and subpaths through the graph"""
-        if ancestors is None:
-            ancestors = []
-        for name, child in self.items():
-            path = ancestors + [name]
-            yield path
-            yield from child.paths(ancestors=path)
-
-    def merge(self, merge_threshold: int) -> None:
-        """Recursively merge children of high-cardinality nodes"""
-        if len(self) >= merge_threshold:
-            merged_children = self._merge_nodes(self.values())
-            self.clear()
-            self[MERGED] = merged_children
-
-        for child in self.values():
-            child.merge(merge_threshold)
-
-    @classmethod
-    def _merge_nodes(cls, nodes: Iterable["Node"]) -> "Node":
-        children_by_name = defaultdict(list)
-        for node in nodes:
-            for name, child in node.items():
-                children_by_name[name].append(child)
-
-        return Node(
-            {name: cls._merge_nodes(children) for name, children in children_by_name.items()}
-        )
@@ -328,6 +328,12 @@ class SymbolicatorSession:
         wait = 0.5
 
         while True:
+            # Uploaded files are read while sending the request, rewind them
+            # for every attempt.
+            for file in (kwargs.get("files") or {}).values():
+                if hasattr(file, "seek"):
+                    file.seek(0)
+
             try:
                 with metrics.timer(
                     "events.symbolicator.session.request", tags={"attempt": attempts}
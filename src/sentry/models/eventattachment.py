@@ -15,7 +15,7 @@ from sentry.attachments.base import CachedAttachment
 from sentry.backup.scopes import RelocationScope
 from sentry.db.models import BoundedBigIntegerField, Model, region_silo_only_model, sane_repr
 from sentry.db.models.fields.bounded import BoundedIntegerField
-from sentry.models.files.utils import get_size_and_checksum, get_storage
+from sentry.models.files.utils import get_storage
 
 # Attachment file types that are considered a crash report (PII relevant)
 CRASH_REPORT_TYPES = ("event.minidump", "event.applecrashreport")
@@ -149,26 +149,39 @@ class EventAttachment(Model):
 
         content_type = normalize_content_type(attachment.content_type, attachment.name)
 
-        if len(attachment.data) == 0:
-            return PutfileResult(content_type=content_type, size=0, sha1=sha1().hexdigest())
-
-        blob = BytesIO(attachment.data)
-
         # NOTE: we still keep the old code around for a while before complete removing it
         store_blobs = True
 
         if store_blobs:
-            size, checksum = get_size_and_checksum(blob)
+            # Compress the attachment while streaming it from the attachment
+            # cache, only the compressed data is held in memory.
+            size = 0
+            checksum = sha1()
+            compressed_blob = BytesIO()
+            with zstandard.ZstdCompressor().stream_writer(compressed_blob, closefd=False) as writer:
+                for chunk in attachment.iter_chunks():
+                    size += len(chunk)
+                    checksum.update(chunk)
+                    writer.write(chunk)
+
+            if size == 0:
+                return PutfileResult(content_type=content_type, size=0, sha1=sha1().hexdigest())
+
             blob_path = "eventattachments/v1/" + FileBlob.generate_unique_path()
 
             storage = get_storage()
-            compressed_blob = BytesIO(zstandard.compress(attachment.data))
+            compressed_blob.seek(0)
             storage.save(blob_path, compressed_blob)
 
             return PutfileResult(
-                content_type=content_type, size=size, sha1=checksum, blob_path=blob_path
+                content_type=content_type, size=size, sha1=checksum.hexdigest(), blob_path=blob_path
             )
 
+        if len(attachment.data) == 0:
+            return PutfileResult(content_type=content_type, size=0, sha1=sha1().hexdigest())
+
+        blob = BytesIO(attachment.data)
+
         file = File.objects.create(
             name=attachment.name,
             type=attachment.type,
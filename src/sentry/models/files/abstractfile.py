@@ -1,12 +1,13 @@
 from __future__ import annotations
 
+import bisect
 import builtins
 import io
 import logging
 import mmap
 import os
 import tempfile
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import Future, ThreadPoolExecutor
 from hashlib import sha1
 from typing import ClassVar
 
@@ -27,12 +28,46 @@ from sentry.utils.db import atomic_transaction
 logger = logging.getLogger(__name__)
 
 
+# Number of blobs fetched concurrently ahead of the reader in streaming mode.
+STREAM_READAHEAD = 4
+
+
 class ChunkedFileBlobIndexWrapper:
-    def __init__(self, indexes, mode=None, prefetch=False, prefetch_to=None, delete=True):
+    """
+    File-like object over the blobs of a chunked file.
+
+    By default blobs are fetched one at a time as reading reaches them. With
+    `prefetch`, all blobs are fetched concurrently into a tempfile up front.
+    With `stream`, up to `readahead` blobs following the read position are
+    fetched concurrently while the caller consumes earlier ones; reads after a
+    seek only fetch the blobs overlapping the requested range, read-ahead
+    resumes once reading continues sequentially from there.
+    """
+
+    def __init__(
+        self,
+        indexes,
+        mode=None,
+        prefetch=False,
+        prefetch_to=None,
+        delete=True,
+        stream=False,
+        readahead=STREAM_READAHEAD,
+    ):
         # eager load from database incase its a queryset
         self._indexes = list(indexes)
         self._curfile = None
         self._curidx = None
+        self.streaming = stream and not prefetch
+        if self.streaming:
+            self._offsets = [idx.offset for idx in self._indexes]
+            self._size = self.size
+            self._readahead = max(readahead, 1)
+            self._executor: ThreadPoolExecutor | None = None
+            # blob position in `_indexes` -> future resolving to its contents
+            self._window: dict[int, Future[bytes]] = {}
+            self._pos = 0
+            self._last_read_end: int | None = 0
         if prefetch:
             self.prefetched = True
             self._prefetch(prefetch_to, delete)
@@ -114,8 +149,61 @@ class ChunkedFileBlobIndexWrapper:
             self._curfile.close()
         self._curfile = None
         self._curidx = None
+        if self.streaming:
+            self._discard_window()
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
         self.closed = True
 
+    @staticmethod
+    def _fetch_blob(getfile):
+        with getfile() as f:
+            return f.read()
+
+    def _discard_window(self, keep=range(0)):
+        for i in list(self._window):
+            if i not in keep:
+                self._window.pop(i).cancel()
+
+    def _fetch_window(self, first, stop):
+        """
+        Ensures that the blobs ``first`` up to (excluding) ``stop`` are being
+        fetched, but never more than `_readahead` at once.
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self._readahead)
+        window = range(first, min(stop, first + self._readahead))
+        self._discard_window(keep=window)
+        for i in window:
+            if i not in self._window:
+                self._window[i] = self._executor.submit(
+                    self._fetch_blob, self._indexes[i].blob.getfile
+                )
+
+    def _stream_read(self, n):
+        start = self._pos
+        end = self._size if n < 0 else min(start + n, self._size)
+        if start >= end:
+            return b""
+
+        # Read-ahead only pays off for sequential reads, otherwise only fetch
+        # the blobs overlapping the requested range.
+        sequential = start == self._last_read_end
+        first = bisect.bisect_right(self._offsets, start) - 1
+        last = bisect.bisect_right(self._offsets, end - 1) - 1
+        stop = len(self._indexes) if sequential else last + 1
+
+        result = bytearray()
+        for i in range(first, last + 1):
+            self._fetch_window(i, stop)
+            data = self._window[i].result()
+            offset = self._offsets[i]
+            result.extend(data[max(start - offset, 0) : end - offset])
+
+        self._pos = self._last_read_end = end
+        return bytes(result)
+
     def _seek(self, pos):
         if self.closed:
             raise ValueError("I/O operation on closed file")
@@ -124,6 +212,12 @@ class ChunkedFileBlobIndexWrapper:
             assert self._curfile is not None
             return self._curfile.seek(pos)
 
+        if self.streaming:
+            if pos < 0:
+                raise OSError("Invalid argument")
+            self._pos = pos
+            return pos
+
         if pos < 0:
             raise OSError("Invalid argument")
         if pos == 0 and not self._indexes:
@@ -158,6 +252,8 @@ class ChunkedFileBlobIndexWrapper:
         if self.prefetched:
             assert self._curfile is not None
             return self._curfile.tell()
+        if self.streaming:
+            return self._pos
         if self._curfile is None:
             return self.size
         assert self._curidx is not None
@@ -172,6 +268,9 @@ class ChunkedFileBlobIndexWrapper:
             assert self._curfile is not None
             return self._curfile.read(n)
 
+        if self.streaming:
+            return self._stream_read(n)
+
         result = bytearray()
 
         # Read to the end of the file
@@ -216,7 +315,9 @@ class AbstractFile(Model):
     DELETE_UNREFERENCED_BLOB_TASK: ClassVar[SentryTask]
     blobs: models.ManyToManyField
 
-    def _get_chunked_blob(self, mode=None, prefetch=False, prefetch_to=None, delete=True):
+    def _get_chunked_blob(
+        self, mode=None, prefetch=False, prefetch_to=None, delete=True, stream=False
+    ):
         return ChunkedFileBlobIndexWrapper(
             self.FILE_BLOB_INDEX_MODEL.objects.filter(file=self)
             .select_related("blob")
@@ -225,15 +326,18 @@ class AbstractFile(Model):
             prefetch=prefetch,
             prefetch_to=prefetch_to,
             delete=delete,
+            stream=stream,
         )
 
     @sentry_sdk.tracing.trace
-    def getfile(self, mode=None, prefetch=False):
+    def getfile(self, mode=None, prefetch=False, stream=False):
         """Returns a file object.  By default the file is fetched on
         demand but if prefetch is enabled the file is fully prefetched
-        into a tempfile before reading can happen.
+        into a tempfile before reading can happen.  If stream is enabled
+        blobs are fetched concurrently ahead of the read position, which
+        suits downloads and other mostly sequential reads.
         """
-        impl = self._get_chunked_blob(mode, prefetch)
+        impl = self._get_chunked_blob(mode, prefetch, stream=stream)
         return FileObj(impl, self.name)
 
     @sentry_sdk.tracing.trace
@@ -127,6 +127,32 @@ class ProjectOptionManager(OptionManager["ProjectOption"]):
 
         return self._option_cache.get(cache_key, {})
 
+    def preload_all_values(self, projects: Sequence[Project]) -> None:
+        """
+        Loads the options of many projects into the local cache at once, so
+        that subsequent calls to ``get_all_values`` do not need a roundtrip
+        per project.
+        """
+        cache_keys = {self._make_key(project.id): project.id for project in projects}
+        for cache_key in self._option_cache.keys() & cache_keys.keys():
+            del cache_keys[cache_key]
+        if not cache_keys:
+            return
+
+        for cache_key, result in cache.get_many(cache_keys.keys()).items():
+            if result is not None:
+                self._option_cache[cache_key] = result
+                del cache_keys[cache_key]
+        if not cache_keys:
+            return
+
+        results: dict[str, dict[str, Value]] = {cache_key: {} for cache_key in cache_keys}
+        for option in self.filter(project__in=cache_keys.values()):
+            results[self._make_key(option.project_id)][option.key] = option.value
+
+        cache.set_many(results)
+        self._option_cache.update(results)
+
     def reload_cache(self, project_id: int, update_reason: str) -> Mapping[str, Value]:
         from sentry.tasks.relay import schedule_invalidate_project_config
 
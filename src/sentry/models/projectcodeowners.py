@@ -60,6 +60,10 @@ class ProjectCodeOwners(Model):
         if code_owners is None:
             query = self.objects.filter(project_id=project_id).order_by("-date_added") or ()
             code_owners = self.merge_code_owners_list(code_owners_list=query) if query else query
+            if code_owners:
+                from sentry.models.projectownership import stamp_schema_cache_key
+
+                stamp_schema_cache_key(code_owners)
             cache.set(cache_key, code_owners, READ_CACHE_DURATION)
 
         return code_owners or None
@@ -2,8 +2,9 @@ from __future__ import annotations
 
 import enum
 import logging
-from collections.abc import Mapping, Sequence
+from collections.abc import Hashable, Mapping, Sequence
 from typing import TYPE_CHECKING, Any
+from uuid import uuid4
 
 from django.db import models
 from django.db.models.signals import post_delete, post_save
@@ -17,7 +18,7 @@ from sentry.models.activity import Activity
 from sentry.models.actor import ActorTuple
 from sentry.models.group import Group
 from sentry.models.groupowner import OwnerRuleType
-from sentry.ownership.grammar import Rule, load_schema, resolve_actors
+from sentry.ownership.grammar import Rule, load_compiled_schema, resolve_actors
 from sentry.types.activity import ActivityType
 from sentry.utils import metrics
 from sentry.utils.cache import cache
@@ -34,6 +35,34 @@ READ_CACHE_DURATION = 3600
 _Everyone = enum.Enum("_Everyone", "EVERYONE")
 
 
+def stamp_schema_cache_key(instance: ProjectOwnership | ProjectCodeOwners) -> None:
+    """
+    Give an instance a new key for its compiled schema.
+
+    Called whenever an instance is loaded into or written to the read cache, so
+    the key travels with it and changes with every save. `last_updated` is not
+    bumped on every schema change and can't be used instead.
+    """
+    instance.schema_cache_key = uuid4().hex
+
+
+def get_schema_cache_key(
+    *instances: ProjectOwnership | ProjectCodeOwners | None,
+) -> tuple[str, ...] | None:
+    """
+    The key `load_compiled_schema` caches the (combined) schema of these
+    instances under, or None if any of them has no key.
+    """
+    keys = tuple(
+        getattr(instance, "schema_cache_key", None)
+        for instance in instances
+        if instance is not None and instance.schema
+    )
+    if not keys or None in keys:
+        return None
+    return keys
+
+
 @region_silo_only_model
 class ProjectOwnership(Model):
     __relocation_scope__ = RelocationScope.Organization
@@ -98,6 +127,7 @@ class ProjectOwnership(Model):
         if ownership is None:
             try:
                 ownership = cls.objects.get(project_id=project_id)
+                stamp_schema_cache_key(ownership)
             except cls.DoesNotExist:
                 ownership = False
             cache.set(cache_key, ownership, READ_CACHE_DURATION)
@@ -124,9 +154,10 @@ class ProjectOwnership(Model):
             ownership = cls(project_id=project_id)
 
         codeowners = ProjectCodeOwners.get_codeowners_cached(project_id)
+        cache_key = get_schema_cache_key(ownership, codeowners)
         ownership.schema = cls.get_combined_schema(ownership, codeowners)
 
-        rules = cls._matching_ownership_rules(ownership, data)
+        rules = cls._matching_ownership_rules(ownership, data, cache_key)
 
         if not rules:
             return [], None
@@ -187,8 +218,14 @@ class ProjectOwnership(Model):
             if not ownership:
                 ownership = cls(project_id=project_id)
 
-            ownership_rules = cls._matching_ownership_rules(ownership, data)
-            codeowners_rules = cls._matching_ownership_rules(codeowners, data) if codeowners else []
+            ownership_rules = cls._matching_ownership_rules(
+                ownership, data, get_schema_cache_key(ownership)
+            )
+            codeowners_rules = (
+                cls._matching_ownership_rules(codeowners, data, get_schema_cache_key(codeowners))
+                if codeowners
+                else []
+            )
 
             if not (codeowners_rules or ownership_rules):
                 return []
@@ -372,21 +409,20 @@ class ProjectOwnership(Model):
         cls,
         ownership: ProjectOwnership | ProjectCodeOwners,
         data: Mapping[str, Any],
+        cache_key: Hashable | None = None,
     ) -> Sequence[Rule]:
-        rules = []
-
-        if ownership.schema is not None:
-            for rule in load_schema(ownership.schema):
-                if rule.test(data):
-                    rules.append(rule)
+        if ownership.schema is None:
+            return []
 
-        return rules
+        return load_compiled_schema(ownership.schema, cache_key).get_matching_rules(data)
 
 
 def process_resource_change(instance, change, **kwargs):
     from sentry.models.groupowner import GroupOwner
     from sentry.models.projectownership import ProjectOwnership
 
+    if change == "updated":
+        stamp_schema_cache_key(instance)
     cache.set(
         ProjectOwnership.get_cache_key(instance.project_id),
         instance if change == "updated" else None,
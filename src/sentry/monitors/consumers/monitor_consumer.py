@@ -1,9 +1,10 @@
 from __future__ import annotations
 
+import copy
 import logging
 import uuid
 from collections import defaultdict
-from collections.abc import Mapping
+from collections.abc import Iterable, Mapping
 from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime, timedelta
 from typing import Literal
@@ -17,11 +18,13 @@ from arroyo.processing.strategies.commit import CommitOffsets
 from arroyo.processing.strategies.run_task import RunTask
 from arroyo.types import BrokerValue, Commit, Message, Partition
 from django.db import router, transaction
+from django.db.models import Q
 from sentry_sdk.tracing import Span, Transaction
 
-from sentry import quotas, ratelimits
+from sentry import options, quotas, ratelimits
 from sentry.constants import DataCategory, ObjectStatus
 from sentry.killswitches import killswitch_matches_context
+from sentry.models.environment import Environment
 from sentry.models.project import Project
 from sentry.monitors.clock_dispatch import try_monitor_tasks_trigger
 from sentry.monitors.constants import PermitCheckInStatus
@@ -55,21 +58,146 @@ logger = logging.getLogger(__name__)
 CHECKIN_QUOTA_LIMIT = 6
 CHECKIN_QUOTA_WINDOW = 60
 
+#: Check-in statuses that close an in-progress check-in
+CLOSING_STATUSES = ("ok", "error")
+
+
+class PrefetchedMonitors:
+    """
+    Monitors and monitor environments for a batch of check-ins, resolved with
+    a few queries up front instead of one lookup per check-in.
+
+    Monitor environments are handed out once: processing a check-in updates
+    the environment in the database, so later check-ins of the same group
+    look it up again. Monitors are handed out as copies, since check-in groups
+    are processed concurrently and processing a check-in may update the
+    monitor it was given.
+    """
+
+    def __init__(self, items: Iterable[CheckinItem]) -> None:
+        slugs_by_project: dict[int, set[str]] = defaultdict(set)
+        env_names_by_project: dict[int, set[str]] = defaultdict(set)
+        for item in items:
+            project_id = int(item.message["project_id"])
+            slugs_by_project[project_id].add(item.valid_monitor_slug)
+            env_names_by_project[project_id].add(item.payload.get("environment") or "production")
+
+        self.monitors: dict[tuple[int, str], Monitor] = {}
+        self.environments: dict[tuple[int, str], MonitorEnvironment] = {}
+        if not slugs_by_project:
+            return
+
+        query = Q()
+        for project_id, slugs in slugs_by_project.items():
+            query |= Q(project_id=project_id, slug__in=slugs)
+        for monitor in Monitor.objects.filter(query):
+            self.monitors[(monitor.project_id, monitor.slug)] = monitor
+        if not self.monitors:
+            return
+
+        env_names_by_org: dict[int, set[str]] = defaultdict(set)
+        for monitor in self.monitors.values():
+            env_names_by_org[monitor.organization_id] |= env_names_by_project[monitor.project_id]
+        query = Q()
+        for organization_id, names in env_names_by_org.items():
+            query |= Q(organization_id=organization_id, name__in=names)
+        env_names = dict(Environment.objects.filter(query).values_list("id", "name"))
+
+        monitors_by_id = {monitor.id: monitor for monitor in self.monitors.values()}
+        for monitor_environment in MonitorEnvironment.objects.filter(
+            monitor_id__in=monitors_by_id, environment_id__in=env_names
+        ):
+            monitor_environment.monitor = monitors_by_id[monitor_environment.monitor_id]
+            key = (monitor_environment.monitor_id, env_names[monitor_environment.environment_id])
+            self.environments[key] = monitor_environment
+
+    def get_monitor(self, project: Project, monitor_slug: str) -> Monitor | None:
+        monitor = self.monitors.get((project.id, monitor_slug))
+        if monitor is None or monitor.organization_id != project.organization_id:
+            return None
+        return copy.deepcopy(monitor)
+
+    def take_environment(
+        self, monitor: Monitor, environment_name: str | None
+    ) -> MonitorEnvironment | None:
+        monitor_environment = self.environments.pop(
+            (monitor.id, environment_name or "production"), None
+        )
+        if monitor_environment is not None:
+            monitor_environment.monitor = monitor
+        return monitor_environment
+
+
+def collapse_checkin_pairs(items: list[CheckinItem]) -> list[CheckinItem]:
+    """
+    Collapses an in-progress check-in with the closing check-in for the same
+    guid when both are part of the same group, so that only a single
+    check-in is written and the monitor environment is updated once for the
+    pair. The collapsed check-in takes the place of the closing check-in.
+
+    Pairs are not collapsed across check-ins that update the latest
+    in-progress check-in, since those may close the in-progress check-in of
+    the pair. The implicit duration of the closing check-in must be valid.
+    """
+    collapsed: list[CheckinItem | None] = []
+    open_checkins: dict[str, int] = {}
+
+    for item in items:
+        check_in_id = item.payload.get("check_in_id")
+        if not _is_explicit_guid(check_in_id):
+            open_checkins.clear()
+            collapsed.append(item)
+            continue
+
+        index = open_checkins.pop(check_in_id, None)
+        if index is not None and item.payload.get("status") in CLOSING_STATUSES:
+            in_progress = collapsed[index]
+            assert in_progress is not None
+            duration = int(
+                (float(item.message["start_time"]) - float(in_progress.message["start_time"]))
+                * 1000
+            )
+            if item.payload.get("duration") is not None or valid_duration(abs(duration)):
+                if not item.payload.get("monitor_config") and in_progress.payload.get(
+                    "monitor_config"
+                ):
+                    item.payload["monitor_config"] = in_progress.payload["monitor_config"]
+                item.collapsed_in_progress = in_progress
+                collapsed[index] = None
+                metrics.incr("monitors.checkin.collapsed")
+
+        if item.payload.get("status") == "in_progress":
+            open_checkins[check_in_id] = len(collapsed)
+        collapsed.append(item)
+
+    return [item for item in collapsed if item is not None]
+
+
+def _is_explicit_guid(check_in_id: str | None) -> bool:
+    try:
+        return check_in_id is not None and uuid.UUID(check_in_id).int != 0
+    except ValueError:
+        return False
+
 
 def _ensure_monitor_with_config(
     project: Project,
     monitor_slug: str,
     config: Mapping | None,
     quotas_outcome: PermitCheckInStatus,
+    prefetched: PrefetchedMonitors | None = None,
 ):
-    try:
-        monitor = Monitor.objects.get(
-            slug=monitor_slug,
-            project_id=project.id,
-            organization_id=project.organization_id,
-        )
-    except Monitor.DoesNotExist:
-        monitor = None
+    monitor = prefetched.get_monitor(project, monitor_slug) if prefetched else None
+
+    if monitor is None:
+        try:
+            monitor = Monitor.objects.get(
+                slug=monitor_slug,
+                project_id=project.id,
+                organization_id=project.organization_id,
+            )
+        except Monitor.DoesNotExist:
+            monitor = None
 
     if not config:
         return monitor
@@ -339,7 +467,11 @@ def update_existing_check_in(
     existing_check_in.update(**updated_checkin)
 
 
-def _process_checkin(item: CheckinItem, txn: Transaction | Span):
+def _process_checkin(
+    item: CheckinItem,
+    txn: Transaction | Span,
+    prefetched: PrefetchedMonitors | None = None,
+):
     params = item.payload
 
     start_time = to_datetime(float(item.message["start_time"]))
@@ -351,6 +483,9 @@ def _process_checkin(item: CheckinItem, txn: Transaction | Span):
 
     project = Project.objects.get_from_cache(id=project_id)
 
+    # A collapsed in-progress check-in shares the outcome of its closing check-in
+    outcome_quantity = 1 if item.collapsed_in_progress is None else 2
+
     # Strip sdk version to reduce metric cardinality
     sdk_platform = source_sdk.split("/")[0] if source_sdk else "none"
 
@@ -368,6 +503,7 @@ def _process_checkin(item: CheckinItem, txn: Transaction | Span):
             reason="killswitch",
             timestamp=start_time,
             category=DataCategory.MONITOR,
+            quantity=outcome_quantity,
         )
         return
 
@@ -380,6 +516,7 @@ def _process_checkin(item: CheckinItem, txn: Transaction | Span):
             reason="rate_limited",
             timestamp=start_time,
             category=DataCategory.MONITOR,
+            quantity=outcome_quantity,
         )
         return
 
@@ -397,6 +534,7 @@ def _process_checkin(item: CheckinItem, txn: Transaction | Span):
             reason="over_quota",
             timestamp=start_time,
             category=DataCategory.MONITOR,
+            quantity=outcome_quantity,
         )
         return
 
@@ -416,6 +554,7 @@ def _process_checkin(item: CheckinItem, txn: Transaction | Span):
             reason="invalid_guid",
             timestamp=start_time,
             category=DataCategory.MONITOR,
+            quantity=outcome_quantity,
         )
         return
 
@@ -455,6 +594,7 @@ def _process_checkin(item: CheckinItem, txn: Transaction | Span):
             reason="invalid_check_in",
             timestamp=start_time,
             category=DataCategory.MONITOR,
+            quantity=outcome_quantity,
         )
         return
 
@@ -468,6 +608,7 @@ def _process_checkin(item: CheckinItem, txn: Transaction | Span):
             monitor_slug,
             monitor_config,
             quotas_outcome,
+            prefetched,
         )
     except MonitorLimitsExceeded:
         metrics.incr(
@@ -487,6 +628,7 @@ def _process_checkin(item: CheckinItem, txn: Transaction | Span):
             reason="monitor_limit_exceeded",
             timestamp=start_time,
             category=DataCategory.MONITOR,
+            quantity=outcome_quantity,
         )
         return
 
@@ -508,6 +650,7 @@ def _process_checkin(item: CheckinItem, txn: Transaction | Span):
             reason="invalid_monitor",
             timestamp=start_time,
             category=DataCategory.MONITOR,
+            quantity=outcome_quantity,
         )
         return
 
@@ -525,6 +668,7 @@ def _process_checkin(item: CheckinItem, txn: Transaction | Span):
             reason="over_quota",
             timestamp=start_time,
             category=DataCategory.MONITOR,
+            quantity=outcome_quantity,
         )
         return
 
@@ -548,15 +692,20 @@ def _process_checkin(item: CheckinItem, txn: Transaction | Span):
             reason="monitor_disabled",
             timestamp=start_time,
             category=DataCategory.MONITOR,
+            quantity=outcome_quantity,
         )
         return
 
     # 02
     # Retrieve or upsert monitor environment for this check-in
     try:
-        monitor_environment = MonitorEnvironment.objects.ensure_environment(
-            project, monitor, environment
-        )
+        monitor_environment = None
+        if prefetched is not None:
+            monitor_environment = prefetched.take_environment(monitor, environment)
+        if monitor_environment is None:
+            monitor_environment = MonitorEnvironment.objects.ensure_environment(
+                project, monitor, environment
+            )
     except MonitorEnvironmentLimitsExceeded:
         metrics.incr(
             "monitors.checkin.result",
@@ -580,6 +729,7 @@ def _process_checkin(item: CheckinItem, txn: Transaction | Span):
             reason="monitor_environment_limit_exceeded",
             timestamp=start_time,
             category=DataCategory.MONITOR,
+            quantity=outcome_quantity,
         )
         return
     except MonitorEnvironmentValidationFailed:
@@ -605,6 +755,7 @@ def _process_checkin(item: CheckinItem, txn: Transaction | Span):
             reason="invalid_monitor_environment",
             timestamp=start_time,
             category=DataCategory.MONITOR,
+            quantity=outcome_quantity,
         )
         return
 
@@ -662,6 +813,7 @@ def _process_checkin(item: CheckinItem, txn: Transaction | Span):
                             reason="monitor_environment_mismatch",
                             timestamp=start_time,
                             category=DataCategory.MONITOR,
+                            quantity=outcome_quantity,
                         )
                         return
 
@@ -683,7 +835,15 @@ def _process_checkin(item: CheckinItem, txn: Transaction | Span):
                 # Infer the original start time of the check-in from the duration.
                 # Note that the clock of this worker may be off from what Relay is reporting.
                 date_added = start_time
-                if duration is not None:
+                if item.collapsed_in_progress is not None:
+                    # Create the check-in as if the collapsed in-progress
+                    # check-in had been processed first.
+                    date_added = to_datetime(
+                        float(item.collapsed_in_progress.message["start_time"])
+                    )
+                    if duration is None:
+                        duration = abs(int((start_time - date_added).total_seconds() * 1000))
+                elif duration is not None:
                     date_added -= timedelta(milliseconds=duration)
 
                 # When was this check-in expected to have happened?
@@ -746,6 +906,7 @@ def _process_checkin(item: CheckinItem, txn: Transaction | Span):
                 reason=None,
                 timestamp=start_time,
                 category=DataCategory.MONITOR,
+                quantity=outcome_quantity,
             )
 
             # 04
@@ -791,7 +952,7 @@ def _process_checkin(item: CheckinItem, txn: Transaction | Span):
 _checkin_worker = ThreadPoolExecutor()
 
 
-def process_checkin(item: CheckinItem):
+def process_checkin(item: CheckinItem, prefetched: PrefetchedMonitors | None = None):
     """
     Process an individual check-in
     """
@@ -800,18 +961,18 @@ def process_checkin(item: CheckinItem):
             op="_process_checkin",
             name="monitors.monitor_consumer",
         ) as txn:
-            _process_checkin(item, txn)
+            _process_checkin(item, txn, prefetched)
     except Exception:
         logger.exception("Failed to process check-in")
 
 
-def process_checkin_group(items: list[CheckinItem]):
+def process_checkin_group(items: list[CheckinItem], prefetched: PrefetchedMonitors | None = None):
     """
     Process a group of related check-ins (all part of the same monitor)
     completely serially.
     """
     for item in items:
-        process_checkin(item)
+        process_checkin(item, prefetched)
 
 
 def process_batch(message: Message[ValuesBatch[KafkaPayload]]):
@@ -861,9 +1022,20 @@ def process_batch(message: Message[ValuesBatch[KafkaPayload]]):
 
     # Submit check-in groups for processing
     with sentry_sdk.start_transaction(op="process_batch", name="monitors.monitor_consumer"):
+        groups = list(checkin_mapping.values())
+        prefetched = None
+
+        # Resolve monitors and environments for the entire batch at once and
+        # collapse in-progress / closing check-in pairs within each group.
+        if options.get("crons.consumer.bulk-checkin-processing"):
+            groups = [collapse_checkin_pairs(group) for group in groups]
+            try:
+                prefetched = PrefetchedMonitors(item for group in groups for item in group)
+            except Exception:
+                logger.exception("Failed to prefetch monitors")
+
         futures = [
-            _checkin_worker.submit(process_checkin_group, group)
-            for group in checkin_mapping.values()
+            _checkin_worker.submit(process_checkin_group, group, prefetched) for group in groups
         ]
         wait(futures)
 
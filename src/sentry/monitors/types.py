@@ -1,3 +1,5 @@
+from __future__ import annotations
+
 from dataclasses import dataclass
 from datetime import datetime
 from typing import Literal, NotRequired, TypedDict, Union
@@ -66,6 +68,13 @@ class CheckinItem:
     the full check-in details.
     """
 
+    collapsed_in_progress: CheckinItem | None = None
+    """
+    An in-progress check-in for the same guid that was collapsed into this
+    closing check-in while batching. When set, the check-in is created as
+    if the in-progress check-in had been processed first.
+    """
+
     @cached_property
     def valid_monitor_slug(self):
         return slugify(self.payload["monitor_slug"])[:MAX_SLUG_LENGTH].strip("-")
@@ -1,14 +1,21 @@
 from __future__ import annotations
 
+import copy
+import logging
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from threading import local
 from typing import Any
 
 import sentry_sdk
+from django.conf import settings
 from django.core.cache import BaseCache, InvalidCacheBackendError, caches
 from django.utils.functional import cached_property
 
-from sentry.utils import json
+from sentry.eventstore.compressor import assemble, deduplicate, get_checksums
+from sentry.nodestore.cache import NodeCacheTier, SharedNodeCacheTier, get_local_node_cache
+from sentry.utils import json, metrics
 from sentry.utils.services import Service
 
 # Cache an instance of the encoder we want to use
@@ -26,6 +33,21 @@ json_dumps = json.JSONEncoder(
 
 json_loads = json.loads
 
+logger = logging.getLogger(__name__)
+
+# Prefix of the ids of content-addressed nodes written by deduplication.
+DEDUP_NODE_PREFIX = "dedup:"
+
+# Subkey of a shared node holding the unix timestamp it expires at.
+DEDUP_EXPIRY_SUBKEY = "expires_at"
+
+# Shared nodes are written with this much more than the TTL of the node
+# referencing them, so that writes shortly after do not have to extend them.
+DEDUP_TTL_SLACK = timedelta(days=1)
+
+# Number of shared node expiries each thread remembers.
+DEDUP_EXPIRY_CACHE_SIZE = 10000
+
 
 class NodeStorage(local, Service):
     """
@@ -60,8 +82,28 @@ class NodeStorage(local, Service):
 
     This is used in reprocessing to store a snapshot of the event from multiple
     stages of the pipeline.
+
+    Reads of the default subkey go through a read-through cache made of
+    `cache_tiers`: an optional in-process LRU (``SENTRY_NODESTORE_LOCAL_CACHE``)
+    in front of the shared ``nodedata`` cache. Ids missing from every tier are
+    fetched with a single `_get_bytes_multi` call.
+
+    If ``nodestore.deduplication.interfaces`` is set, those interfaces of the
+    default subkey (see `sentry.eventstore.compressor`) are stored once as
+    separate nodes keyed by their checksum, and referenced from every node
+    containing them. Shared nodes record when they expire, and a write only
+    rewrites them when they would expire before the node referencing them.
+    This requires a backend that expires nodes by their TTL (`supports_ttl`);
+    writes without a TTL are deduplicated when the backend has a
+    `default_ttl`. Reads resolve the references transparently, `get_multi`
+    fetches every shared node once.
     """
 
+    #: Whether nodes expire after the TTL they are written with, or after
+    #: `default_ttl` when written without one, rather than through `cleanup`.
+    supports_ttl = False
+    default_ttl: timedelta | None = None
+
     __all__ = (
         "delete",
         "delete_multi",
@@ -146,8 +188,12 @@ class NodeStorage(local, Service):
             bytes_data = self._get_bytes(id)
             rv = self._decode(bytes_data, subkey=subkey)
             if subkey is None:
+                encoded = self._encoded_default(bytes_data)
+                if get_checksums(rv):
+                    rv = self._assemble_items({id: rv})[id]
+                    encoded = None
                 # set cache item only after we know decoding did not fail
-                self._set_cache_item(id, rv)
+                self._set_cache_item(id, rv, encoded=encoded)
 
             span.set_tag("result", "from_service")
             if bytes_data:
@@ -188,12 +234,16 @@ class NodeStorage(local, Service):
             else:
                 uncached_ids = id_list
 
-            items = {
-                id: self._decode(value, subkey=subkey)
-                for id, value in self._get_bytes_multi(uncached_ids).items()
-            }
+            bytes_items = self._get_bytes_multi(uncached_ids)
+            items = {id: self._decode(value, subkey=subkey) for id, value in bytes_items.items()}
             if subkey is None:
-                self._set_cache_items(items)
+                encoded = {id: self._encoded_default(value) for id, value in bytes_items.items()}
+                deduplicated_ids = [id for id, item in items.items() if get_checksums(item)]
+                if deduplicated_ids:
+                    items = self._assemble_items(items)
+                    for id in deduplicated_ids:
+                        encoded[id] = None
+                self._set_cache_items(items, encoded=encoded)
                 items.update(cache_items)
 
             span.set_tag("result", "from_service")
@@ -257,10 +307,136 @@ class NodeStorage(local, Service):
             span.set_tag("node_id", item_id)
             span.set_data("subkeys_count", len(data))
             cache_item = data.get(None)
+            deduplicated = self._deduplicate(cache_item, ttl=ttl)
+            if deduplicated is not cache_item:
+                data = {**data, None: deduplicated}
             bytes_data = self._encode(data)
             self._set_bytes(item_id, bytes_data, ttl=ttl)
             # set cache only after encoding and write to nodestore has succeeded
-            self._set_cache_item(item_id, cache_item)
+            self._set_cache_item(
+                item_id,
+                cache_item,
+                encoded=(self._encoded_default(bytes_data) if deduplicated is cache_item else None),
+            )
+
+    def _deduplicate(self, data: Any, ttl: timedelta | None = None) -> Any:
+        """
+        Writes the deduplicated parts of `data` as separate nodes and returns the
+        data referencing them, or `data` itself if nothing was deduplicated.
+
+        A shared node is only written if it is missing or expires before the
+        node referencing it, and then with the TTL of that node plus
+        `DEDUP_TTL_SLACK`. Its expiry only ever grows, so it outlives every
+        node referencing it.
+        """
+        from sentry import options
+
+        interfaces = options.get("nodestore.deduplication.interfaces")
+        if not interfaces or not self.supports_ttl or not isinstance(data, dict):
+            return data
+
+        ttl = ttl or self.default_ttl
+        if ttl is None:
+            return data
+
+        deduplicated, extra_keys = deduplicate(
+            dict(data),
+            interfaces=interfaces,
+            min_size=options.get("nodestore.deduplication.min-size"),
+        )
+        if not extra_keys:
+            return data
+
+        now = time.time()
+        expires_at = now + ttl.total_seconds()
+        nodes = {DEDUP_NODE_PREFIX + checksum: value for checksum, value in extra_keys.items()}
+        expiries = self._dedup_expiries
+
+        unknown = [node_id for node_id in nodes if expiries.get(node_id, 0) < expires_at]
+        if unknown:
+            for node_id, value in self._get_bytes_multi(unknown).items():
+                stored = self._decode(value, subkey=DEDUP_EXPIRY_SUBKEY)
+                if stored is not None:
+                    self._remember_expiry(node_id, stored)
+
+        node_ttl = ttl + DEDUP_TTL_SLACK
+        for node_id, value in nodes.items():
+            if expiries.get(node_id, 0) >= expires_at:
+                metrics.incr("nodestore.dedup.node", tags={"written": "false"})
+                continue
+
+            bytes_data = self._encode(
+                {None: value, DEDUP_EXPIRY_SUBKEY: now + node_ttl.total_seconds()}
+            )
+            self._set_bytes(node_id, bytes_data, ttl=node_ttl)
+            self._set_cache_item(node_id, value, encoded=self._encoded_default(bytes_data))
+            self._remember_expiry(node_id, now + node_ttl.total_seconds())
+            metrics.incr("nodestore.dedup.node", tags={"written": "true"})
+
+        return deduplicated
+
+    @cached_property
+    def _dedup_expiries(self) -> OrderedDict[str, float]:
+        # Lower bounds of the expiry of shared nodes, per thread.
+        return OrderedDict()
+
+    def _remember_expiry(self, node_id: str, expires_at: float) -> None:
+        expiries = self._dedup_expiries
+        expiries[node_id] = max(expires_at, expiries.get(node_id, 0))
+        expiries.move_to_end(node_id)
+        while len(expiries) > DEDUP_EXPIRY_CACHE_SIZE:
+            expiries.popitem(last=False)
+
+    def _assemble_items(self, items: dict[str, Any]) -> dict[str, Any]:
+        """
+        Resolves the references to deduplicated nodes in `items`, fetching every
+        referenced node once.
+        """
+        node_ids = list(
+            {
+                DEDUP_NODE_PREFIX + checksum: None
+                for item in items.values()
+                for checksum in get_checksums(item)
+            }
+        )
+        nodes = self._get_cache_items(node_ids)
+        missing_ids = [node_id for node_id in node_ids if node_id not in nodes]
+        if missing_ids:
+            fetched = {
+                node_id: self._decode(value, subkey=None)
+                for node_id, value in self._get_bytes_multi(missing_ids).items()
+                if value is not None
+            }
+            self._set_cache_items(fetched)
+            nodes.update(fetched)
+            missing = [node_id for node_id in missing_ids if node_id not in nodes]
+            if missing:
+                metrics.incr("nodestore.dedup.missing_node", amount=len(missing))
+                logger.error(
+                    "nodestore.dedup.missing_node",
+                    extra={
+                        "node_ids": missing,
+                        "item_ids": [
+                            id
+                            for id, item in items.items()
+                            if any(
+                                DEDUP_NODE_PREFIX + checksum in missing
+                                for checksum in get_checksums(item)
+                            )
+                        ],
+                    },
+                )
+
+        extra_keys = {node_id[len(DEDUP_NODE_PREFIX) :]: value for node_id, value in nodes.items()}
+
+        def get_extra_keys(checksums: list[str]) -> dict[str, Any]:
+            # Items must not share (and mutate) the same objects.
+            return {c: copy.deepcopy(extra_keys[c]) for c in checksums if c in extra_keys}
+
+        return {
+            id: assemble(item, get_extra_keys) if get_checksums(item) else item
+            for id, item in items.items()
+        }
 
     def cleanup(self, cutoff_timestamp: datetime) -> None:
         raise NotImplementedError
@@ -268,31 +444,60 @@ class NodeStorage(local, Service):
     def bootstrap(self) -> None:
         raise NotImplementedError
 
+    @staticmethod
+    def _encoded_default(value: bytes | None) -> bytes | None:
+        """
+        Returns the JSON encoding of the default subkey of an encoded node.
+        """
+        if not value:
+            return None
+        return value.split(b"\n", 1)[0]
+
     def _get_cache_item(self, item_id: str) -> Any | None:
-        if self.cache:
-            return self.cache.get(item_id)
-        return None
+        return self._get_cache_items([item_id]).get(item_id)
 
     def _get_cache_items(self, id_list: list[str]) -> dict[str, Any]:
-        if self.cache:
-            return self.cache.get_many(id_list)
-        return {}
-
-    def _set_cache_item(self, item_id: str, data: Any) -> None:
-        if self.cache and data:
-            self.cache.set(item_id, data)
-
-    def _set_cache_items(self, items: dict[Any, Any]) -> None:
-        if self.cache:
-            self.cache.set_many(items)
+        items: dict[str, Any] = {}
+        missing = id_list
+        checked: list[NodeCacheTier] = []
+        for tier in self.cache_tiers:
+            if not missing:
+                break
+            found = tier.get_many(missing)
+            metrics.incr("nodestore.cache.hit", amount=len(found), tags={"tier": tier.name})
+            metrics.incr(
+                "nodestore.cache.miss", amount=len(missing) - len(found), tags={"tier": tier.name}
+            )
+            if found:
+                # Promote hits into the faster tiers that missed them.
+                for upper in checked:
+                    upper.set_many(found)
+                items.update(found)
+                missing = [id for id in missing if id not in found]
+            checked.append(tier)
+        return items
+
+    def _set_cache_item(self, item_id: str, data: Any, encoded: bytes | None = None) -> None:
+        if data:
+            self._set_cache_items(
+                {item_id: data}, encoded={item_id: encoded} if encoded is not None else None
+            )
+
+    def _set_cache_items(
+        self, items: dict[Any, Any], encoded: dict[str, bytes | None] | None = None
+    ) -> None:
+        if not items:
+            return
+        known_encoded = {id: data for id, data in (encoded or {}).items() if data is not None}
+        for tier in self.cache_tiers:
+            tier.set_many(items, encoded=known_encoded)
 
     def _delete_cache_item(self, item_id: str) -> None:
-        if self.cache:
-            self.cache.delete(item_id)
+        self._delete_cache_items([item_id])
 
     def _delete_cache_items(self, id_list: list[str]) -> None:
-        if self.cache:
-            self.cache.delete_many([item_id for item_id in id_list])
+        for tier in self.cache_tiers:
+            tier.delete_many(id_list)
 
     @cached_property
     def cache(self) -> BaseCache | None:
@@ -300,3 +505,12 @@ class NodeStorage(local, Service):
             return caches["nodedata"]
         except InvalidCacheBackendError:
             return None
+
+    @cached_property
+    def cache_tiers(self) -> list[NodeCacheTier]:
+        tiers: list[NodeCacheTier] = []
+        if settings.SENTRY_NODESTORE_LOCAL_CACHE:
+            tiers.append(get_local_node_cache(**settings.SENTRY_NODESTORE_LOCAL_CACHE))
+        if self.cache:
+            tiers.append(SharedNodeCacheTier(self.cache))
+        return tiers
@@ -34,6 +34,7 @@ class BigtableNodeStorage(NodeStorage):
     """
 
     store_class = BigtableKVStorage
+    supports_ttl = True
 
     def __init__(
         self,
@@ -58,6 +59,7 @@ class BigtableNodeStorage(NodeStorage):
             compression=_compression,
             client_options=client_options,
         )
+        self.default_ttl = default_ttl
         self.automatic_expiry = automatic_expiry
         self.skip_deletes = automatic_expiry and "_SENTRY_CLEANUP" in os.environ
 
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import functools
+import threading
+import time
+from collections.abc import Callable, Mapping, Sequence
+from typing import Any
+
+from cachetools import TTLCache
+from django.core.cache import BaseCache
+
+
+class NodeCacheTier:
+    """
+    A single layer of the nodestore read-through cache. Tiers are consulted in
+    order, and hits from a lower tier are written back into the tiers above it.
+    """
+
+    name = "base"
+
+    def get_many(self, id_list: Sequence[str]) -> dict[str, Any]:
+        raise NotImplementedError
+
+    def set_many(
+        self, items: Mapping[str, Any], encoded: Mapping[str, bytes] | None = None
+    ) -> None:
+        """
+        Stores decoded nodes. `encoded` optionally carries the JSON encoding of
+        each node if the caller already has it at hand.
+        """
+        raise NotImplementedError
+
+    def delete_many(self, id_list: Sequence[str]) -> None:
+        raise NotImplementedError
+
+
+class SharedNodeCacheTier(NodeCacheTier):
+    """
+    The shared cache, backed by the ``nodedata`` Django cache.
+    """
+
+    name = "shared"
+
+    def __init__(self, cache: BaseCache):
+        self.cache = cache
+
+    def get_many(self, id_list: Sequence[str]) -> dict[str, Any]:
+        return self.cache.get_many(id_list)
+
+    def set_many(
+        self, items: Mapping[str, Any], encoded: Mapping[str, bytes] | None = None
+    ) -> None:
+        self.cache.set_many(items)
+
+    def delete_many(self, id_list: Sequence[str]) -> None:
+        self.cache.delete_many(list(id_list))
+
+
+class LocalNodeCacheTier(NodeCacheTier):
+    """
+    A bounded in-process LRU of nodes, keyed by node id. Entries expire after
+    `ttl` seconds and the cache evicts least recently used nodes once the size of
+    all entries exceeds `max_bytes`. Nodes larger than `max_item_bytes` are never
+    stored locally.
+
+    Nodes are kept JSON-encoded so that callers never share (and mutate) the same
+    decoded object, and so that sizes are exact.
+
+    The tier is shared by all threads of the process, see `get_local_node_cache`.
+    """
+
+    name = "local"
+
+    def __init__(
+        self,
+        max_bytes: int,
+        ttl: int,
+        max_item_bytes: int | None = None,
+        timer: Callable[[], float] = time.monotonic,
+    ):
+        if max_item_bytes is None:
+            max_item_bytes = max_bytes // 100
+        self.max_item_bytes = min(max_item_bytes, max_bytes)
+        self._lock = threading.Lock()
+        self._cache: TTLCache[str, bytes] = TTLCache(
+            maxsize=max_bytes, ttl=ttl, timer=timer, getsizeof=len
+        )
+
+    @property
+    def currsize(self) -> int:
+        with self._lock:
+            return int(self._cache.currsize)
+
+    def get_many(self, id_list: Sequence[str]) -> dict[str, Any]:
+        from sentry.nodestore.base import json_loads
+
+        with self._lock:
+            found = {id: self._cache.get(id) for id in id_list}
+        return {id: json_loads(data) for id, data in found.items() if data is not None}
+
+    def set_many(
+        self, items: Mapping[str, Any], encoded: Mapping[str, bytes] | None = None
+    ) -> None:
+        from sentry.nodestore.base import json_dumps
+
+        for id, value in items.items():
+            # Negative results are left to the shared tier.
+            if not value:
+                continue
+            data = encoded.get(id) if encoded else None
+            if data is None:
+                data = json_dumps(value).encode("utf8")
+            if len(data) > self.max_item_bytes:
+                continue
+            with self._lock:
+                self._cache[id] = data
+
+    def delete_many(self, id_list: Sequence[str]) -> None:
+        with self._lock:
+            for id in id_list:
+                self._cache.pop(id, None)
+
+
+@functools.cache
+def get_local_node_cache(
+    max_bytes: int, ttl: int, max_item_bytes: int | None = None
+) -> LocalNodeCacheTier:
+    """
+    `NodeStorage` instances are thread-local, so the in-process tier is kept in a
+    process-wide registry to share it between threads.
+    """
+    return LocalNodeCacheTier(max_bytes=max_bytes, ttl=ttl, max_item_bytes=max_item_bytes)
@@ -1 +1,2 @@
 from .backend import FileSystemNodeStorage  # NOQA
+from .segmented import SegmentedFileSystemNodeStorage  # NOQA
@@ -0,0 +1,272 @@
+from __future__ import annotations
+
+import mmap
+import os
+import sqlite3
+import struct
+import time
+import zlib
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import sentry_sdk
+from django.utils.functional import cached_property
+
+from sentry.nodestore.base import NodeStorage
+from sentry.utils.iterators import chunked
+
+# Every record starts with the length of the node id and the length of the
+# compressed payload, followed by the id itself. This makes segments
+# self-describing so that the index can be rebuilt from them.
+RECORD_HEADER = struct.Struct("<HI")
+
+# Stay well below SQLite's limit on host parameters per statement.
+INDEX_BATCH_SIZE = 500
+
+# How often, in seconds, readers close their mmaps of segments dropped by a
+# cleanup that ran in another thread or process.
+MMAP_CHECK_INTERVAL = 60
+
+
+class SegmentedFileSystemNodeStorage(NodeStorage):
+    """
+    A log-structured variant of `FileSystemNodeStorage`.
+
+    Nodes are compressed and appended to large segment files. A SQLite index
+    maps every node id to ``(segment, offset, length)``. Reads go through
+    ``mmap`` without copying the compressed payload, multi-gets resolve all ids
+    with one index query and read them in segment order, and `cleanup` drops
+    whole segments instead of unlinking one file per node.
+
+    A new segment is started once the active one grows beyond `segment_size`
+    bytes or becomes older than `segment_max_age` seconds. The age bounds how
+    long a node can outlive the cleanup cutoff.
+    """
+
+    def __init__(
+        self,
+        path: str | None = None,
+        segment_size: int = 64 * 1024 * 1024,
+        segment_max_age: int = 60 * 60,
+        compression_level: int = 6,
+    ):
+        if path:
+            self.path = os.path.abspath(os.path.expanduser(path))
+        else:
+            self.path = os.path.abspath(os.path.join(os.path.dirname(__file__), "./segments"))
+        self.segment_size = segment_size
+        self.segment_max_age = segment_max_age
+        self.compression_level = compression_level
+        self._mmaps: dict[int, mmap.mmap] = {}
+        self._mmaps_checked = time.monotonic()
+
+    @cached_property
+    def _index(self) -> sqlite3.Connection:
+        # `NodeStorage` is thread-local, so every thread gets its own connection.
+        os.makedirs(self.path, exist_ok=True)
+        conn = sqlite3.connect(os.path.join(self.path, "index.sqlite3"), timeout=30)
+        # Transactions are managed explicitly, see `_write_transaction`.
+        conn.isolation_level = None
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS segments (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                created REAL NOT NULL,
+                updated REAL NOT NULL,
+                size INTEGER NOT NULL
+            )
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS nodes (
+                id TEXT PRIMARY KEY,
+                segment INTEGER NOT NULL,
+                offset INTEGER NOT NULL,
+                length INTEGER NOT NULL
+            ) WITHOUT ROWID
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS nodes_segment ON nodes (segment)")
+        return conn
+
+    @contextmanager
+    def _write_transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Serializes writers across threads and processes: the index write lock is
+        held while appending to the active segment.
+        """
+        conn = self._index
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        else:
+            conn.execute("COMMIT")
+
+    def segment_path(self, segment: int) -> str:
+        return os.path.join(self.path, f"{segment:010d}.seg")
+
+    def _get_active_segment(self, conn: sqlite3.Connection, now: float, record_size: int) -> int:
+        row = conn.execute(
+            "SELECT id, created, size FROM segments ORDER BY id DESC LIMIT 1"
+        ).fetchone()
+        if row is not None:
+            segment, created, size = row
+            if (
+                size == 0 or size + record_size <= self.segment_size
+            ) and now - created < self.segment_max_age:
+                return int(segment)
+
+        cursor = conn.execute(
+            "INSERT INTO segments (created, updated, size) VALUES (?, ?, 0)", (now, now)
+        )
+        assert cursor.lastrowid is not None
+        return cursor.lastrowid
+
+    @sentry_sdk.tracing.trace
+    def _set_bytes(self, id: str, data: bytes, ttl: timedelta | None = None) -> None:
+        id_bytes = id.encode("utf8")
+        payload = zlib.compress(data, self.compression_level)
+        record = RECORD_HEADER.pack(len(id_bytes), len(payload)) + id_bytes + payload
+        now = time.time()
+
+        with self._write_transaction() as conn:
+            segment = self._get_active_segment(conn, now, len(record))
+            with open(self.segment_path(segment), "ab") as f:
+                # The file, not the index, is the source of truth for the offset
+                # in case a previous append was interrupted before committing.
+                start = f.tell()
+                f.write(record)
+                end = f.tell()
+            conn.execute(
+                "INSERT OR REPLACE INTO nodes (id, segment, offset, length) VALUES (?, ?, ?, ?)",
+                (id, segment, start + RECORD_HEADER.size + len(id_bytes), len(payload)),
+            )
+            conn.execute(
+                "UPDATE segments SET size = ?, updated = ? WHERE id = ?", (end, now, segment)
+            )
+
+    def _map_segment(self, segment: int, end: int) -> mmap.mmap:
+        mapped = self._mmaps.get(segment)
+        if mapped is None or len(mapped) < end:
+            # The active segment grows, remap it once a read goes past the
+            # mapped length.
+            if mapped is not None:
+                mapped.close()
+            with open(self.segment_path(segment), "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._mmaps[segment] = mapped
+        return mapped
+
+    def _close_segment(self, segment: int) -> None:
+        mapped = self._mmaps.pop(segment, None)
+        if mapped is not None:
+            mapped.close()
+
+    def _close_dropped_segments(self) -> None:
+        """
+        Closes the mmaps of segments that are no longer in the index. Mmaps are
+        held per thread, a cleanup can only close those of its own thread and
+        the space of a removed segment is not freed while any mmap of it is open.
+        """
+        now = time.monotonic()
+        if not self._mmaps or now - self._mmaps_checked < MMAP_CHECK_INTERVAL:
+            return
+        self._mmaps_checked = now
+
+        held = list(self._mmaps)
+        live = set()
+        for batch in chunked(held, INDEX_BATCH_SIZE):
+            live.update(
+                row[0]
+                for row in self._index.execute(
+                    "SELECT id FROM segments WHERE id IN (%s)" % ", ".join("?" * len(batch)),
+                    batch,
+                ).fetchall()
+            )
+        for segment in held:
+            if segment not in live:
+                self._close_segment(segment)
+
+    def _read(self, segment: int, offset: int, length: int) -> bytes:
+        mapped = self._map_segment(segment, offset + length)
+        with memoryview(mapped) as view:
+            with view[offset : offset + length] as payload:
+                return zlib.decompress(payload)
+
+    def _get_bytes(self, id: str) -> bytes | None:
+        return self._get_bytes_multi([id])[id]
+
+    def _get_bytes_multi(self, id_list: list[str]) -> dict[str, bytes | None]:
+        self._close_dropped_segments()
+
+        rv: dict[str, bytes | None] = {id: None for id in id_list}
+        locations = []
+        for batch in chunked(rv.keys(), INDEX_BATCH_SIZE):
+            locations.extend(
+                self._index.execute(
+                    "SELECT id, segment, offset, length FROM nodes WHERE id IN (%s)"
+                    % ", ".join("?" * len(batch)),
+                    batch,
+                ).fetchall()
+            )
+
+        # Read in file order to keep page faults sequential.
+        for id, segment, offset, length in sorted(locations, key=lambda loc: loc[1:3]):
+            try:
+                rv[id] = self._read(segment, offset, length)
+            except FileNotFoundError:
+                # The segment has been dropped by a concurrent cleanup.
+                pass
+        return rv
+
+    def delete(self, id: str) -> None:
+        self.delete_multi([id])
+
+    def delete_multi(self, id_list: list[str]) -> None:
+        # Only the index entries are removed, their space is reclaimed when the
+        # segment is dropped.
+        with self._write_transaction() as conn:
+            for batch in chunked(id_list, INDEX_BATCH_SIZE):
+                conn.execute(
+                    "DELETE FROM nodes WHERE id IN (%s)" % ", ".join("?" * len(batch)), batch
+                )
+        self._delete_cache_items(id_list)
+
+    def cleanup(self, cutoff: datetime) -> None:
+        with self._write_transaction() as conn:
+            segments = [
+                row[0]
+                for row in conn.execute(
+                    "SELECT id FROM segments WHERE updated < ?", (cutoff.timestamp(),)
+                ).fetchall()
+            ]
+            node_ids = []
+            for batch in chunked(segments, INDEX_BATCH_SIZE):
+                placeholders = ", ".join("?" * len(batch))
+                node_ids.extend(
+                    row[0]
+                    for row in conn.execute(
+                        f"SELECT id FROM nodes WHERE segment IN ({placeholders})", batch
+                    ).fetchall()
+                )
+                conn.execute(f"DELETE FROM nodes WHERE segment IN ({placeholders})", batch)
+                conn.execute(f"DELETE FROM segments WHERE id IN ({placeholders})", batch)
+
+        for segment in segments:
+            self._close_segment(segment)
+            try:
+                os.remove(self.segment_path(segment))
+            except FileNotFoundError:
+                pass
+
+        self._delete_cache_items(node_ids)
+
+    def bootstrap(self) -> None:
+        # Creates the directory and the index schema.
+        self._index
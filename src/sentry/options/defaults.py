@@ -409,6 +409,30 @@ register(
     default=None,
     flags=FLAG_ALLOW_EMPTY | FLAG_PRIORITIZE_DISK | FLAG_AUTOMATOR_MODIFIABLE,
 )
+# Upload small replay recording segments in batches, packed into a single object per consumer
+# buffer flush.
+register(
+    "replay.storage.packed-uploads.enabled",
+    type=Bool,
+    default=False,
+    flags=FLAG_AUTOMATOR_MODIFIABLE,
+)
+# Segments larger than this many bytes are always uploaded as individual objects.
+register(
+    "replay.storage.packed-uploads.max-segment-size",
+    type=Int,
+    default=64 * 1024,
+    flags=FLAG_AUTOMATOR_MODIFIABLE,
+)
+# Look up the locations of packed segments when reading recordings. Must be set before packed
+# uploads are enabled, and stay set as long as packed objects are retained after they are disabled.
+# Deletions always look up the locations.
+register(
+    "replay.storage.packed-uploads.lookup-enabled",
+    type=Bool,
+    default=False,
+    flags=FLAG_AUTOMATOR_MODIFIABLE,
+)
 # Replay Analyzer service.
 register(
     "replay.analyzer_service_url",
@@ -713,6 +737,27 @@ register(
     "store.race-free-group-creation-force-disable", default=False, flags=FLAG_AUTOMATOR_MODIFIABLE
 )
 
+# Event interfaces that nodestore stores once per distinct value as separate,
+# content-addressed nodes, e.g. ["debug_meta", "modules"]. Empty disables it.
+register(
+    "nodestore.deduplication.interfaces",
+    default=[],
+    type=Sequence,
+    flags=FLAG_ALLOW_EMPTY | FLAG_AUTOMATOR_MODIFIABLE,
+)
+# Interfaces smaller than this many bytes (JSON-encoded) are stored inline.
+register("nodestore.deduplication.min-size", default=1024, flags=FLAG_AUTOMATOR_MODIFIABLE)
+
+# Coalesce TSDB counter increments and distinct counter records of saved events
+# in each ingest worker and write them in batches.
+register("tsdb.ingest-aggregation.enabled", default=False, flags=FLAG_AUTOMATOR_MODIFIABLE)
+register("tsdb.ingest-aggregation.window", default=1.0, flags=FLAG_AUTOMATOR_MODIFIABLE)
+register("tsdb.ingest-aggregation.max-entries", default=10000, flags=FLAG_AUTOMATOR_MODIFIABLE)
+
+# Seconds for which event frequency condition results are shared between events and
+# rules of the same group. 0 disables the cache.
+register("rules.condition-cache.ttl", default=0, flags=FLAG_AUTOMATOR_MODIFIABLE)
+
 # Option to enable dart deobfuscation on ingest
 register(
     "processing.view-hierarchies-dart-deobfuscation", default=0.0, flags=FLAG_AUTOMATOR_MODIFIABLE
@@ -986,6 +1031,9 @@ register("relay.metric-stats.rollout-rate", default=0.0, flags=FLAG_AUTOMATOR_MO
 # Write new kafka headers in eventstream
 register("eventstream:kafka-headers", default=True, flags=FLAG_AUTOMATOR_MODIFIABLE)
 
+# Serialize eventstream kafka messages with rapidjson
+register("eventstream:kafka-rapidjson", default=False, flags=FLAG_AUTOMATOR_MODIFIABLE)
+
 # Post process forwarder options
 # Gets data from Kafka headers
 register("post-process-forwarder:kafka-headers", default=True, flags=FLAG_AUTOMATOR_MODIFIABLE)
@@ -1175,6 +1223,25 @@ register(
     type=String,
     flags=FLAG_AUTOMATOR_MODIFIABLE,
 )
+# Run scheduled deletions through the set-based deletion planner.
+register("deletions.planner.enabled", type=Bool, default=False, flags=FLAG_AUTOMATOR_MODIFIABLE)
+# Seconds a single run of a deletion task may spend before it reschedules itself.
+register("deletions.planner.time-budget", type=Float, default=60.0, flags=FLAG_AUTOMATOR_MODIFIABLE)
+# Replication lag in seconds above which the planner backs off.
+register(
+    "deletions.planner.max-replication-lag",
+    type=Float,
+    default=10.0,
+    flags=FLAG_AUTOMATOR_MODIFIABLE,
+)
+register("deletions.planner.min-batch-size", type=Int, default=100, flags=FLAG_AUTOMATOR_MODIFIABLE)
+register(
+    "deletions.planner.max-batch-size", type=Int, default=10000, flags=FLAG_AUTOMATOR_MODIFIABLE
+)
+
+# Memoize feature checks for the lifetime of an API request or task.
+register("features.memoize-checks", default=False, flags=FLAG_AUTOMATOR_MODIFIABLE)
+
 # Brownout duration to be stored in ISO8601 format for durations (See https://en.wikipedia.org/wiki/ISO_8601#Durations)
 register("api.deprecation.brownout-duration", default="PT1M", flags=FLAG_AUTOMATOR_MODIFIABLE)
 
@@ -1760,6 +1827,8 @@ register("hybrid_cloud.rpc.disabled-service-methods", default=[], flags=FLAG_AUT
 register("txnames.bump-lifetime-sample-rate", default=0.1, flags=FLAG_AUTOMATOR_MODIFIABLE)
 # Decides whether an incoming span triggers an update of the clustering rule applied to it.
 register("span_descs.bump-lifetime-sample-rate", default=0.25, flags=FLAG_AUTOMATOR_MODIFIABLE)
+# Carry the clusterer tree over between clusterer runs and only feed it the new samples.
+register("txnames.clusterer.incremental", type=Bool, default=False, flags=FLAG_AUTOMATOR_MODIFIABLE)
 
 # === Backpressure related runtime options ===
 
@@ -1816,6 +1885,15 @@ register(
 # Killswitch for monitor check-ins
 register("crons.organization.disable-check-in", type=Sequence, default=[])
 
+# Resolve monitors for whole check-in batches and collapse in-progress / closing
+# check-in pairs in the monitor consumer
+register(
+    "crons.consumer.bulk-checkin-processing",
+    type=Bool,
+    default=False,
+    flags=FLAG_AUTOMATOR_MODIFIABLE,
+)
+
 # Turns on and off the running for dynamic sampling collect_orgs.
 register("dynamic-sampling.tasks.collect_orgs", default=False, flags=FLAG_MODIFIABLE_BOOL)
 
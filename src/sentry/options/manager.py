@@ -319,8 +319,10 @@ class OptionsManager:
                 except KeyError:
                     optval = opt.default()
         # options already present in store are cached by store
-        # caching here to avoid database queries
-        self.store.set_cache(opt, optval)
+        # caching here to avoid database queries. A snapshot already knows
+        # that the option is not stored.
+        if not self.store.snapshot_enabled:
+            self.store.set_cache(opt, optval)
         return optval
 
     def delete(self, key: str):
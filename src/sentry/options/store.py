@@ -2,8 +2,11 @@ from __future__ import annotations
 
 import dataclasses
 import logging
+from collections.abc import Iterable, Mapping
+from datetime import datetime, timedelta
 from random import random
 from time import time
+from types import MappingProxyType
 from typing import Any
 
 from django.conf import settings
@@ -16,6 +19,13 @@ from sentry.options.manager import UpdateChannel
 CACHE_FETCH_ERR = "Unable to fetch option cache for %s"
 CACHE_UPDATE_ERR = "Unable to update option cache for %s"
 
+# Cache key of the counter that is bumped whenever an option is written, so
+# that processes holding a snapshot know when to reload it.
+SNAPSHOT_VERSION_CACHE_KEY = "o:snapshot-version"
+# Options updated this long before the last snapshot check are reloaded as
+# well, to cover clock skew and writers that bump the version late.
+SNAPSHOT_RELOAD_MARGIN = timedelta(seconds=60)
+
 logger = logging.getLogger("sentry")
 
 
@@ -73,6 +83,18 @@ class OptionsStore:
         self.ttl = ttl
         self.flush_local_cache()
 
+        # In snapshot mode all options stored in the database are held in an
+        # immutable in-process mapping, see ``enable_snapshot``.
+        self._snapshot: Mapping[str, Any] | None = None
+        self._snapshot_version: int | None = None
+        self._snapshot_interval = 0
+        self._snapshot_checked_at = 0.0
+        self._snapshot_loaded_at: datetime | None = None
+
+    @property
+    def snapshot_enabled(self) -> bool:
+        return self._snapshot is not None
+
     @property
     def model(self):
         return self.model_cls()
@@ -90,6 +112,10 @@ class OptionsStore:
         """
         Fetches a value from the options store.
         """
+        if self._snapshot is not None:
+            self.maybe_refresh_snapshot()
+            return self._snapshot.get(key.name)
+
         result = self.get_cache(key, silent=silent)
         if result is not None:
             return result
@@ -234,6 +260,8 @@ class OptionsStore:
         assert self.cache is not None, "cache must be configured before mutating options"
 
         self.set_store(key, value, channel)
+        self._update_snapshot({key.name: value}, ())
+        self.bump_snapshot_version()
         return self.set_cache(key, value)
 
     def set_store(self, key, value, channel: UpdateChannel):
@@ -275,6 +303,8 @@ class OptionsStore:
         assert self.cache is not None, "cache must be configured before mutating options"
 
         self.delete_store(key)
+        self._update_snapshot({}, (key.name,))
+        self.bump_snapshot_version()
         return self.delete_cache(key)
 
     def delete_store(self, key):
@@ -343,5 +373,119 @@ class OptionsStore:
     def close(self) -> None:
         self.clean_local_cache()
 
+    def enable_snapshot(self, interval: int) -> bool:
+        """
+        Switches the store to snapshot mode.
+
+        All options stored in the database are loaded with a single query into
+        an immutable in-process mapping, which then serves all reads without
+        touching the network. At most once every ``interval`` seconds, the
+        store checks a version counter in the shared cache that is bumped on
+        every write, and reloads the options that changed if it moved.
+
+        Returns whether the snapshot could be loaded. If it could not, the
+        store keeps using the local cache.
+        """
+        self._snapshot_interval = interval
+        return self.load_snapshot()
+
+    def load_snapshot(self) -> bool:
+        version = self.get_snapshot_version()
+        loaded_at = timezone.now()
+        try:
+            with in_test_hide_transaction_boundary():
+                values = dict(self.model.objects.values_list("key", "value"))
+        except (ProgrammingError, OperationalError):
+            logger.warning("option.snapshot-failed", exc_info=True)
+            return False
+
+        self._snapshot = MappingProxyType(values)
+        self._snapshot_version = version
+        self._snapshot_loaded_at = loaded_at
+        self._snapshot_checked_at = time()
+        return True
+
+    def disable_snapshot(self) -> None:
+        self._snapshot = None
+        self._snapshot_version = None
+        self._snapshot_loaded_at = None
+
+    def maybe_refresh_snapshot(self) -> None:
+        now = time()
+        if now < self._snapshot_checked_at + self._snapshot_interval:
+            return
+        self._snapshot_checked_at = now
+
+        version = self.get_snapshot_version()
+        if version is not None and version == self._snapshot_version:
+            return
+
+        assert self._snapshot_loaded_at is not None
+        loaded_at = timezone.now()
+        try:
+            with in_test_hide_transaction_boundary():
+                changed = dict(
+                    self.model.objects.filter(
+                        last_updated__gte=self._snapshot_loaded_at - SNAPSHOT_RELOAD_MARGIN
+                    ).values_list("key", "value")
+                )
+                names = set(self.model.objects.values_list("key", flat=True))
+        except Exception:
+            # Keep serving the current snapshot, the next check retries.
+            logger.warning("option.snapshot-refresh-failed", exc_info=True)
+            return
+
+        deleted = [name for name in self._snapshot or () if name not in names]
+        self._update_snapshot(changed, deleted)
+        self._snapshot_version = version
+        self._snapshot_loaded_at = loaded_at
+
+        if version is None:
+            # The counter was evicted from the cache. Start it again so that
+            # the next check does not reload again.
+            self._init_snapshot_version()
+
+    def _update_snapshot(self, changed: Mapping[str, Any], deleted: Iterable[str]) -> None:
+        if self._snapshot is None:
+            return
+
+        # The mapping is replaced rather than mutated, so that concurrent
+        # readers always see a consistent snapshot.
+        values = dict(self._snapshot)
+        values.update(changed)
+        for name in deleted:
+            values.pop(name, None)
+        self._snapshot = MappingProxyType(values)
+
+    def get_snapshot_version(self) -> int | None:
+        if self.cache is None:
+            return None
+        try:
+            return self.cache.get(SNAPSHOT_VERSION_CACHE_KEY)
+        except Exception:
+            logger.warning(CACHE_FETCH_ERR, SNAPSHOT_VERSION_CACHE_KEY, exc_info=True)
+            return None
+
+    def bump_snapshot_version(self) -> None:
+        if self.cache is None:
+            return
+        try:
+            self.cache.incr(SNAPSHOT_VERSION_CACHE_KEY)
+        except ValueError:
+            # The counter does not exist yet
+            self._init_snapshot_version()
+        except Exception:
+            logger.warning(CACHE_UPDATE_ERR, SNAPSHOT_VERSION_CACHE_KEY, exc_info=True)
+
+    def _init_snapshot_version(self) -> None:
+        if self.cache is None:
+            return
+        try:
+            # Start from the current time rather than from zero, so that a
+            # counter that was evicted and restarted cannot match an old one.
+            self.cache.add(SNAPSHOT_VERSION_CACHE_KEY, int(time() * 1000), None)
+        except Exception:
+            logger.warning(CACHE_UPDATE_ERR, SNAPSHOT_VERSION_CACHE_KEY, exc_info=True)
+
     def set_cache_impl(self, cache) -> None:
         self.cache = cache
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
 import re
-from collections import namedtuple
-from collections.abc import Callable, Iterable, Mapping, Sequence
+import threading
+from collections import OrderedDict, namedtuple
+from collections.abc import Callable, Hashable, Iterable, Mapping, Sequence
 from typing import Any
 
+from django.utils.functional import cached_property
 from parsimonious.exceptions import ParseError
 from parsimonious.grammar import Grammar
 from parsimonious.nodes import Node, NodeVisitor
@@ -20,7 +22,7 @@ from sentry.utils.event_frames import find_stack_frames, get_sdk_name, munged_fi
 from sentry.utils.glob import glob_match
 from sentry.utils.safe import PathSearchable, get_path
 
-__all__ = ("parse_rules", "dump_schema", "load_schema")
+__all__ = ("parse_rules", "dump_schema", "load_schema", "load_compiled_schema")
 
 VERSION = 1
 
@@ -29,6 +31,10 @@ PATH = "path"
 MODULE = "module"
 CODEOWNERS = "codeowners"
 
+# Characters with a special meaning in glob patterns. A pattern without any of
+# them only matches itself.
+GLOB_CHARACTERS = frozenset("*?[]{}\\")
+
 # Grammar is defined in EBNF syntax.
 ownership_grammar = Grammar(
     rf"""
@@ -150,6 +156,24 @@ class Matcher(namedtuple("Matcher", "type pattern")):
             )
         return False
 
+    def test_event(self, event: OwnershipEventData) -> bool:
+        """
+        Like `test`, using values extracted from the event ahead of time.
+        """
+        if self.type == PATH:
+            return any(
+                glob_match(value, self.pattern, ignorecase=True, path_normalize=True)
+                for value in event.path_values
+            )
+        elif self.type == MODULE:
+            return any(
+                glob_match(value, self.pattern, ignorecase=True, path_normalize=True)
+                for value in event.module_values
+            )
+        elif self.type == CODEOWNERS:
+            return any(codeowners_match(value, self.pattern) for value in event.path_values)
+        return self.test(event.data)
+
     def test_url(self, data: PathSearchable) -> bool:
         if not isinstance(data, Mapping):
             return False
@@ -206,6 +230,82 @@ class Matcher(namedtuple("Matcher", "type pattern")):
         return False
 
 
+class OwnershipEventData:
+    """
+    The values of an event that matchers are tested against, extracted once per
+    event instead of once per rule.
+    """
+
+    def __init__(self, data: PathSearchable):
+        self.data = data
+
+    @staticmethod
+    def _frame_values(frames: Sequence[Mapping[str, Any]], keys: Sequence[str]) -> list[str]:
+        values = (frame.get(key) for frame in frames if isinstance(frame, Mapping) for key in keys)
+        return list(dict.fromkeys(value for value in values if value and isinstance(value, str)))
+
+    @cached_property
+    def path_values(self) -> list[str]:
+        return self._frame_values(*Matcher.munge_if_needed(self.data))
+
+    @cached_property
+    def module_values(self) -> list[str]:
+        return self._frame_values(find_stack_frames(self.data), ["module"])
+
+    @cached_property
+    def tags(self) -> set[tuple[str, str]]:
+        return {
+            (k, v) for k, v in get_path(self.data, "tags", filter=True) or () if isinstance(v, str)
+        }
+
+
+class CompiledOwnershipSchema:
+    """
+    The rules of an ownership schema, prepared for evaluating all of them
+    against an event in one pass.
+
+    Tag rules without wildcards are looked up by ``(tag, value)``. All other
+    matchers are tested against the event's values extracted once per event,
+    and matchers shared by several rules are only tested once.
+    """
+
+    def __init__(self, rules: Sequence[Rule]):
+        self.rules = rules
+        self._literal_tag_rules: dict[tuple[str, str], list[int]] = {}
+        self._tested_rules: list[int] = []
+
+        for index, rule in enumerate(rules):
+            matcher = rule.matcher
+            tag = matcher.type[5:] if matcher.type.startswith("tags.") else None
+            if tag and not tag.startswith("user.") and not GLOB_CHARACTERS & set(matcher.pattern):
+                for key in {tag, EventSubjectTemplateData.tag_aliases.get(tag, tag)}:
+                    self._literal_tag_rules.setdefault((key, matcher.pattern), []).append(index)
+            else:
+                self._tested_rules.append(index)
+
+    def get_matching_rules(self, data: PathSearchable) -> list[Rule]:
+        """
+        Returns all rules matching the event, in the order of the schema.
+        """
+        event = OwnershipEventData(data)
+        matching: set[int] = set()
+
+        if self._literal_tag_rules:
+            for tag in event.tags:
+                matching.update(self._literal_tag_rules.get(tag, ()))
+
+        results: dict[Matcher, bool] = {}
+        for index in self._tested_rules:
+            matcher = self.rules[index].matcher
+            rv = results.get(matcher)
+            if rv is None:
+                rv = results[matcher] = matcher.test_event(event)
+            if rv:
+                matching.add(index)
+
+        return [self.rules[index] for index in sorted(matching)]
+
+
 class Owner(namedtuple("Owner", "type identifier")):
     """
     An Owner represents a User or Team who owns this Rule.
@@ -299,6 +399,37 @@ def load_schema(schema: Mapping[str, Any]) -> Sequence[Rule]:
     return [Rule.load(r) for r in schema["rules"]]
 
 
+_compiled_schemas: OrderedDict[Hashable, CompiledOwnershipSchema] = OrderedDict()
+_compiled_schemas_lock = threading.Lock()
+COMPILED_SCHEMA_CACHE_SIZE = 100
+
+
+def load_compiled_schema(
+    schema: Mapping[str, Any], cache_key: Hashable | None = None
+) -> CompiledOwnershipSchema:
+    """
+    Convert a JSON schema into a `CompiledOwnershipSchema`.
+
+    If a `cache_key` is given the compiled schema is cached per process under
+    it, so the key has to change whenever the schema does.
+    """
+    if cache_key is None:
+        return CompiledOwnershipSchema(load_schema(schema))
+
+    with _compiled_schemas_lock:
+        compiled = _compiled_schemas.get(cache_key)
+        if compiled is not None:
+            _compiled_schemas.move_to_end(cache_key)
+            return compiled
+
+    compiled = CompiledOwnershipSchema(load_schema(schema))
+    with _compiled_schemas_lock:
+        _compiled_schemas[cache_key] = compiled
+        while len(_compiled_schemas) > COMPILED_SCHEMA_CACHE_SIZE:
+            _compiled_schemas.popitem(last=False)
+    return compiled
+
+
 def convert_schema_to_rules_text(schema: Mapping[str, Any]) -> str:
     rules = load_schema(schema)
     text = ""
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import logging
+import time
+from collections import deque
+from collections.abc import Callable, Hashable, MutableMapping
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Generic, TypeVar
+
+from arroyo.processing.strategies.abstract import MessageRejected, ProcessingStrategy
+from arroyo.types import Message, Partition, TStrategyPayload
+
+from sentry.utils import metrics
+
+logger = logging.getLogger(__name__)
+
+TResult = TypeVar("TResult")
+
+
+class RunTaskInLanes(ProcessingStrategy[TStrategyPayload], Generic[TStrategyPayload, TResult]):
+    """
+    Runs ``processing_function`` on a fixed number of lanes, each backed by a
+    single thread. Messages are assigned to a lane by ``lane_key``, so all
+    messages that share a key are processed one after the other, in the
+    order they were consumed, while messages with different keys run in
+    parallel.
+
+    Unlike ``RunTaskInThreads``, completed messages are forwarded to the next
+    step per partition: a slow message only holds back the offsets of its own
+    partition, and every other partition keeps committing as its messages
+    complete.
+    """
+
+    def __init__(
+        self,
+        processing_function: Callable[[Message[TStrategyPayload]], TResult],
+        lane_key: Callable[[Message[TStrategyPayload]], Hashable],
+        concurrency: int,
+        max_pending_futures: int,
+        next_step: ProcessingStrategy[TResult],
+    ) -> None:
+        self.__processing_function = processing_function
+        self.__lane_key = lane_key
+        self.__executors = [
+            ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"lane-{i}")
+            for i in range(concurrency)
+        ]
+        self.__max_pending_futures = max_pending_futures
+        self.__next_step = next_step
+
+        self.__queues: MutableMapping[
+            Partition, deque[tuple[Message[TStrategyPayload], Future[TResult]]]
+        ] = {}
+        self.__pending = 0
+        self.__closed = False
+
+    def submit(self, message: Message[TStrategyPayload]) -> None:
+        assert not self.__closed
+
+        if self.__pending >= self.__max_pending_futures:
+            raise MessageRejected
+
+        lane = hash(self.__lane_key(message)) % len(self.__executors)
+        future = self.__executors[lane].submit(self.__processing_function, message)
+
+        partition = next(iter(message.committable))
+        self.__queues.setdefault(partition, deque()).append((message, future))
+        self.__pending += 1
+
+    def __forward(self, queue: deque[tuple[Message[TStrategyPayload], Future[TResult]]]) -> bool:
+        message, future = queue[0]
+        try:
+            self.__next_step.submit(message.replace(future.result()))
+        except MessageRejected:
+            return False
+
+        queue.popleft()
+        self.__pending -= 1
+        return True
+
+    def poll(self) -> None:
+        self.__next_step.poll()
+
+        for partition, queue in self.__queues.items():
+            while queue and queue[0][1].done():
+                if not self.__forward(queue):
+                    break
+
+            metrics.distribution(
+                "post_process_forwarder.lanes.pending",
+                len(queue),
+                tags={"partition": str(partition.index)},
+                sample_rate=0.01,
+            )
+
+    def join(self, timeout: float | None = None) -> None:
+        deadline = time.time() + timeout if timeout is not None else None
+
+        for queue in self.__queues.values():
+            while queue:
+                remaining = deadline - time.time() if deadline is not None else None
+                if remaining is not None and remaining <= 0:
+                    logger.warning("Timed out with %s futures in queue", self.__pending)
+                    break
+
+                message, future = queue[0]
+                if not wait([future], remaining).done:
+                    continue
+
+                self.__next_step.submit(message.replace(future.result()))
+                queue.popleft()
+                self.__pending -= 1
+
+        for executor in self.__executors:
+            executor.shutdown()
+
+        self.__next_step.close()
+        self.__next_step.join(deadline - time.time() if deadline is not None else None)
+
+    def close(self) -> None:
+        self.__closed = True
+
+    def terminate(self) -> None:
+        self.__closed = True
+
+        logger.info("Terminating %r...", self.__next_step)
+        for executor in self.__executors:
+            executor.shutdown(wait=False)
+        self.__next_step.terminate()
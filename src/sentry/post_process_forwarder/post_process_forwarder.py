@@ -1,6 +1,6 @@
 import logging
 from abc import ABC, abstractmethod
-from collections.abc import Mapping
+from collections.abc import Hashable, Mapping
 
 from arroyo.backends.kafka import KafkaPayload
 from arroyo.processing.strategies import (
@@ -11,6 +11,7 @@ from arroyo.processing.strategies import (
 )
 from arroyo.types import Commit, Message, Partition
 
+from sentry.post_process_forwarder.lanes import RunTaskInLanes
 from sentry.utils.arroyo import MultiprocessingPool, RunTaskWithMultiprocessing
 
 logger = logging.getLogger(__name__)
@@ -22,6 +23,20 @@ class PostProcessForwarderStrategyFactory(ProcessingStrategyFactory[KafkaPayload
     def _dispatch_function(message: Message[KafkaPayload]) -> None:
         raise NotImplementedError()
 
+    @staticmethod
+    def _lane_key(message: Message[KafkaPayload]) -> Hashable:
+        """
+        Messages with the same lane key are dispatched in order. Events are
+        keyed by their group where the producer sent one, so that
+        post-processing of a group is never reordered.
+        """
+        for key, value in message.payload.headers:
+            if key == "group_id" and value:
+                return value
+        if message.payload.key is not None:
+            return message.payload.key
+        return next(iter(message.committable)).index
+
     def __init__(
         self,
         mode: str,
@@ -54,6 +69,15 @@ class PostProcessForwarderStrategyFactory(ProcessingStrategyFactory[KafkaPayload
                 max_pending_futures=self.max_pending_futures,
                 next_step=CommitOffsets(commit),
             )
+        elif self.mode == "partitioned":
+            logger.info("Starting partitioned post process forwarder")
+            return RunTaskInLanes(
+                processing_function=self._dispatch_function,
+                lane_key=self._lane_key,
+                concurrency=self.concurrency,
+                max_pending_futures=self.max_pending_futures,
+                next_step=CommitOffsets(commit),
+            )
         elif self.mode == "multiprocess":
             logger.info("Starting multiprocess post process forwarder")
             return RunTaskWithMultiprocessing(
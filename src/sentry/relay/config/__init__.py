@@ -39,6 +39,7 @@ from sentry.models.organization import Organization
 from sentry.models.project import Project
 from sentry.models.projectkey import ProjectKey
 from sentry.relay.config.experimental import TimeChecker, add_experimental_config
+from sentry.relay.config.memo import memoize_for_organization
 from sentry.relay.config.metric_extraction import (
     get_metric_conditional_tagging_rules,
     get_metric_extraction_config,
@@ -83,11 +84,25 @@ MIN_CLUSTERER_RUNS = 10
 logger = logging.getLogger(__name__)
 
 
+def _get_exposed_organization_features(organization: Organization) -> set[str]:
+    return {
+        feature
+        for feature in EXPOSABLE_FEATURES
+        if feature.startswith("organizations:") and features.has(feature, organization)
+    }
+
+
 def get_exposed_features(project: Project) -> Sequence[str]:
+    organization_features = memoize_for_organization(
+        "exposed_features",
+        project.organization_id,
+        lambda: _get_exposed_organization_features(project.organization),
+    )
+
     active_features = []
     for feature in EXPOSABLE_FEATURES:
         if feature.startswith("organizations:"):
-            has_feature = features.has(feature, project.organization)
+            has_feature = feature in organization_features
         elif feature.startswith("projects:"):
             has_feature = features.has(feature, project)
         else:
@@ -182,7 +197,9 @@ def get_filter_settings(project: Project) -> Mapping[str, Any]:
         filter_settings["csp"] = {"disallowedSources": csp_disallowed_sources}
 
     try:
-        generic_filters = _get_generic_project_filters()
+        generic_filters = memoize_for_organization(
+            "generic_filters", project.organization_id, _get_generic_project_filters
+        )
     except Exception:
         logger.exception(
             "Exception while building Relay project config: error building generic filters"
@@ -248,38 +265,53 @@ class CardinalityLimit(TypedDict):
     namespace: str | None
 
 
+def _get_cardinality_limits(
+    timeout: TimeChecker, organization: Organization
+) -> list[CardinalityLimit] | None:
+    if not features.has("organizations:relay-cardinality-limiter", organization):
+        return None
+
+    passive_limits = options.get("relay.cardinality-limiter.passive-limits-by-org").get(
+        str(organization.id), []
+    )
+
+    cardinality_limits: list[CardinalityLimit] = []
+    for namespace, option_name in USE_CASE_ID_CARDINALITY_LIMIT_QUOTA_OPTIONS.items():
+        timeout.check()
+        option = options.get(option_name)
+        if not option or not len(option) == 1:
+            # Multiple quotas are not supported
+            continue
+
+        quota = option[0]
+        id = namespace.value
+
+        limit: CardinalityLimit = {
+            "id": id,
+            "window": {
+                "windowSeconds": quota["window_seconds"],
+                "granularitySeconds": quota["granularity_seconds"],
+            },
+            "limit": quota["limit"],
+            "scope": "organization",
+            "namespace": namespace.value,
+        }
+        if id in passive_limits:
+            limit["passive"] = True
+        cardinality_limits.append(limit)
+
+    return cardinality_limits
+
+
 def get_metrics_config(timeout: TimeChecker, project: Project) -> Mapping[str, Any] | None:
     metrics_config = {}
 
-    if features.has("organizations:relay-cardinality-limiter", project.organization):
-        passive_limits = options.get("relay.cardinality-limiter.passive-limits-by-org").get(
-            str(project.organization.id), []
-        )
-
-        cardinality_limits: list[CardinalityLimit] = []
-        for namespace, option_name in USE_CASE_ID_CARDINALITY_LIMIT_QUOTA_OPTIONS.items():
-            timeout.check()
-            option = options.get(option_name)
-            if not option or not len(option) == 1:
-                # Multiple quotas are not supported
-                continue
-
-            quota = option[0]
-            id = namespace.value
-
-            limit: CardinalityLimit = {
-                "id": id,
-                "window": {
-                    "windowSeconds": quota["window_seconds"],
-                    "granularitySeconds": quota["granularity_seconds"],
-                },
-                "limit": quota["limit"],
-                "scope": "organization",
-                "namespace": namespace.value,
-            }
-            if id in passive_limits:
-                limit["passive"] = True
-            cardinality_limits.append(limit)
+    cardinality_limits = memoize_for_organization(
+        "cardinality_limits",
+        project.organization_id,
+        lambda: _get_cardinality_limits(timeout, project.organization),
+    )
+    if cardinality_limits is not None:
         metrics_config["cardinalityLimits"] = cardinality_limits
 
     if features.has("organizations:metrics-blocking", project.organization):
@@ -764,11 +796,15 @@ def _get_project_config(
             "publicKeys": public_keys,
             "config": {
                 "allowedDomains": list(get_origins(project)),
-                "trustedRelays": [
-                    r["public_key"]
-                    for r in project.organization.get_option("sentry:trusted-relays", [])
-                    if r
-                ],
+                "trustedRelays": memoize_for_organization(
+                    "trusted_relays",
+                    project.organization_id,
+                    lambda: [
+                        r["public_key"]
+                        for r in project.organization.get_option("sentry:trusted-relays", [])
+                        if r
+                    ],
+                ),
                 "piiConfig": get_pii_config(project),
                 "datascrubbingSettings": get_datascrubbing_settings(project),
             },
@@ -833,10 +869,14 @@ def _get_project_config(
             ),
         }
 
-    performance_score_profiles = [
-        *_get_browser_performance_profiles(project.organization),
-        *_get_mobile_performance_profiles(project.organization),
-    ]
+    performance_score_profiles = memoize_for_organization(
+        "performance_score_profiles",
+        project.organization_id,
+        lambda: [
+            *_get_browser_performance_profiles(project.organization),
+            *_get_mobile_performance_profiles(project.organization),
+        ],
+    )
     if performance_score_profiles:
         config["performanceScore"] = {"profiles": performance_score_profiles}
 
@@ -848,7 +888,11 @@ def _get_project_config(
         if grouping_config is not None:
             config["groupingConfig"] = grouping_config
     with Hub.current.start_span(op="get_event_retention"):
-        event_retention = quotas.backend.get_event_retention(project.organization)
+        event_retention = memoize_for_organization(
+            "event_retention",
+            project.organization_id,
+            lambda: quotas.backend.get_event_retention(project.organization),
+        )
         if event_retention is not None:
             config["eventRetention"] = event_retention
     with Hub.current.start_span(op="get_all_quotas"):
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Generator, MutableMapping
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+_memo: ContextVar[MutableMapping[tuple[str, int], Any] | None] = ContextVar(
+    "relay_config_organization_memo", default=None
+)
+
+
+@contextmanager
+def organization_memo() -> Generator[None, None, None]:
+    """Share organization-wide parts of project configs while this context is active.
+
+    Use this when computing the configs of many projects of one organization in
+    one go. Outside of this context nothing is memoized and every project config
+    is computed from scratch.
+    """
+    token = _memo.set({})
+    try:
+        yield
+    finally:
+        _memo.reset(token)
+
+
+def memoize_for_organization(name: str, organization_id: int, compute: Callable[[], T]) -> T:
+    """Returns the memoized value of ``compute`` for the organization if there is one.
+
+    Values are shared between all project configs built within the same
+    :func:`organization_memo` context and must not be mutated by the caller.
+    """
+    memo = _memo.get()
+    if memo is None:
+        return compute()
+
+    key = (name, organization_id)
+    if key not in memo:
+        memo[key] = compute()
+    return memo[key]
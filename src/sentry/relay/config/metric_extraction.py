@@ -29,6 +29,7 @@ from sentry.models.transaction_threshold import (
     TransactionMetric,
 )
 from sentry.relay.config.experimental import TimeChecker
+from sentry.relay.config.memo import memoize_for_organization
 from sentry.search.events import fields
 from sentry.search.events.builder import QueryBuilder
 from sentry.search.events.types import ParamsType, QueryBuilderConfig
@@ -104,7 +105,11 @@ def get_metric_extraction_config(
     # For efficiency purposes, we fetch the flags in batch and propagate them downstream.
     sentry_sdk.set_tag("organization_id", project.organization_id)
     with sentry_sdk.start_span(op="on_demand_metrics_feature_flags"):
-        enabled_features = on_demand_metrics_feature_flags(project.organization)
+        enabled_features = memoize_for_organization(
+            "on_demand_metrics_feature_flags",
+            project.organization_id,
+            lambda: on_demand_metrics_feature_flags(project.organization),
+        )
     timeout.check()
 
     prefilling = "organizations:on-demand-metrics-prefill" in enabled_features
@@ -217,13 +222,17 @@ def _get_widget_metric_specs(
     )
 
     # fetch all queries of all on demand metrics widgets of this organization
-    widget_queries = (
-        DashboardWidgetQuery.objects.filter(
-            widget__dashboard__organization=project.organization,
-            widget__widget_type=DashboardWidgetTypes.DISCOVER,
-        )
-        .prefetch_related("dashboardwidgetqueryondemand_set", "widget")
-        .order_by("-widget__dashboard__last_visited", "widget__order")
+    widget_queries = memoize_for_organization(
+        "on_demand_widget_queries",
+        project.organization_id,
+        lambda: list(
+            DashboardWidgetQuery.objects.filter(
+                widget__dashboard__organization=project.organization,
+                widget__widget_type=DashboardWidgetTypes.DISCOVER,
+            )
+            .prefetch_related("dashboardwidgetqueryondemand_set", "widget")
+            .order_by("-widget__dashboard__last_visited", "widget__order")
+        ),
     )
 
     metrics.incr(
@@ -2,7 +2,7 @@ from sentry.utils.services import Service
 
 
 class ProjectConfigCache(Service):
-    __all__ = ("set_many", "delete_many", "get")
+    __all__ = ("set_many", "delete_many", "get", "get_many", "exists_many")
 
     def __init__(self, **options):
         pass
@@ -15,3 +15,16 @@ class ProjectConfigCache(Service):
 
     def get(self, public_key):
         raise NotImplementedError()
+
+    def get_many(self, public_keys):
+        """Returns the configs of all given public keys which are in the cache."""
+        rv = {}
+        for public_key in public_keys:
+            config = self.get(public_key)
+            if config is not None:
+                rv[public_key] = config
+        return rv
+
+    def exists_many(self, public_keys):
+        """Returns the subset of ``public_keys`` which have a config in the cache."""
+        return {public_key for public_key in public_keys if self.get(public_key) is not None}
@@ -1,14 +1,22 @@
 import logging
+import threading
 
 import zstandard
+from cachetools import TTLCache
 
 from sentry.relay.projectconfig_cache.base import ProjectConfigCache
 from sentry.utils import json, metrics, redis
+from sentry.utils.hashlib import md5_text
 from sentry.utils.redis import validate_dynamic_cluster
 
 REDIS_CACHE_TIMEOUT = 3600  # 1 hr
 COMPRESSION_LEVEL = 3  # 3 is the default level of compression
 
+# Defaults for the in-process cache of decoded configs. Entries are validated
+# against the version key in Redis on every read, the TTL only bounds memory.
+LOCAL_CACHE_SIZE = 1000
+LOCAL_CACHE_TTL = 60
+
 logger = logging.getLogger(__name__)
 
 
@@ -20,6 +28,15 @@ class RedisProjectConfigCache(ProjectConfigCache):
         read_cluster_key = options.get("read_cluster", cluster_key)
         self.cluster_read = redis.redis_clusters.get(read_cluster_key, decode_responses=False)
 
+        # Maps public keys to their version and decoded config.
+        self._local_cache: TTLCache[str, tuple[bytes, object]] | None = None
+        local_cache_size = options.get("local_cache_size", LOCAL_CACHE_SIZE)
+        if local_cache_size > 0:
+            self._local_cache = TTLCache(
+                maxsize=local_cache_size, ttl=options.get("local_cache_ttl", LOCAL_CACHE_TTL)
+            )
+        self._local_cache_lock = threading.Lock()
+
         super().__init__(**options)
 
     def validate(self):
@@ -28,6 +45,13 @@ class RedisProjectConfigCache(ProjectConfigCache):
     def __get_redis_key(self, public_key):
         return f"relayconfig:{public_key}"
 
+    def __get_version_key(self, public_key):
+        return f"relayconfig-version:{public_key}"
+
+    @staticmethod
+    def __get_version(compressed):
+        return md5_text(compressed).hexdigest()[:16].encode()
+
     def set_many(self, configs):
         metrics.incr("relay.projectconfig_cache.write", amount=len(configs), tags={"action": "set"})
 
@@ -42,6 +66,13 @@ class RedisProjectConfigCache(ProjectConfigCache):
             metrics.distribution("relay.projectconfig_cache.size", len(compressed), unit="byte")
 
             p.setex(self.__get_redis_key(public_key), REDIS_CACHE_TIMEOUT, compressed)
+            # The version is written after the config, so that it never
+            # announces a config that cannot be read yet.
+            p.setex(
+                self.__get_version_key(public_key),
+                REDIS_CACHE_TIMEOUT,
+                self.__get_version(compressed),
+            )
 
         p.execute()
 
@@ -50,19 +81,93 @@ class RedisProjectConfigCache(ProjectConfigCache):
         with self.cluster.pipeline() as p:
             for public_key in public_keys:
                 p.delete(self.__get_redis_key(public_key))
+                p.delete(self.__get_version_key(public_key))
             return_values = p.execute()
 
         metrics.incr(
-            "relay.projectconfig_cache.write", amount=sum(return_values), tags={"action": "delete"}
+            "relay.projectconfig_cache.write",
+            amount=sum(return_values[::2]),
+            tags={"action": "delete"},
         )
 
+    def exists_many(self, public_keys):
+        public_keys = list(public_keys)
+
+        # Note: Those are multiple pipelines, one per cluster node
+        with self.cluster_read.pipeline() as p:
+            for public_key in public_keys:
+                p.exists(self.__get_redis_key(public_key))
+            return_values = p.execute()
+
+        return {public_key for public_key, exists in zip(public_keys, return_values) if exists}
+
     def get(self, public_key):
-        rv = self.cluster_read.get(self.__get_redis_key(public_key))
-        if rv is not None:
+        return self.get_many([public_key]).get(public_key)
+
+    def get_many(self, public_keys):
+        """Returns the decoded configs of all given public keys which are in the cache.
+
+        Decoded configs are kept in a short-lived in-process cache together
+        with a version of their compressed payload. A config is only fetched
+        and decoded again if the version stored next to it in Redis has
+        changed. The returned configs may be shared between callers and must
+        not be mutated.
+        """
+        public_keys = list(public_keys)
+        if not public_keys:
+            return {}
+
+        if self._local_cache is None:
+            return self.__fetch_many(public_keys)
+
+        # Note: Those are multiple pipelines, one per cluster node
+        with self.cluster_read.pipeline() as p:
+            for public_key in public_keys:
+                p.get(self.__get_version_key(public_key))
+            versions = p.execute()
+
+        rv = {}
+        misses = []
+        with self._local_cache_lock:
+            for public_key, version in zip(public_keys, versions):
+                cached = self._local_cache.get(public_key)
+                if version is not None and cached is not None and cached[0] == version:
+                    rv[public_key] = cached[1]
+                else:
+                    misses.append(public_key)
+
+        metrics.incr("relay.projectconfig_cache.local", amount=len(rv), tags={"result": "hit"})
+        metrics.incr("relay.projectconfig_cache.local", amount=len(misses), tags={"result": "miss"})
+
+        if misses:
+            rv.update(self.__fetch_many(misses))
+        return rv
+
+    def __fetch_many(self, public_keys):
+        # Note: Those are multiple pipelines, one per cluster node
+        with self.cluster_read.pipeline() as p:
+            for public_key in public_keys:
+                p.get(self.__get_redis_key(public_key))
+            values = p.execute()
+
+        rv = {}
+        for public_key, value in zip(public_keys, values):
+            if value is None:
+                continue
+
             try:
-                rv = zstandard.decompress(rv).decode()
+                decoded = zstandard.decompress(value).decode()
             except (TypeError, zstandard.ZstdError):
                 # assume raw json
-                pass
-            return json.loads(rv)
-        return None
+                rv[public_key] = json.loads(value)
+                continue
+
+            rv[public_key] = json.loads(decoded)
+            if self._local_cache is not None:
+                # Versioned by the payload that was actually read, so that an
+                # entry is never associated with a newer version than its
+                # contents.
+                with self._local_cache_lock:
+                    self._local_cache[public_key] = (self.__get_version(value), rv[public_key])
+
+        return rv
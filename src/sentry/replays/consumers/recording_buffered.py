@@ -19,6 +19,12 @@ This option limits the amount of time a message will wait in the buffer before b
 this value exceeds the Kafka commit interval then the Kafka offsets will not be committed until the
 buffer has been flushed and fully committed.
 
+# Packed uploads
+
+If the "replay.storage.packed-uploads.enabled" option is set, small recording segments of a buffer
+are packed into a single object per retention period instead of being uploaded individually.  See
+`sentry.replays.lib.storage.store_packed_segments`.
+
 # Errors
 
 All deterministic errors must be handled otherwise the consumer will deadlock and progress will
@@ -40,6 +46,7 @@ from __future__ import annotations
 
 import logging
 import time
+from collections import defaultdict
 from collections.abc import Mapping
 from concurrent.futures import ThreadPoolExecutor
 from typing import Any, TypedDict
@@ -55,11 +62,13 @@ from sentry_kafka_schemas import get_codec
 from sentry_kafka_schemas.codecs import ValidationError
 from sentry_kafka_schemas.schema_types.ingest_replay_recordings_v1 import ReplayRecording
 
+from sentry import options
 from sentry.replays.lib.storage import (
     RecordingSegmentStorageMeta,
     make_recording_filename,
     make_video_filename,
     storage_kv,
+    store_packed_segments,
 )
 from sentry.replays.usecases.ingest import decompress, process_headers, track_initial_segment_event
 from sentry.replays.usecases.ingest.dom_index import (
@@ -139,6 +148,9 @@ class RecordingBufferedStrategyFactory(ProcessingStrategyFactory[KafkaPayload]):
 class UploadEvent(TypedDict):
     key: str
     value: bytes
+    # Set for recording segments, which may be packed into a single object with other segments.
+    # Videos are always uploaded individually.
+    segment: RecordingSegmentStorageMeta | None
 
 
 class InitialSegmentEvent(TypedDict):
@@ -243,7 +255,11 @@ def process_message(buffer: RecordingBuffer, message: bytes) -> None:
 
     # Append an upload event to the state object for later processing.
     buffer.upload_events.append(
-        {"key": make_recording_filename(recording_segment), "value": recording_data}
+        {
+            "key": make_recording_filename(recording_segment),
+            "value": recording_data,
+            "segment": recording_segment,
+        }
     )
 
     if replay_video := decoded_message.get("replay_video"):
@@ -254,7 +270,11 @@ def process_message(buffer: RecordingBuffer, message: bytes) -> None:
             unit="byte",
         )
         buffer.upload_events.append(
-            {"key": make_video_filename(recording_segment), "value": replay_video}  # type: ignore[typeddict-item]
+            {
+                "key": make_video_filename(recording_segment),
+                "value": replay_video,  # type: ignore[typeddict-item]
+                "segment": None,
+            }
         )
 
     # Initial segment events are recorded in the state machine.
@@ -331,12 +351,22 @@ def process_commit(
 
 
 def commit_uploads(upload_events: list[UploadEvent]) -> None:
+    if options.get("replay.storage.packed-uploads.enabled"):
+        upload_events, packed_uploads = partition_packed_uploads(upload_events)
+    else:
+        packed_uploads = {}
+
     with sentry_sdk.start_span(op="replays.consumer.recording.upload_segments"):
         # This will run to completion taking potentially an infinite amount of time. However,
         # that outcome is unlikely. In the event of an indefinite backlog the process can be
         # restarted.
-        with ThreadPoolExecutor(max_workers=len(upload_events)) as pool:
+        max_workers = max(len(upload_events) + len(packed_uploads), 1)
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
             futures = [pool.submit(_do_upload, upload) for upload in upload_events]
+            futures.extend(
+                pool.submit(_do_packed_upload, retention_days, uploads)
+                for retention_days, uploads in packed_uploads.items()
+            )
 
     has_errors = False
 
@@ -372,6 +402,41 @@ def commit_replay_actions(replay_action_events: list[ReplayActionsEvent]) -> Non
         emit_replay_actions(actions)
 
 
+def partition_packed_uploads(
+    upload_events: list[UploadEvent],
+) -> tuple[list[UploadEvent], dict[int | None, list[UploadEvent]]]:
+    """Split upload events into events uploaded individually and segments packed together.
+
+    Packed segments are grouped by retention period, packed objects expire as a whole.
+    """
+    max_segment_size = options.get("replay.storage.packed-uploads.max-segment-size")
+
+    individual_uploads: list[UploadEvent] = []
+    packed_uploads: dict[int | None, list[UploadEvent]] = defaultdict(list)
+    for upload in upload_events:
+        segment = upload["segment"]
+        if segment is not None and len(upload["value"]) <= max_segment_size:
+            packed_uploads[segment.retention_days].append(upload)
+        else:
+            individual_uploads.append(upload)
+
+    # Packing a single segment saves nothing.
+    for retention_days, uploads in list(packed_uploads.items()):
+        if len(uploads) == 1:
+            individual_uploads.extend(uploads)
+            del packed_uploads[retention_days]
+
+    return individual_uploads, packed_uploads
+
+
+def _do_packed_upload(retention_days: int | None, uploads: list[UploadEvent]) -> None:
+    with sentry_sdk.start_span(op="replays.consumer.recording.upload_packed_segments"):
+        store_packed_segments(
+            retention_days,
+            [(upload["segment"], upload["value"]) for upload in uploads if upload["segment"]],
+        )
+
+
 def _do_upload(upload_event: UploadEvent) -> None:
     with sentry_sdk.start_span(op="replays.consumer.recording.upload_segment"):
         # If an error occurs this will retry up to five times by default.
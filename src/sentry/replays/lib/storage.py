@@ -7,23 +7,40 @@ proper steps are taken to migrate your data.
 
 import dataclasses
 import logging
+import uuid
 from abc import ABC, abstractmethod
-from datetime import datetime
+from collections import defaultdict
+from collections.abc import Iterable, Sequence
+from datetime import datetime, timedelta
 from io import BytesIO
+from typing import Any
 
 from django.conf import settings
 from django.db.utils import IntegrityError
 from google.api_core.exceptions import TooManyRequests
 
 from sentry import options
+from sentry.locks import locks
 from sentry.models.files.file import File
 from sentry.models.files.utils import get_storage
 from sentry.replays.models import ReplayRecordingSegment
-from sentry.utils import metrics
+from sentry.utils import json, metrics
+from sentry.utils.kvstore.abstract import KVStorage
+from sentry.utils.kvstore.bigtable import BigtableKVStorage
+from sentry.utils.kvstore.redis import RedisKVStorage
+from sentry.utils.redis import redis_clusters
+from sentry.utils.services import LazyServiceWrapper, Service
 
 logger = logging.getLogger()
 
 
+@dataclasses.dataclass(frozen=True)
+class PackedSegmentLocation:
+    key: str
+    offset: int
+    length: int
+
+
 @dataclasses.dataclass
 class RecordingSegmentStorageMeta:
     project_id: int
@@ -33,6 +50,8 @@ class RecordingSegmentStorageMeta:
     date_added: datetime | None = None
     file_id: int | None = None
     file: File | None = None
+    # Set if the segment was uploaded packed with other segments, see `store_packed_segments`.
+    packed: PackedSegmentLocation | None = None
 
 
 def make_recording_filename(segment: RecordingSegmentStorageMeta) -> str:
@@ -160,10 +179,15 @@ class StorageBlob(Blob):
     """
 
     def delete(self, segment: RecordingSegmentStorageMeta) -> None:
+        if segment.packed is not None:
+            return delete_packed_segments([segment])
         return storage_kv.delete(self.make_key(segment))
 
     @metrics.wraps("replays.lib.storage.StorageBlob.get")
     def get(self, segment: RecordingSegmentStorageMeta) -> bytes | None:
+        if segment.packed is not None:
+            location = segment.packed
+            return storage_kv.get_range(location.key, location.offset, location.length)
         return storage_kv.get(self.make_key(segment))
 
     @metrics.wraps("replays.lib.storage.StorageBlob.set")
@@ -184,12 +208,32 @@ class StorageBlob(Blob):
 
 class SimpleStorageBlob:
     @metrics.wraps("replays.lib.storage.SimpleStorageBlob.get")
-    def get(self, key: str) -> bytes | None:
+    def get(self, key: str, strict: bool = False) -> bytes | None:
+        """Return the blob, or None if it can not be read.  With `strict`, errors are raised."""
         try:
             storage = get_storage(self._make_storage_options())
             blob = storage.open(key)
             result = blob.read()
             blob.close()
+        except Exception:
+            if strict:
+                raise
+            logger.warning("Storage GET error.")
+            return None
+        else:
+            return result
+
+    @metrics.wraps("replays.lib.storage.SimpleStorageBlob.get_range")
+    def get_range(self, key: str, offset: int, length: int) -> bytes | None:
+        try:
+            storage = get_storage(self._make_storage_options())
+            if hasattr(storage, "read_range"):
+                result = storage.read_range(key, offset, length)
+            else:
+                blob = storage.open(key)
+                blob.seek(offset)
+                result = blob.read(length)
+                blob.close()
         except Exception:
             logger.warning("Storage GET error.")
             return None
@@ -197,11 +241,14 @@ class SimpleStorageBlob:
             return result
 
     @metrics.wraps("replays.lib.storage.SimpleStorageBlob.set")
-    def set(self, key: str, value: bytes) -> None:
+    def set(self, key: str, value: bytes, strict: bool = False) -> None:
+        """Store the blob.  Rate limit errors are ignored unless `strict` is set."""
         storage = get_storage(self._make_storage_options())
         try:
             storage.save(key, BytesIO(value))
         except TooManyRequests:
+            if strict:
+                raise
             # if we 429 because of a dupe segment problem, ignore it
             metrics.incr("replays.lib.storage.TooManyRequests")
 
@@ -227,6 +274,171 @@ class SimpleStorageBlob:
             return None
 
 
+# Packed segments.
+#
+# Small segments can be uploaded in batches: the segments are concatenated into a single object
+# and the location (object key, offset and length) of each segment is recorded in the
+# `packed_segment_index`.  Readers attach the locations to the segments' storage metadata (see
+# `attach_packed_segment_locations`) and read packed segments with range requests.
+#
+# Packed objects hold the segments of many replays.  Deleting a packed segment overwrites its
+# bytes in the packed object with zeroes before its location is deleted, see
+# `delete_packed_segments`.
+
+
+class PackedSegmentIndex(Service):
+    """Locations of packed segments, one entry per segment.
+
+    Entries expire with the retention period of their segment, like the packed object holding
+    the segment.  A segment whose location is lost can not be read anymore, production
+    deployments should use a durable backend such as `BigtablePackedSegmentIndex`.
+    """
+
+    __all__ = ("get_many", "set_many", "delete_many")
+
+    def __init__(self, store: KVStorage[str, bytes]) -> None:
+        self.store = store
+
+    @staticmethod
+    def _make_key(project_id: int, replay_id: str, segment_id: int) -> str:
+        return f"replays:packed:{project_id}:{replay_id}:{segment_id}"
+
+    def get_many(
+        self, project_id: int, replay_id: str, segment_ids: Iterable[int]
+    ) -> dict[int, PackedSegmentLocation]:
+        keys = {
+            self._make_key(project_id, replay_id, segment_id): segment_id
+            for segment_id in segment_ids
+        }
+        return {
+            keys[key]: PackedSegmentLocation(*json.loads(value))
+            for key, value in self.store.get_many(list(keys))
+        }
+
+    def set_many(
+        self, locations: Iterable[tuple[RecordingSegmentStorageMeta, PackedSegmentLocation]]
+    ) -> None:
+        for segment, location in locations:
+            self.store.set(
+                self._make_key(segment.project_id, segment.replay_id, segment.segment_id),
+                json.dumps([location.key, location.offset, location.length]).encode("utf8"),
+                ttl=timedelta(days=segment.retention_days or 30),
+            )
+
+    def delete_many(self, segments: Iterable[RecordingSegmentStorageMeta]) -> None:
+        self.store.delete_many(
+            [
+                self._make_key(segment.project_id, segment.replay_id, segment.segment_id)
+                for segment in segments
+            ]
+        )
+
+
+class RedisPackedSegmentIndex(PackedSegmentIndex):
+    def __init__(self, cluster: str = "default") -> None:
+        super().__init__(RedisKVStorage(redis_clusters.get(cluster, decode_responses=False)))
+
+
+class BigtablePackedSegmentIndex(PackedSegmentIndex):
+    """Keyword arguments are forwarded to the ``BigtableKVStorage`` constructor."""
+
+    def __init__(self, **options: Any) -> None:
+        super().__init__(BigtableKVStorage(**options))
+
+
+def make_packed_segments_filename(retention_days: int | None) -> str:
+    """Return the filename of a packed segments object."""
+    # Prefixed by the retention period so the bucket's TTL rules apply.
+    return f"{retention_days or 30}/packed/{uuid.uuid4().hex}"
+
+
+def pack_segments(
+    key: str, segments: Sequence[tuple[RecordingSegmentStorageMeta, bytes]]
+) -> tuple[bytes, list[tuple[RecordingSegmentStorageMeta, PackedSegmentLocation]]]:
+    """Pack segments into a single object, returning the object and the location of each
+    segment within it.
+    """
+    locations = []
+    offset = 0
+    for segment, value in segments:
+        locations.append(
+            (segment, PackedSegmentLocation(key=key, offset=offset, length=len(value)))
+        )
+        offset += len(value)
+    return b"".join(value for _, value in segments), locations
+
+
+def store_packed_segments(
+    retention_days: int | None, segments: Sequence[tuple[RecordingSegmentStorageMeta, bytes]]
+) -> str:
+    """Upload segments packed into a single object and record their locations.
+
+    The locations are only recorded once the object was uploaded, readers never observe a
+    location of an object which does not exist.
+    """
+    key = make_packed_segments_filename(retention_days)
+    value, locations = pack_segments(key, segments)
+    storage_kv.set(key, value, strict=True)
+    packed_segment_index.set_many(locations)
+    metrics.distribution("replays.lib.storage.packed_segments", len(segments))
+    return key
+
+
+def attach_packed_segment_locations(
+    segments: Iterable[RecordingSegmentStorageMeta], force: bool = False
+) -> None:
+    """Set the location of the segments of a replay which were uploaded in packed objects.
+
+    Only looked up while the "replay.storage.packed-uploads.lookup-enabled" option is set, or
+    with `force` (deletions look up locations regardless).
+    """
+    segments = list(segments)
+    if not segments:
+        return None
+    if not force and not options.get("replay.storage.packed-uploads.lookup-enabled"):
+        return None
+
+    locations = packed_segment_index.get_many(
+        segments[0].project_id,
+        segments[0].replay_id,
+        [segment.segment_id for segment in segments],
+    )
+    for segment in segments:
+        segment.packed = locations.get(segment.segment_id)
+
+
+def delete_packed_segments(segments: Sequence[RecordingSegmentStorageMeta]) -> None:
+    """Erase packed segments from their packed objects and delete their locations.
+
+    Every packed object is rewritten once, with the ranges of its deleted segments overwritten
+    with zeroes so that the offsets of the remaining segments stay valid.  Rewrites of an object
+    are serialized with a lock, concurrent deletions would otherwise restore each other's bytes.
+    Storage errors are raised so that the deletion is retried.
+    """
+    segments_by_key: dict[str, list[RecordingSegmentStorageMeta]] = defaultdict(list)
+    for segment in segments:
+        assert segment.packed is not None
+        segments_by_key[segment.packed.key].append(segment)
+
+    for key, key_segments in segments_by_key.items():
+        lock = locks.get(
+            f"replays:packed-segments:{key}", duration=60, name="replays_delete_packed_segments"
+        )
+        with lock.acquire():
+            value = storage_kv.get(key, strict=True)
+            if value is not None:
+                data = bytearray(value)
+                for segment in key_segments:
+                    location = segment.packed
+                    assert location is not None
+                    data[location.offset : location.offset + location.length] = bytes(
+                        location.length
+                    )
+                storage_kv.set(key, bytes(data), strict=True)
+        packed_segment_index.delete_many(key_segments)
+        metrics.incr("replays.lib.storage.packed_segments_deleted", amount=len(key_segments))
+
+
 # Filestore interface. Legacy interface which supports slow-to-update self-hosted users.
 filestore = FilestoreBlob()
 
@@ -235,3 +447,10 @@ storage = StorageBlob()
 
 # Simple Key-value blob storage interface.
 storage_kv = SimpleStorageBlob()
+
+# Locations of packed segments.
+packed_segment_index = LazyServiceWrapper(
+    PackedSegmentIndex,
+    settings.SENTRY_REPLAYS_PACKED_SEGMENT_INDEX,
+    settings.SENTRY_REPLAYS_PACKED_SEGMENT_INDEX_OPTIONS,
+)
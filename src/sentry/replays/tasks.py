@@ -6,7 +6,12 @@ import uuid
 from typing import Any
 
 from sentry.replays.lib.kafka import initialize_replays_publisher
-from sentry.replays.lib.storage import filestore, storage
+from sentry.replays.lib.storage import (
+    attach_packed_segment_locations,
+    delete_packed_segments,
+    filestore,
+    storage,
+)
 from sentry.replays.models import ReplayRecordingSegment
 from sentry.replays.usecases.reader import fetch_segments_metadata
 from sentry.silo import SiloMode
@@ -45,6 +50,9 @@ def delete_replay_recording_async(project_id: int, replay_id: str) -> None:
 def delete_replay_recording(project_id: int, replay_id: str) -> None:
     """Delete all recording-segments associated with a Replay."""
     segments_from_metadata = fetch_segments_metadata(project_id, replay_id, offset=0, limit=10000)
+    attach_packed_segment_locations(
+        [segment for segment in segments_from_metadata if not segment.file_id], force=True
+    )
     metrics.distribution("replays.num_segments_deleted", value=len(segments_from_metadata))
 
     # Fetch any recording-segment models that may have been written.
@@ -54,10 +62,13 @@ def delete_replay_recording(project_id: int, replay_id: str) -> None:
 
     # Filestore and direct storage segments are split into two different delete operations.
     direct_storage_segments = []
+    packed_segments = []
     filestore_segments = []
     for segment in segments_from_metadata:
         if segment.file_id:
             filestore_segments.append(segment)
+        elif segment.packed is not None:
+            packed_segments.append(segment)
         else:
             direct_storage_segments.append(segment)
 
@@ -66,6 +77,10 @@ def delete_replay_recording(project_id: int, replay_id: str) -> None:
         with cf.ThreadPoolExecutor(max_workers=100) as pool:
             pool.map(storage.delete, direct_storage_segments)
 
+    # Packed objects are rewritten once for all segments of the replay they hold.
+    if packed_segments:
+        delete_packed_segments(packed_segments)
+
     # This will only run if "filestore" was used to store the files. This hasn't been the
     # case since March of 2023. This exists to serve self-hosted customers with the filestore
     # configuration still enabled. This should be fast enough for those use-cases.
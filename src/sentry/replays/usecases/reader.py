@@ -1,13 +1,17 @@
 from __future__ import annotations
 
-import functools
+import itertools
+import threading
 import uuid
 import zlib
-from collections.abc import Iterator
-from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
 
 import sentry_sdk
+import zstandard
+from cachetools import TTLCache
 from django.conf import settings
 from django.db.models import Prefetch
 from sentry_sdk.tracing import Span
@@ -29,12 +33,14 @@ from sentry.models.files.file import File
 from sentry.models.files.fileblobindex import FileBlobIndex
 from sentry.replays.lib.storage import (
     RecordingSegmentStorageMeta,
+    attach_packed_segment_locations,
     filestore,
     make_video_filename,
     storage,
     storage_kv,
 )
 from sentry.replays.models import ReplayRecordingSegment
+from sentry.utils import metrics
 from sentry.utils.snuba import raw_snql_query
 
 # METADATA QUERY BEHAVIOR.
@@ -230,7 +236,11 @@ def _fetch_segments_from_snuba(
     )
     response = raw_snql_query(snuba_request, "replays.query.download_replay_segments")
 
-    return [segment_row_to_storage_meta(project_id, replay_id, item) for item in response["data"]]
+    segments = [
+        segment_row_to_storage_meta(project_id, replay_id, item) for item in response["data"]
+    ]
+    attach_packed_segment_locations(segments)
+    return segments
 
 
 def segment_row_to_storage_meta(
@@ -255,32 +265,135 @@ def download_video(segment: RecordingSegmentStorageMeta) -> bytes | None:
     return storage_kv.get(make_video_filename(segment))
 
 
-def download_segments(segments: list[RecordingSegmentStorageMeta]) -> Iterator[bytes]:
-    """Download segment data from remote storage."""
+# Number of segments downloaded concurrently ahead of the segment being streamed.
+DOWNLOAD_WINDOW = 10
 
-    # start a sentry transaction to pass to the thread pool workers
-    with sentry_sdk.start_span(op="download_segments", description="thread_pool") as span:
-        download_segment_with_fixed_args = functools.partial(
-            download_segment,
-            span=span,
+# Size of the compressed chunks fed to the decompressor while streaming a segment.
+DECOMPRESS_CHUNK_SIZE = 64 * 1024
+
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+class SegmentCache:
+    """Short-lived in-process cache of decompressed recording segments.
+
+    The replay player pages through the segments of a replay and frequently requests the same
+    pages again.  Only segments of at most `max_segment_bytes` are cached and the cache holds
+    at most `max_bytes` in total.
+    """
+
+    def __init__(self, max_bytes: int, max_segment_bytes: int, ttl: int) -> None:
+        self.max_segment_bytes = max_segment_bytes
+        self._cache: TTLCache[tuple[int, str, int, int | None], bytes] = TTLCache(
+            maxsize=max_bytes, ttl=ttl, getsizeof=len
         )
-        current_hub = sentry_sdk.Hub.current
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(segment: RecordingSegmentStorageMeta) -> tuple[int, str, int, int | None]:
+        return (segment.project_id, segment.replay_id, segment.segment_id, segment.file_id)
+
+    def get(self, segment: RecordingSegmentStorageMeta) -> bytes | None:
+        with self._lock:
+            result = self._cache.get(self._key(segment))
+        metrics.incr("replays.reader.segment_cache", tags={"hit": result is not None})
+        return result
+
+    def set(self, segment: RecordingSegmentStorageMeta, value: bytes) -> None:
+        if len(value) > self.max_segment_bytes:
+            return
+        with self._lock:
+            self._cache[self._key(segment)] = value
+
+
+segment_cache = SegmentCache(max_bytes=64 * 1024 * 1024, max_segment_bytes=8 * 1024 * 1024, ttl=60)
+
+
+def download_segments(segments: Iterable[RecordingSegmentStorageMeta]) -> Iterator[bytes]:
+    """Stream segment data from remote storage as a JSON array.
+
+    At most `DOWNLOAD_WINDOW` segments are downloaded concurrently ahead of the segment being
+    streamed.  Segments are yielded in order and decompressed incrementally as they are
+    streamed.
+    """
+    with sentry_sdk.start_span(op="download_segments", description="thread_pool") as span:
+        exe = ThreadPoolExecutor(max_workers=DOWNLOAD_WINDOW)
+        pending: deque[tuple[RecordingSegmentStorageMeta, bytes | None, Future | None]] = deque()
+        remaining = iter(segments)
+
+        def fill_window() -> None:
+            for segment in itertools.islice(remaining, DOWNLOAD_WINDOW - len(pending)):
+                cached = segment_cache.get(segment)
+                if cached is not None:
+                    pending.append((segment, cached, None))
+                else:
+                    pending.append((segment, None, exe.submit(download_raw_segment, segment, span)))
+
+        try:
+            yield b"["
+            fill_window()
+            first = True
+            while pending:
+                segment, cached, future = pending.popleft()
+                fill_window()
 
-        yield b"["
-        # Map all of the segments to a worker process for download.
-        with ThreadPoolExecutor(max_workers=10) as exe:
-            with sentry_sdk.Hub(current_hub):
-                results = exe.map(download_segment_with_fixed_args, segments)
+                if not first:
+                    yield b","
+                first = False
+
+                if cached is not None:
+                    yield cached
+                    continue
 
-            for i, result in enumerate(results):
+                assert future is not None
+                result = future.result()
                 if result is None:
                     yield b"[]"
                 else:
-                    yield result
+                    yield from stream_decompress(segment, result)
+            yield b"]"
+        finally:
+            # The response may be closed before all segments were streamed.
+            exe.shutdown(wait=False, cancel_futures=True)
+
+
+def download_raw_segment(segment: RecordingSegmentStorageMeta, span: Span) -> bytes | None:
+    """Return the (possibly compressed) segment blob data."""
+    with span.start_child(op="download_segment", description="download"):
+        driver = filestore if segment.file_id else storage
+        return driver.get(segment)
+
+
+def stream_decompress(segment: RecordingSegmentStorageMeta, buffer: bytes) -> Iterator[bytes]:
+    """Yield the decompressed segment in chunks, caching it if it is small enough."""
+    chunks: list[bytes] | None = []
+    size = 0
+    for chunk in _iter_decompressed(buffer):
+        size += len(chunk)
+        if size > segment_cache.max_segment_bytes:
+            chunks = None
+        elif chunks is not None:
+            chunks.append(chunk)
+        yield chunk
+
+    if chunks is not None:
+        segment_cache.set(segment, b"".join(chunks))
 
-                if i < len(segments) - 1:
-                    yield b","
-        yield b"]"
+
+def _iter_decompressed(buffer: bytes) -> Iterator[bytes]:
+    if buffer.startswith(b"["):
+        yield buffer
+        return
+
+    decompressor = _decompressobj(buffer)
+    for offset in range(0, len(buffer), DECOMPRESS_CHUNK_SIZE):
+        chunk = decompressor.decompress(buffer[offset : offset + DECOMPRESS_CHUNK_SIZE])
+        if chunk:
+            yield chunk
+
+    chunk = decompressor.flush()
+    if chunk:
+        yield chunk
 
 
 def download_segment(
@@ -288,6 +401,10 @@ def download_segment(
     span: Span,
 ) -> bytes | None:
     """Return the segment blob data."""
+    cached = segment_cache.get(segment)
+    if cached is not None:
+        return cached
+
     with span.start_child(
         op="download_segment",
         description="thread_task",
@@ -305,7 +422,16 @@ def download_segment(
             op="download_segment",
             description="decompress",
         ):
-            return decompress(result)
+            result = decompress(result)
+
+        segment_cache.set(segment, result)
+        return result
+
+
+def _decompressobj(buffer: bytes):
+    if buffer.startswith(ZSTD_MAGIC):
+        return zstandard.ZstdDecompressor().decompressobj()
+    return zlib.decompressobj(zlib.MAX_WBITS | 32)
 
 
 def decompress(buffer: bytes) -> bytes:
@@ -317,4 +443,8 @@ def decompress(buffer: bytes) -> bytes:
     if buffer.startswith(b"["):
         return buffer
 
+    if buffer.startswith(ZSTD_MAGIC):
+        # Frames written in streaming mode do not carry their content size.
+        return zstandard.ZstdDecompressor().decompressobj().decompress(buffer)
+
     return zlib.decompress(buffer, zlib.MAX_WBITS | 32)
@@ -152,7 +152,7 @@ def backup_unprocessed_event(data: dict[str, Any]) -> None:
     if options.get("store.reprocessing-force-disable"):
         return
 
-    event_processing_store.store(dict(data), unprocessed=True)
+    event_processing_store.store(dict(data), unprocessed=True, stage="reprocess")
 
 
 @dataclass
@@ -209,7 +209,7 @@ def reprocess_event(project_id: int, event_id: str, start_time: float) -> None:
     set_path(
         data, "contexts", "reprocessing", "original_primary_hash", value=event.get_primary_hash()
     )
-    cache_key = event_processing_store.store(data)
+    cache_key = event_processing_store.store(data, stage="reprocess")
 
     # Step 2: Copy attachments into attachment cache. Note that we can only
     # consider minidumps because filestore just stays as-is after reprocessing
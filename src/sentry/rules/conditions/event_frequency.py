@@ -12,7 +12,7 @@ from django import forms
 from django.core.cache import cache
 from django.utils import timezone
 
-from sentry import release_health, tsdb
+from sentry import options, release_health, tsdb
 from sentry.eventstore.models import GroupEvent
 from sentry.issues.constants import get_issue_tsdb_group_model, get_issue_tsdb_user_group_model
 from sentry.receivers.rules import DEFAULT_RULE_LABEL, DEFAULT_RULE_LABEL_NEW
@@ -187,8 +187,39 @@ class BaseEventFrequencyCondition(EventCondition, abc.ABC):
         raise NotImplementedError  # subclass must implement
 
     def get_rate(self, event: GroupEvent, interval: str, environment_id: str) -> int:
+        """
+        Returns the rate for the event's group, reusing a result computed for another event or rule
+        within the same time bucket if `rules.condition-cache.ttl` is set. The rate does not depend
+        on the rule's threshold, so all rules with the same condition options share an entry.
+        """
+        ttl = options.get("rules.condition-cache.ttl")
+        if not ttl:
+            return self._get_rate(event, interval, environment_id, timezone.now())
+
+        now = timezone.now()
+        cache_key = "r.c.rate:{}:{}:{}:{}:{}:{}:{}".format(
+            self.id,
+            event.group_id,
+            environment_id,
+            interval,
+            self.get_option("comparisonType", COMPARISON_TYPE_COUNT),
+            self.get_option("comparisonInterval"),
+            int(now.timestamp()) // ttl,
+        )
+        result = cache.get(cache_key)
+        metrics.incr(
+            "rules.conditions.rate_cache",
+            tags={"condition": self.id.rsplit(".", 1)[-1], "hit": result is not None},
+        )
+        if result is None:
+            result = self._get_rate(event, interval, environment_id, now)
+            cache.set(cache_key, result, ttl)
+        return result
+
+    def _get_rate(
+        self, event: GroupEvent, interval: str, environment_id: str, end: datetime
+    ) -> int:
         _, duration = self.intervals[interval]
-        end = timezone.now()
         # For conditions with interval >= 1 hour we don't need to worry about read your writes
         # consistency. Disable it so that we can scale to more nodes.
         option_override_cm: contextlib.AbstractContextManager[object] = contextlib.nullcontext()
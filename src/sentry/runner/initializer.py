@@ -532,6 +532,9 @@ def bind_cache_to_option_store() -> None:
 
     default_store.set_cache_impl(default_cache)
 
+    if settings.SENTRY_OPTIONS_SNAPSHOT:
+        default_store.enable_snapshot(settings.SENTRY_OPTIONS_SNAPSHOT_INTERVAL)
+
 
 def apply_legacy_settings(settings: Any) -> None:
     from sentry import options
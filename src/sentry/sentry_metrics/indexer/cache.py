@@ -2,9 +2,13 @@ from __future__ import annotations
 
 import logging
 import random
-from collections.abc import Collection, Iterable, Mapping, MutableMapping, Sequence
+import threading
+import time
+from collections.abc import Callable, Collection, Iterable, Mapping, MutableMapping, Sequence
 from datetime import datetime, timedelta
+from typing import Any
 
+from cachetools import TTLCache
 from django.conf import settings
 from django.core.cache import caches
 
@@ -37,6 +41,10 @@ _INDEXER_CACHE_STALE_KEYS_METRIC = "sentry_metrics.indexer.memcache.stale-keys"
 # only used to compare to the older version of the PGIndexer
 _INDEXER_CACHE_FETCH_METRIC = "sentry_metrics.indexer.memcache.fetch"
 
+_INDEXER_LOCAL_CACHE_METRIC = "sentry_metrics.indexer.local_cache"
+_INDEXER_LOCAL_CACHE_EVICTION_METRIC = "sentry_metrics.indexer.local_cache.evictions"
+_INDEXER_LOCAL_CACHE_COALESCED_METRIC = "sentry_metrics.indexer.local_cache.coalesced"
+
 
 NAMESPACED_WRITE_FEAT_FLAG = "sentry-metrics.indexer.write-new-cache-namespace"
 NAMESPACED_READ_FEAT_FLAG = "sentry-metrics.indexer.read-new-cache-namespace"
@@ -205,10 +213,130 @@ class StringIndexerCache:
             )
 
 
+# (direction, use case, org id, string or id)
+LocalCacheKey = tuple[str, str, int, Any]
+
+RESOLVE = "resolve"
+REVERSE_RESOLVE = "reverse_resolve"
+
+
+class _LocalTTLCache(TTLCache[LocalCacheKey, Any]):
+    def popitem(self) -> tuple[LocalCacheKey, Any]:
+        # Only called when evicting the least recently used entry to make room, not on expiry.
+        key, value = super().popitem()
+        metrics.incr(_INDEXER_LOCAL_CACHE_EVICTION_METRIC, tags={"use_case": key[1]})
+        return key, value
+
+
+class _Call:
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.failed = False
+
+
+class LocalIndexerCache:
+    """
+    A bounded in-process LRU of indexer lookups in both directions, in front of the shared
+    `StringIndexerCache`.
+
+    Strings never change their ID once indexed, so entries can only go stale when a string is
+    deleted, which is bounded by `ttl`. Only found mappings are stored.
+
+    Concurrent misses for the same key are coalesced: the first caller performs the lookup and
+    all others wait for and share its result.
+    """
+
+    def __init__(self, maxsize: int, ttl: int, timer: Callable[[], float] = time.monotonic) -> None:
+        self._lock = threading.Lock()
+        self._cache = _LocalTTLCache(maxsize=maxsize, ttl=ttl, timer=timer)
+        self._calls: dict[LocalCacheKey, _Call] = {}
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._cache)
+
+    def get(self, key: LocalCacheKey) -> Any:
+        with self._lock:
+            rv = self._cache.get(key)
+        metrics.incr(
+            _INDEXER_LOCAL_CACHE_METRIC,
+            tags={
+                "cache_hit": "true" if rv is not None else "false",
+                "direction": key[0],
+                "use_case": key[1],
+            },
+        )
+        return rv
+
+    def set(self, key: LocalCacheKey, value: Any) -> None:
+        if value is None:
+            return
+        with self._lock:
+            self._cache[key] = value
+
+    def set_mapping(self, use_case_id: str, org_id: int, string: str, id: int) -> None:
+        with self._lock:
+            self._cache[(RESOLVE, use_case_id, org_id, string)] = id
+            self._cache[(REVERSE_RESOLVE, use_case_id, org_id, id)] = string
+
+    def get_or_fetch(self, key: LocalCacheKey, fetch: Callable[[], Any]) -> Any:
+        rv = self.get(key)
+        if rv is not None:
+            return rv
+
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if call is None:
+                call = self._calls[key] = _Call()
+
+        if not is_leader:
+            metrics.incr(
+                _INDEXER_LOCAL_CACHE_COALESCED_METRIC,
+                tags={"direction": key[0], "use_case": key[1]},
+            )
+            call.done.wait()
+            if not call.failed:
+                return call.result
+            # The leader failed, don't share its exception but try on our own.
+            return fetch()
+
+        try:
+            call.result = fetch()
+            self.set(key, call.result)
+        except BaseException:
+            call.failed = True
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result
+
+
+def build_local_indexer_cache() -> LocalIndexerCache | None:
+    """
+    Returns a `LocalIndexerCache` configured by `SENTRY_METRICS_INDEXER_LOCAL_CACHE`, or `None`
+    if it is disabled.
+    """
+    config = settings.SENTRY_METRICS_INDEXER_LOCAL_CACHE
+    if not config:
+        return None
+    return LocalIndexerCache(**config)
+
+
 class CachingIndexer(StringIndexer):
-    def __init__(self, cache: StringIndexerCache, indexer: StringIndexer) -> None:
+    def __init__(
+        self,
+        cache: StringIndexerCache,
+        indexer: StringIndexer,
+        local_cache: LocalIndexerCache | None = None,
+    ) -> None:
         self.cache = cache
         self.indexer = indexer
+        self.local_cache = local_cache
 
     def bulk_record(
         self, strings: Mapping[UseCaseID, Mapping[OrgId, set[str]]]
@@ -268,6 +396,18 @@ class CachingIndexer(StringIndexer):
 
     @metric_path_key_compatible_resolve
     def resolve(self, use_case_id: UseCaseID, org_id: int, string: str) -> int | None:
+        if self.local_cache is None:
+            return self._resolve(use_case_id, org_id, string)
+
+        id = self.local_cache.get_or_fetch(
+            (RESOLVE, use_case_id.value, org_id, string),
+            lambda: self._resolve(use_case_id, org_id, string),
+        )
+        if id is not None:
+            self.local_cache.set((REVERSE_RESOLVE, use_case_id.value, org_id, id), string)
+        return id
+
+    def _resolve(self, use_case_id: UseCaseID, org_id: int, string: str) -> int | None:
         key = f"{use_case_id.value}:{org_id}:{string}"
         result = self.cache.get(RESOLVE_CACHE_NAMESPACE, key)
 
@@ -298,12 +438,39 @@ class CachingIndexer(StringIndexer):
 
     @metric_path_key_compatible_rev_resolve
     def reverse_resolve(self, use_case_id: UseCaseID, org_id: int, id: int) -> str | None:
-        return self.indexer.reverse_resolve(use_case_id, org_id, id)
+        if self.local_cache is None:
+            return self.indexer.reverse_resolve(use_case_id, org_id, id)
+
+        string = self.local_cache.get_or_fetch(
+            (REVERSE_RESOLVE, use_case_id.value, org_id, id),
+            lambda: self.indexer.reverse_resolve(use_case_id, org_id, id),
+        )
+        if string is not None:
+            self.local_cache.set((RESOLVE, use_case_id.value, org_id, string), id)
+        return string
 
     def bulk_reverse_resolve(
         self, use_case_id: UseCaseID, org_id: int, ids: Collection[int]
     ) -> Mapping[int, str]:
-        return self.indexer.bulk_reverse_resolve(use_case_id, org_id, ids)
+        if self.local_cache is None:
+            return self.indexer.bulk_reverse_resolve(use_case_id, org_id, ids)
+
+        results: dict[int, str] = {}
+        missing_ids = []
+        for id in ids:
+            string = self.local_cache.get((REVERSE_RESOLVE, use_case_id.value, org_id, id))
+            if string is None:
+                missing_ids.append(id)
+            else:
+                results[id] = string
+
+        if missing_ids:
+            fetched = self.indexer.bulk_reverse_resolve(use_case_id, org_id, missing_ids)
+            for id, string in fetched.items():
+                self.local_cache.set_mapping(use_case_id.value, org_id, string, id)
+            results.update(fetched)
+
+        return results
 
     def resolve_shared_org(self, string: str) -> int | None:
         raise NotImplementedError(
@@ -21,7 +21,11 @@ from sentry.sentry_metrics.indexer.base import (
     metric_path_key_compatible_resolve,
     metric_path_key_compatible_rev_resolve,
 )
-from sentry.sentry_metrics.indexer.cache import CachingIndexer, StringIndexerCache
+from sentry.sentry_metrics.indexer.cache import (
+    CachingIndexer,
+    StringIndexerCache,
+    build_local_indexer_cache,
+)
 from sentry.sentry_metrics.indexer.limiters.writes import writes_limiter_factory
 from sentry.sentry_metrics.indexer.postgres.models import TABLE_MAPPING, BaseIndexer, IndexerTable
 from sentry.sentry_metrics.indexer.strings import StaticStringIndexer
@@ -324,4 +328,8 @@ class PGStringIndexerV2(StringIndexer):
 
 class PostgresIndexer(StaticStringIndexer):
     def __init__(self) -> None:
-        super().__init__(CachingIndexer(indexer_cache, PGStringIndexerV2()))
+        super().__init__(
+            CachingIndexer(
+                indexer_cache, PGStringIndexerV2(), local_cache=build_local_indexer_cache()
+            )
+        )
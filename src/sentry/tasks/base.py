@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import resource
 from collections.abc import Callable, Iterable
-from contextlib import contextmanager
+from contextlib import contextmanager, nullcontext
 from datetime import datetime
 from functools import wraps
 from typing import Any
@@ -74,7 +74,14 @@ def load_model_from_db(cls, instance_or_id, allow_cache=True):
     return instance_or_id
 
 
-def instrumented_task(name, stat_suffix=None, silo_mode=None, record_timing=False, **kwargs):
+def instrumented_task(
+    name,
+    stat_suffix=None,
+    silo_mode=None,
+    record_timing=False,
+    memoize_features=False,
+    **kwargs,
+):
     """
     Decorator for defining celery tasks.
 
@@ -84,6 +91,8 @@ def instrumented_task(name, stat_suffix=None, silo_mode=None, record_timing=Fals
     - sentry sdk tagging.
     - hybrid cloud silo restrictions
     - disabling of result collection.
+    - with `memoize_features`, memoization of feature checks for the duration
+      of the task (see `sentry.features.memo.feature_memo`).
     """
 
     def wrapped(func):
@@ -111,9 +120,16 @@ def instrumented_task(name, stat_suffix=None, silo_mode=None, record_timing=Fals
                 scope.set_tag("task_name", name)
                 scope.set_tag("transaction_id", transaction_id)
 
+            if memoize_features:
+                from sentry.features.memo import feature_memo
+
+                memo = feature_memo(name)
+            else:
+                memo = nullcontext()
+
             with metrics.timer(key, instance=instance), track_memory_usage(
                 "jobs.memory_change", instance=instance
-            ):
+            ), memo:
                 result = func(*args, **kwargs)
 
             return result
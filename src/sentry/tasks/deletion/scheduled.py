@@ -8,6 +8,7 @@ from django.core.exceptions import ObjectDoesNotExist
 from django.db import router, transaction
 from django.utils import timezone
 
+from sentry import options
 from sentry.exceptions import DeleteAborted
 from sentry.models.scheduledeletion import (
     BaseScheduledDeletion,
@@ -135,6 +136,7 @@ def _run_deletion(
     process_task: Task,
 ) -> None:
     from sentry import deletions
+    from sentry.deletions.planner import DeletionPlanner
 
     logger.info(
         "deletion.started",
@@ -189,7 +191,10 @@ def _run_deletion(
         pending_delete.send(sender=type(instance), instance=instance, actor=actor)
 
     try:
-        has_more = task.chunk()
+        if options.get("deletions.planner.enabled"):
+            has_more = DeletionPlanner(task).run()
+        else:
+            has_more = task.chunk()
         if has_more:
             process_task.apply_async(
                 kwargs={
@@ -532,6 +532,7 @@ def should_update_escalating_metrics(event: Event, is_transaction_event: bool) -
     time_limit=120,
     soft_time_limit=110,
     silo_mode=SiloMode.REGION,
+    memoize_features=True,
 )
 def post_process_group(
     is_new,
@@ -567,7 +568,7 @@ def post_process_group(
             # We use the data being present/missing in the processing store
             # to ensure that we don't duplicate work should the forwarding consumers
             # need to rewind history.
-            data = event_processing_store.get(cache_key)
+            data = event_processing_store.get(cache_key, stage="post_process")
             if not data:
                 logger.info(
                     "post_process.skipped",
@@ -125,38 +125,13 @@ def compute_configs(organization_id=None, project_id=None, public_key=None):
         # it could be possible that refrequent invalidations cause the task to take excessive time
         # to complete.
         for organization in Organization.objects.filter(id=organization_id):
-            for project in Project.objects.filter(organization_id=organization_id):
+            projects = list(Project.objects.filter(organization_id=organization_id))
+            for project in projects:
                 project.set_cached_field_value("organization", organization)
-                for key in ProjectKey.objects.filter(project_id=project.id):
-                    key.set_cached_field_value("project", project)
-                    # If we find the config in the cache it means it was active.  As such we want to
-                    # recalculate it.  If the config was not there at all, we leave it and avoid the
-                    # cost of re-computation.
-                    if projectconfig_cache.backend.get(key.public_key) is not None:
-                        configs[key.public_key] = compute_projectkey_config(key)
-                        action = "recompute"
-                    else:
-                        action = "not-cached"
-                    metrics.incr(
-                        "relay.projectconfig_cache.invalidation.recompute",
-                        tags={"action": action, "scope": "organization"},
-                    )
+            configs.update(_compute_cached_configs(projects, scope="organization"))
     elif project_id:
-        for project in Project.objects.filter(id=project_id):
-            for key in ProjectKey.objects.filter(project_id=project_id):
-                key.set_cached_field_value("project", project)
-                # If we find the config in the cache it means it was active.  As such we want to
-                # recalculate it.  If the config was not there at all, we leave it and avoid the
-                # cost of re-computation.
-                if projectconfig_cache.backend.get(key.public_key) is not None:
-                    configs[key.public_key] = compute_projectkey_config(key)
-                    action = "recompute"
-                else:
-                    action = "not-cached"
-                    metrics.incr(
-                        "relay.projectconfig_cache.invalidation.recompute",
-                        tags={"action": action, "scope": "project"},
-                    )
+        projects = list(Project.objects.filter(id=project_id))
+        configs.update(_compute_cached_configs(projects, scope="project"))
     elif public_key:
         try:
             key = ProjectKey.objects.get(public_key=public_key)
@@ -179,6 +154,51 @@ def compute_configs(organization_id=None, project_id=None, public_key=None):
     return configs
 
 
+def _compute_cached_configs(projects, scope):
+    """Computes the configs of all keys of the given projects which are in the cache.
+
+    The cache is checked for all keys at once, and the options of the affected projects
+    are loaded in bulk.  Organization-wide parts of the configs are computed once and
+    shared between all keys.
+
+    :returns: A dict mapping the public keys found in the cache to their config.
+    """
+    from sentry.models.options.project_option import ProjectOption
+    from sentry.models.projectkey import ProjectKey
+    from sentry.relay.config.memo import organization_memo
+
+    projects_by_id = {project.id: project for project in projects}
+    keys = list(ProjectKey.objects.filter(project_id__in=projects_by_id.keys()))
+
+    # If we find the config in the cache it means it was active.  As such we want to
+    # recalculate it.  If the config was not there at all, we leave it and avoid the
+    # cost of re-computation.
+    cached_public_keys = projectconfig_cache.backend.exists_many(key.public_key for key in keys)
+    metrics.incr(
+        "relay.projectconfig_cache.invalidation.recompute",
+        amount=len(cached_public_keys),
+        tags={"action": "recompute", "scope": scope},
+    )
+    metrics.incr(
+        "relay.projectconfig_cache.invalidation.recompute",
+        amount=len(keys) - len(cached_public_keys),
+        tags={"action": "not-cached", "scope": scope},
+    )
+
+    keys = [key for key in keys if key.public_key in cached_public_keys]
+    ProjectOption.objects.preload_all_values(
+        [projects_by_id[project_id] for project_id in {key.project_id for key in keys}]
+    )
+
+    configs = {}
+    with organization_memo():
+        for key in keys:
+            key.set_cached_field_value("project", projects_by_id[key.project_id])
+            configs[key.public_key] = compute_projectkey_config(key)
+
+    return configs
+
+
 def compute_projectkey_config(key):
     """Computes a single config for the given :class:`ProjectKey`.
 
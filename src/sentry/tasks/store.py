@@ -149,7 +149,7 @@ def _do_preprocess_event(
     )
 
     if cache_key and data is None:
-        data = processing.event_processing_store.get(cache_key)
+        data = processing.event_processing_store.get(cache_key, stage="preprocess")
 
     if data is None:
         metrics.incr("events.failed", tags={"reason": "cache", "stage": "pre"}, skip_internal=False)
@@ -333,7 +333,7 @@ def do_process_event(
     from sentry.plugins.base import plugins
 
     if data is None:
-        data = processing.event_processing_store.get(cache_key)
+        data = processing.event_processing_store.get(cache_key, stage="process")
 
     if data is None:
         metrics.incr(
@@ -490,7 +490,7 @@ def do_process_event(
             )
             return
 
-        cache_key = processing.event_processing_store.store(data)
+        cache_key = processing.event_processing_store.store(data, stage="process")
 
     return _continue_to_save_event()
 
@@ -690,7 +690,7 @@ def create_failed_event(
     # from the last processing step because we do not want any
     # modifications to take place.
     delete_raw_event(project_id, event_id)
-    data = processing.event_processing_store.get(cache_key)
+    data = processing.event_processing_store.get(cache_key, stage="failed")
 
     if data is None:
         metrics.incr("events.failed", tags={"reason": "cache", "stage": "raw"}, skip_internal=False)
@@ -743,7 +743,7 @@ def _do_save_event(
 
     if cache_key and data is None:
         with metrics.timer("tasks.store.do_save_event.get_cache") as metric_tags:
-            data = processing.event_processing_store.get(cache_key)
+            data = processing.event_processing_store.get(cache_key, stage="save")
             if data is not None:
                 metric_tags["event_type"] = event_type = data.get("type") or "none"
 
@@ -810,7 +810,7 @@ def _do_save_event(
                 if isinstance(data, CANONICAL_TYPES):
                     data = dict(data.items())
                 with metrics.timer("tasks.store.do_save_event.write_processing_cache"):
-                    processing.event_processing_store.store(data)
+                    processing.event_processing_store.store(data, stage="save")
         except HashDiscarded:
             # Delete the event payload from cache since it won't show up in post-processing.
             if cache_key:
@@ -162,7 +162,7 @@ def _do_symbolicate_event(
     symbolicate_platforms: list[SymbolicatorPlatform] | None = None,
 ) -> None:
     if data is None:
-        data = processing.event_processing_store.get(cache_key)
+        data = processing.event_processing_store.get(cache_key, stage="symbolicate")
 
     task_kind = get_kind_from_task(symbolicate_task)
     stacktraces = find_stacktraces_in_data(data)
@@ -359,7 +359,7 @@ def _do_symbolicate_event(
         data = dict(data.items())
 
     if has_changed:
-        cache_key = processing.event_processing_store.store(data)
+        cache_key = processing.event_processing_store.store(data, stage="symbolicate")
 
     return _continue_to_process_event()
 
@@ -0,0 +1,59 @@
+import time
+from typing import Any
+
+
+class InMemoryMessage:
+    def __init__(self, topic: str, value: Any, key: Any, headers: Any) -> None:
+        self._topic = topic
+        self._value = value
+        self._key = key
+        self._headers = headers
+        self._produced = time.monotonic()
+        self._latency: float | None = None
+
+    def topic(self) -> str:
+        return self._topic
+
+    def value(self) -> Any:
+        return self._value
+
+    def key(self) -> Any:
+        return self._key
+
+    def headers(self) -> Any:
+        return self._headers
+
+    def latency(self) -> float | None:
+        return self._latency
+
+
+class InMemoryProducer:
+    """
+    Stand-in for a confluent producer talking to a local broker. Messages are
+    delivered when the producer is polled.
+    """
+
+    def __init__(self) -> None:
+        self.pending: list[tuple[InMemoryMessage, Any]] = []
+        self.delivered: list[InMemoryMessage] = []
+        self.polls = 0
+
+    def __len__(self) -> int:
+        return len(self.pending)
+
+    def produce(self, topic, value=None, key=None, on_delivery=None, headers=None) -> None:
+        self.pending.append((InMemoryMessage(topic, value, key, headers), on_delivery))
+
+    def poll(self, timeout: float = 0.0) -> int:
+        self.polls += 1
+        pending, self.pending = self.pending, []
+        for message, on_delivery in pending:
+            message._latency = time.monotonic() - message._produced
+            self.delivered.append(message)
+            if on_delivery is not None:
+                on_delivery(None, message)
+        return len(pending)
+
+    def flush(self, timeout: float | None = None) -> int:
+        self.poll()
+        return 0
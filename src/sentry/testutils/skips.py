@@ -21,6 +21,22 @@ requires_not_arm64 = pytest.mark.skipif(
 )
 
 
+def _module_available(name: str) -> bool:
+    try:
+        __import__(name)
+    except ModuleNotFoundError:
+        return False
+    else:
+        return True
+
+
+# pytest-benchmark is not part of the dev requirements, benchmarks only run where it is
+# installed. Keep correctness checks out of benchmark tests.
+requires_pytest_benchmark = pytest.mark.skipif(
+    not _module_available("pytest_benchmark"), reason="requires pytest-benchmark"
+)
+
+
 def xfail_if_not_postgres(reason: str) -> Callable[[T], T]:
     def decorator(function: T) -> T:
         return pytest.mark.xfail(os.environ.get("TEST_SUITE") != "postgres", reason=reason)(
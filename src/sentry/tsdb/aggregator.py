@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import atexit
+import logging
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Callable, Iterable
+from datetime import datetime
+from typing import Any
+
+from django.utils import timezone
+
+from sentry.tsdb.base import BaseTSDB, IncrMultiOptions, TSDBModel
+from sentry.utils import metrics
+from sentry.utils.dates import to_datetime
+
+logger = logging.getLogger(__name__)
+
+# (model, key, environment_id, bucket epoch)
+AggregationKey = tuple[TSDBModel, int, "int | None", int]
+
+
+class TSDBWriteAggregator:
+    """
+    Coalesces counter increments and distinct counter records in process memory
+    and writes them to the TSDB backend in batches.
+
+    Writes are grouped by ``(model, key, environment, bucket)`` where the bucket
+    is the timestamp normalized to the finest configured rollup. All coarser
+    rollups are multiples of the finest one, so writing the coalesced value at
+    the bucket start lands in the same rollup buckets as every original write.
+
+    The buffer is flushed once its oldest entry is `window` seconds old, once it
+    holds `max_entries` entries (increments plus distinct values) and when the
+    process exits. The window is enforced by a background thread so that a
+    worker that stops receiving writes does not hold on to increments. Call
+    `flush` explicitly at other lifecycle boundaries, such as worker shutdown.
+
+    `window` and `max_entries` may be callables, which are called on every
+    flush check so that changes to their source (e.g. options) apply without a
+    restart.
+    """
+
+    def __init__(
+        self,
+        backend: BaseTSDB,
+        window: float | Callable[[], float] = 1.0,
+        max_entries: int | Callable[[], int] = 10000,
+    ) -> None:
+        self.backend = backend
+        self._window = window
+        self._max_entries = max_entries
+        self.resolution = min(backend.get_rollups())
+
+        self._lock = threading.Condition()
+        self._counters: dict[AggregationKey, int] = defaultdict(int)
+        self._distinct_values: dict[AggregationKey, set[str]] = defaultdict(set)
+        self._entries = 0
+        self._received = 0
+        self._last_flush = time.monotonic()
+        self._oldest: float | None = None
+        self._thread: threading.Thread | None = None
+
+        atexit.register(self.flush)
+
+    @property
+    def window(self) -> float:
+        return self._window() if callable(self._window) else self._window
+
+    @property
+    def max_entries(self) -> int:
+        return self._max_entries() if callable(self._max_entries) else self._max_entries
+
+    def _bucket(self, timestamp: datetime | None) -> int:
+        if timestamp is None:
+            timestamp = timezone.now()
+        return self.backend.normalize_to_epoch(timestamp, self.resolution)
+
+    def incr_multi(
+        self,
+        items: Iterable[tuple[TSDBModel, int] | tuple[TSDBModel, int, IncrMultiOptions]],
+        timestamp: datetime | None = None,
+        count: int = 1,
+        environment_id: int | None = None,
+    ) -> None:
+        with self._lock:
+            for item in items:
+                if len(item) == 2:
+                    model, key = item
+                    _timestamp, _count = timestamp, count
+                else:
+                    model, key, options = item
+                    _timestamp = options.get("timestamp", timestamp)
+                    _count = options.get("count", count)
+
+                aggregation_key = (model, key, environment_id, self._bucket(_timestamp))
+                if aggregation_key not in self._counters:
+                    self._add_entry()
+                self._counters[aggregation_key] += _count
+                self._received += 1
+
+        self._maybe_flush()
+
+    def record_multi(
+        self,
+        items: Iterable[tuple[TSDBModel, int, Iterable[str]]],
+        timestamp: datetime | None = None,
+        environment_id: int | None = None,
+    ) -> None:
+        bucket = self._bucket(timestamp)
+        with self._lock:
+            for model, key, values in items:
+                distinct_values = self._distinct_values[(model, key, environment_id, bucket)]
+                for value in values:
+                    if value not in distinct_values:
+                        distinct_values.add(value)
+                        self._add_entry()
+                    self._received += 1
+
+        self._maybe_flush()
+
+    def _add_entry(self) -> None:
+        # Must be called with the lock held.
+        if self._oldest is None:
+            self._oldest = time.monotonic()
+            self._ensure_thread()
+            self._lock.notify()
+        self._entries += 1
+
+    def _maybe_flush(self) -> None:
+        if self._entries >= self.max_entries or time.monotonic() - self._last_flush >= self.window:
+            self.flush()
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._run, name="tsdb-write-aggregator", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                while self._oldest is None:
+                    self._lock.wait()
+
+                remaining = self._oldest + self.window - time.monotonic()
+                if remaining > 0:
+                    self._lock.wait(remaining)
+                    continue
+
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("tsdb.aggregator.background_flush_failed")
+
+    def flush(self) -> None:
+        with self._lock:
+            counters, self._counters = self._counters, defaultdict(int)
+            distinct_values, self._distinct_values = self._distinct_values, defaultdict(set)
+            entries, self._entries = self._entries, 0
+            received, self._received = self._received, 0
+            self._last_flush = time.monotonic()
+            self._oldest = None
+
+        if not entries:
+            return
+
+        metrics.distribution("tsdb.aggregator.flushed_entries", entries)
+        metrics.distribution("tsdb.aggregator.coalescing_ratio", received / entries)
+
+        # `incr_multi` takes a single environment but per-item timestamps, so a
+        # flush issues one backend call (one pipeline per host) per environment.
+        incrs: dict[int | None, list[tuple[TSDBModel, int, IncrMultiOptions]]] = defaultdict(list)
+        for (model, key, environment_id, bucket), count in counters.items():
+            incrs[environment_id].append(
+                (model, key, {"timestamp": to_datetime(bucket), "count": count})
+            )
+
+        # `record_multi` takes a single environment and timestamp.
+        records: dict[
+            tuple[int | None, int], list[tuple[TSDBModel, int, Iterable[str]]]
+        ] = defaultdict(list)
+        for (model, key, environment_id, bucket), values in distinct_values.items():
+            records[(environment_id, bucket)].append((model, key, sorted(values)))
+
+        try:
+            for environment_id, items in incrs.items():
+                self.backend.incr_multi(items, environment_id=environment_id)
+            for (environment_id, bucket), record_items in records.items():
+                self.backend.record_multi(
+                    record_items, timestamp=to_datetime(bucket), environment_id=environment_id
+                )
+        except Exception:
+            # Metrics are best effort, do not fail ingestion and do not retry.
+            logger.exception("tsdb.aggregator.flush_failed")
+
+
+_ingest_aggregator: TSDBWriteAggregator | None = None
+_ingest_aggregator_lock = threading.Lock()
+
+
+def get_ingest_aggregator() -> TSDBWriteAggregator:
+    """
+    Returns the process-wide aggregator used by `save_event`.
+
+    Its window and size limit follow the ``tsdb.ingest-aggregation.*`` options,
+    and it is flushed when a celery worker (process) shuts down, as ``atexit``
+    handlers do not run in prefork children.
+    """
+    global _ingest_aggregator
+
+    from celery.signals import worker_process_shutdown, worker_shutdown
+
+    from sentry import options, tsdb
+
+    with _ingest_aggregator_lock:
+        if _ingest_aggregator is None:
+            aggregator = TSDBWriteAggregator(
+                tsdb.backend,
+                window=lambda: options.get("tsdb.ingest-aggregation.window"),
+                max_entries=lambda: options.get("tsdb.ingest-aggregation.max-entries"),
+            )
+
+            def flush_on_shutdown(**kwargs: Any) -> None:
+                aggregator.flush()
+
+            worker_process_shutdown.connect(flush_on_shutdown, weak=False)
+            worker_shutdown.connect(flush_on_shutdown, weak=False)
+            _ingest_aggregator = aggregator
+        return _ingest_aggregator
@@ -198,21 +198,22 @@ class RedisTSDB(BaseTSDB):
         """
         model_key = self.get_model_key(key)
 
-        if isinstance(model_key, int):
-            vnode = model_key % self.vnodes
-        else:
-            vnode = crc32(force_bytes(model_key)) % self.vnodes
-
         return (
-            "{prefix}{model}:{epoch}:{vnode}".format(
-                prefix=self.prefix,
-                model=model.value,
-                epoch=self.normalize_to_rollup(timestamp, rollup),
-                vnode=vnode,
+            self.make_counter_hash_key(
+                model, self.normalize_to_rollup(timestamp, rollup), self.get_vnode(model_key)
             ),
             self.add_environment_parameter(model_key, environment_id),
         )
 
+    def make_counter_hash_key(self, model: TSDBModel, epoch: int, vnode: int) -> str:
+        return f"{self.prefix}{model.value}:{epoch}:{vnode}"
+
+    def get_vnode(self, model_key: int | str) -> int:
+        if isinstance(model_key, int):
+            return model_key % self.vnodes
+        else:
+            return crc32(force_bytes(model_key)) % self.vnodes
+
     def get_model_key(self, key: int | str | bytes) -> int | str:
         # We specialize integers so that a pure int-map can be optimized by
         # Redis, whereas long strings (say tag values) will store in a more
@@ -337,26 +338,86 @@ class RedisTSDB(BaseTSDB):
         self.validate_arguments([model], [environment_id])
 
         rollup, series = self.get_optimal_rollup_series(start, end, rollup)
-        _series: list[datetime] = [to_datetime(item) for item in series]
+        if not series:
+            return {}
+
+        counts = self.get_counter_matrix(model, keys, series, rollup, environment_id)
+
+        width = len(series)
+        epochs = [float(epoch) for epoch in series]
+        return {
+            key: list(zip(epochs, counts[i * width : (i + 1) * width]))
+            for i, key in enumerate(keys)
+        }
+
+    def get_sums(
+        self,
+        model: TSDBModel,
+        keys: list[int],
+        start: datetime,
+        end: datetime,
+        rollup: int | None = None,
+        environment_id: int | None = None,
+        use_cache: bool = False,
+        jitter_value: int | None = None,
+        tenant_ids: dict[str, str | int] | None = None,
+        referrer_suffix: str | None = None,
+    ) -> dict[int, int]:
+        self.validate_arguments([model], [environment_id])
+
+        rollup, series = self.get_optimal_rollup_series(start, end, rollup)
+        if not series:
+            return {}
+
+        counts = self.get_counter_matrix(model, keys, series, rollup, environment_id)
+
+        width = len(series)
+        return {key: sum(counts[i * width : (i + 1) * width]) for i, key in enumerate(keys)}
+
+    def get_counter_matrix(
+        self,
+        model: TSDBModel,
+        keys: list[int],
+        series: list[int],
+        rollup: int,
+        environment_id: int | None,
+    ) -> list[int]:
+        """
+        Fetches the counter of every ``(key, timestamp)`` pair, issuing one
+        ``HMGET`` per counter hash instead of one ``HGET`` per pair.
+
+        The result is a flat, row-major matrix: the counter of ``keys[i]`` at
+        ``series[j]`` is stored at index ``i * len(series) + j``. Missing
+        counters are 0.
+        """
+        width = len(series)
+        epochs = [self.normalize_ts_to_rollup(timestamp, rollup) for timestamp in series]
+
+        # hash key -> (hash fields, matrix positions)
+        requests: dict[str, tuple[list[str | int], list[int]]] = {}
+        for i, key in enumerate(keys):
+            model_key = self.get_model_key(key)
+            vnode = self.get_vnode(model_key)
+            hash_field = self.add_environment_parameter(model_key, environment_id)
+            for j, epoch in enumerate(epochs):
+                hash_key = self.make_counter_hash_key(model, epoch, vnode)
+                fields, positions = requests.setdefault(hash_key, ([], []))
+                fields.append(hash_field)
+                positions.append(i * width + j)
 
-        results: list[tuple[float, int, Any]] = []
         cluster, _ = self.get_cluster(environment_id)
         with cluster.map() as client:
-            for key in keys:
-                for timestamp in _series:
-                    hash_key, hash_field = self.make_counter_key(
-                        model, rollup, timestamp, key, environment_id
-                    )
-                    results.append((timestamp.timestamp(), key, client.hget(hash_key, hash_field)))
-
-        results_by_key: dict[int, dict[float, int]] = defaultdict(dict)
-        for epoch, key, count in results:
-            results_by_key[key][epoch] = int(count.value or 0)
+            responses = [
+                (positions, client.hmget(hash_key, fields))
+                for hash_key, (fields, positions) in requests.items()
+            ]
 
-        output: dict[int, list[tuple[float, int]]] = {}
-        for key, points in results_by_key.items():
-            output[key] = sorted(points.items())
-        return output
+        counts = [0] * (len(keys) * width)
+        for positions, promise in responses:
+            for position, value in zip(positions, promise.value):
+                if value is not None:
+                    counts[position] = int(value)
+        return counts
 
     def merge(
         self,
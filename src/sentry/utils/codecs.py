@@ -1,10 +1,13 @@
+import time
 import zlib
 from abc import ABC, abstractmethod
-from typing import Generic, TypeVar
+from collections.abc import Callable, Mapping
+from typing import Any, Generic, TypeVar
 
+import msgpack
 import zstandard
 
-from sentry.utils import json
+from sentry.utils import json, metrics
 from sentry.utils.json import JSONData
 
 T = TypeVar("T")
@@ -87,8 +90,133 @@ class ZlibCodec(Codec[bytes, bytes]):
 
 
 class ZstdCodec(Codec[bytes, bytes]):
+    """
+    Compress/decompress bytes with zstd, optionally using a (trained)
+    dictionary. Values compressed with a dictionary can only be decompressed
+    with the same dictionary.
+    """
+
+    def __init__(self, level: int = 3, dictionary: bytes | None = None) -> None:
+        self.level = level
+        self.dictionary = zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+
     def encode(self, value: bytes) -> bytes:
-        return zstandard.ZstdCompressor().compress(value)
+        return zstandard.ZstdCompressor(level=self.level, dict_data=self.dictionary).compress(value)
 
     def decode(self, value: bytes) -> bytes:
-        return zstandard.ZstdDecompressor().decompress(value)
+        return zstandard.ZstdDecompressor(dict_data=self.dictionary).decompress(value)
+
+
+def _msgpack_default(value: Any) -> Any:
+    # Mappings other than dicts (e.g. `CanonicalKeyDict`) are packed as dicts.
+    if isinstance(value, Mapping):
+        return dict(value)
+    raise TypeError(f"can not serialize {type(value).__name__!r} object")
+
+
+class MsgpackCodec(Codec[JSONData, bytes]):
+    """
+    Encode/decode Python data structures to/from msgpack. Any mapping is
+    encoded as a map and decoded as a dict.
+    """
+
+    def encode(self, value: JSONData) -> bytes:
+        return msgpack.packb(value, use_bin_type=True, default=_msgpack_default)
+
+    def decode(self, value: bytes) -> JSONData:
+        return msgpack.unpackb(value, raw=False, strict_map_key=False)
+
+
+class VersionedCodec(Codec[TDecoded, bytes]):
+    """
+    Prefixes encoded values with a header naming the codec they were encoded
+    with, so that the codec used for new values can change while values
+    written earlier remain readable.
+
+    Values without a header are encoded and decoded with `legacy`, which is
+    also used for writing if `version` is ``None``. The header starts with a
+    NUL byte, which neither JSON nor text payloads ever start with.
+
+    If the current codec cannot encode a value (msgpack, for instance, cannot
+    represent integers exceeding 64 bits), it is encoded with `legacy` and
+    ``codecs.versioned.fallback`` is incremented.
+    """
+
+    HEADER_MARKER = b"\x00"
+
+    def __init__(
+        self,
+        codecs: Mapping[int, Codec[TDecoded, bytes]],
+        version: int | None,
+        legacy: Codec[TDecoded, bytes],
+    ) -> None:
+        assert all(0 <= v < 256 for v in codecs)
+        assert version is None or version in codecs
+        self.codecs = codecs
+        self.version = version
+        self.legacy = legacy
+
+    def encode(self, value: TDecoded) -> bytes:
+        if self.version is None:
+            return self.legacy.encode(value)
+        try:
+            encoded = self.codecs[self.version].encode(value)
+        except (OverflowError, TypeError, ValueError) as e:
+            metrics.incr(
+                "codecs.versioned.fallback",
+                tags={"version": str(self.version), "error": type(e).__name__},
+            )
+            return self.legacy.encode(value)
+        return self.HEADER_MARKER + bytes([self.version]) + encoded
+
+    def decode(self, value: bytes) -> TDecoded:
+        if value[:1] != self.HEADER_MARKER:
+            return self.legacy.decode(value)
+        return self.codecs[value[1]].decode(value[2:])
+
+
+class InstrumentedCodec(Codec[TDecoded, TEncoded]):
+    """
+    Records the duration of encoding and decoding, and the encoded size, as
+    ``<prefix>.encode``, ``<prefix>.decode`` and ``<prefix>.size``, tagged with
+    the `name` of the codec as ``codec`` and with the tags returned by
+    `get_tags` at the time of the call.
+    """
+
+    def __init__(
+        self,
+        codec: Codec[TDecoded, TEncoded],
+        prefix: str,
+        name: str,
+        get_tags: Callable[[], Mapping[str, str]] | None = None,
+    ) -> None:
+        self.codec = codec
+        self.prefix = prefix
+        self.name = name
+        self.get_tags = get_tags
+
+    @property
+    def tags(self) -> dict[str, str]:
+        tags = {"codec": self.name}
+        if self.get_tags is not None:
+            tags.update(self.get_tags())
+        return tags
+
+    def encode(self, value: TDecoded) -> TEncoded:
+        start = time.perf_counter()
+        rv = self.codec.encode(value)
+        tags = self.tags
+        metrics.distribution(
+            f"{self.prefix}.encode", time.perf_counter() - start, tags=tags, unit="second"
+        )
+        if isinstance(rv, (str, bytes)):
+            metrics.distribution(f"{self.prefix}.size", len(rv), tags=tags, unit="byte")
+        return rv
+
+    def decode(self, value: TEncoded) -> TDecoded:
+        start = time.perf_counter()
+        rv = self.codec.decode(value)
+        metrics.distribution(
+            f"{self.prefix}.decode", time.perf_counter() - start, tags=self.tags, unit="second"
+        )
+        return rv
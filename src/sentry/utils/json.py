@@ -119,10 +119,18 @@ def dump(value: JSONData, fp: IO[str], **kwargs: NoReturn) -> None:
 
 
 # NoReturn here is to make this a mypy error to pass kwargs, since they are currently silently dropped
-def dumps(value: JSONData, escape: bool = False, **kwargs: NoReturn) -> str:
+def dumps(
+    value: JSONData, escape: bool = False, use_rapid_json: bool = False, **kwargs: NoReturn
+) -> str:
     # Legacy use. Do not use. Use dumps_htmlsafe
     if escape:
         return _default_escaped_encoder.encode(value)
+    if use_rapid_json is True:
+        try:
+            return rapidjson.dumps(value, default=better_default_encoder, allow_nan=False)
+        except (TypeError, ValueError, OverflowError):
+            # NaN values and non-string keys are handled by the default encoder.
+            pass
     return _default_encoder.encode(value)
 
 
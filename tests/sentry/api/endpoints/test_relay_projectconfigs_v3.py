@@ -49,19 +49,19 @@ def call_endpoint(client, relay, private_key, default_projectkey):
 @pytest.fixture
 def projectconfig_cache_get_mock_config(monkeypatch):
     monkeypatch.setattr(
-        "sentry.relay.projectconfig_cache.backend.get",
-        lambda *args, **kwargs: {"is_mock_config": True},
+        "sentry.relay.projectconfig_cache.backend.get_many",
+        lambda public_keys: {public_key: {"is_mock_config": True} for public_key in public_keys},
     )
 
 
 @pytest.fixture
 def single_mock_proj_cached(monkeypatch):
-    def cache_get(*args, **kwargs):
-        if args[0] == "must_exist":
-            return {"is_mock_config": True}
-        return None
+    def cache_get_many(public_keys):
+        if "must_exist" in public_keys:
+            return {"must_exist": {"is_mock_config": True}}
+        return {}
 
-    monkeypatch.setattr("sentry.relay.projectconfig_cache.backend.get", cache_get)
+    monkeypatch.setattr("sentry.relay.projectconfig_cache.backend.get_many", cache_get_many)
 
 
 @pytest.fixture
@@ -1,6 +1,10 @@
 import copy
+import io
+from unittest import mock
 
-from sentry.attachments.base import BaseAttachmentCache, CachedAttachment
+import pytest
+
+from sentry.attachments.base import BaseAttachmentCache, CachedAttachment, MissingAttachmentChunks
 
 
 class InMemoryCache:
@@ -18,6 +22,9 @@ class InMemoryCache:
         assert key not in self.raw_map or raw == self.raw_map[key]
         return copy.deepcopy(self.data.get(key))
 
+    def get_many(self, keys, raw=False):
+        return [self.get(key, raw=raw) for key in keys]
+
     def set(self, key, value, timeout=None, raw=False):
         # Attachment chunks MUST be bytestrings. Josh please don't change this
         # to unicode.
@@ -128,3 +135,52 @@ def test_basic_rate_limited():
     assert att2.id == att.id == 0
     assert att2.data == att.data == b"Hello World! Bye."
     assert att2.rate_limited is True
+
+
+def test_streaming_chunks():
+    data = InMemoryCache()
+    cache = BaseAttachmentCache(data)
+
+    for i in range(20):
+        cache.set_chunk("c:foo", 123, i, b"%02d," % i)
+
+    att = cache.get_from_chunks(key="c:foo", id=123, chunks=20)
+    expected = b"".join(b"%02d," % i for i in range(20))
+
+    with mock.patch.object(data, "get_many", wraps=data.get_many) as get_many:
+        assert list(att.iter_chunks()) == [b"%02d," % i for i in range(20)]
+    # Chunks are fetched in batches.
+    assert get_many.call_count == 3
+
+    with att.open() as f:
+        assert f.read(5) == b"00,01"
+        assert f.read() == expected[5:]
+        assert f.read() == b""
+
+        f.seek(0)
+        assert f.tell() == 0
+        assert f.read() == expected
+
+        with pytest.raises(io.UnsupportedOperation):
+            f.seek(3)
+
+
+def test_streaming_missing_chunks():
+    data = InMemoryCache()
+    cache = BaseAttachmentCache(data)
+
+    cache.set_chunk("c:foo", 123, 0, b"Hello World! ")
+    cache.set_chunk("c:foo", 123, 2, b"Bye.")
+
+    chunks = cache.get_from_chunks(key="c:foo", id=123, chunks=3).iter_chunks()
+    assert next(chunks) == b"Hello World! "
+    with pytest.raises(MissingAttachmentChunks):
+        next(chunks)
+
+
+def test_streaming_unchunked():
+    att = CachedAttachment(name="lol.txt", content_type="text/plain", data=b"Hello World!")
+    assert list(att.iter_chunks()) == [b"Hello World!"]
+    assert att.open().read() == b"Hello World!"
+
+    assert list(CachedAttachment(name="empty.txt", data=b"").iter_chunks()) == []
@@ -9,6 +9,24 @@ from sentry.utils.imports import import_string
 KEY_FMT = "c:1:%s"
 
 
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.keys = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def get(self, key):
+        self.keys.append(key)
+
+    def execute(self):
+        return [self.client.data.get(key) for key in self.keys]
+
+
 class FakeClient:
     def __init__(self):
         self.data = {}
@@ -16,6 +34,9 @@ class FakeClient:
     def get(self, key):
         return self.data[key]
 
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
 
 @pytest.fixture
 def mock_client():
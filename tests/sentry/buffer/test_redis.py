@@ -125,6 +125,83 @@ class TestRedisBuffer:
         group = Group.objects.get_from_cache(id=default_group.id)
         assert group.times_seen == orig_times_seen + times_seen_incr
 
+    @django_db_all
+    @freeze_time()
+    def test_batch_flush_merges_group_updates(self, default_group, task_runner):
+        self.buf.batch_flush = True
+        self.buf.incr_batch_size = 10
+        orig_times_seen = Group.objects.get_from_cache(id=default_group.id).times_seen
+        last_seen = timezone.now()
+        self.buf.incr(Group, {"times_seen": 2}, {"id": default_group.id}, {"last_seen": last_seen})
+        self.buf.incr(Group, {"times_seen": 3}, {"pk": default_group.id})
+        with task_runner(), mock.patch("sentry.buffer", self.buf):
+            self.buf.process_pending()
+
+        group = Group.objects.get_from_cache(id=default_group.id)
+        assert group.times_seen == orig_times_seen + 5
+        assert group.last_seen == last_seen
+        client = get_cluster_routing_client(self.buf.cluster, self.buf.is_redis_cluster)
+        assert client.zrange("b:p", 0, -1) == []
+
+    @django_db_all
+    def test_batch_flush_keeps_counters_merged_with_signal_only_rows(self, default_group):
+        self.buf.batch_flush = True
+        orig_times_seen = Group.objects.get(id=default_group.id).times_seen
+        self.buf.incr(Group, {"times_seen": 2}, {"id": default_group.id})
+        self.buf.incr(Group, {}, {"pk": default_group.id}, signal_only=True)
+        self.buf.process(
+            batch_keys=[
+                self.buf._make_key(Group, {"id": default_group.id}),
+                self.buf._make_key(Group, {"pk": default_group.id}),
+            ]
+        )
+        assert Group.objects.get(id=default_group.id).times_seen == orig_times_seen + 2
+
+    @django_db_all
+    def test_batch_flush_writes_explicit_none(self, default_group):
+        self.buf.batch_flush = True
+        Group.objects.filter(id=default_group.id).update(resolved_at=timezone.now())
+        self.buf.incr(Group, {"times_seen": 1}, {"pk": default_group.id}, {"resolved_at": None})
+        self.buf.process(batch_keys=[self.buf._make_key(Group, {"pk": default_group.id})])
+        assert Group.objects.get(id=default_group.id).resolved_at is None
+
+    @django_db_all
+    @mock.patch("sentry.buffer.base.Buffer.process")
+    @mock.patch("sentry.buffer.redis.bulk_update", side_effect=Exception("boom"))
+    def test_batch_flush_applies_rows_one_by_one_if_bulk_update_fails(self, bulk_update, process):
+        self.buf.batch_flush = True
+        keys = []
+        for pk in (1, 2):
+            self.buf.incr(Group, {"times_seen": pk}, {"pk": pk})
+            keys.append(self.buf._make_key(Group, {"pk": pk}))
+
+        self.buf.process(batch_keys=keys)
+        assert bulk_update.call_count == 1
+        assert process.call_args_list == [
+            mock.call(Group, {"times_seen": 1}, {"pk": 1}, {}, None),
+            mock.call(Group, {"times_seen": 2}, {"pk": 2}, {}, None),
+        ]
+
+    @mock.patch("sentry.buffer.base.Buffer.process")
+    def test_batch_flush_falls_back_for_non_pk_filters(self, process):
+        self.buf.batch_flush = True
+        model = mock.Mock()
+        model.__name__ = "Mock"
+        filters = {"project_id": 1, "release_id": 2}
+        other_filters = {"project_id": 1, "release_id": 3}
+        self.buf.incr(model, {"times_seen": 1}, filters)
+        self.buf.incr(model, {"times_seen": 2}, filters)
+        self.buf.incr(model, {"times_seen": 5}, other_filters)
+        self.buf.process(
+            batch_keys=[
+                self.buf._make_key(model, filters),
+                self.buf._make_key(model, other_filters),
+            ]
+        )
+        assert process.call_count == 2
+        process.assert_any_call(mock.Mock, {"times_seen": 3}, filters, {}, None)
+        process.assert_any_call(mock.Mock, {"times_seen": 5}, other_filters, {}, None)
+
     def test_get(self):
         model = mock.Mock()
         model.__name__ = "Mock"
@@ -5,6 +5,7 @@ from contextlib import closing, contextmanager
 from datetime import datetime
 from threading import Event
 from typing import TypeVar
+from unittest import mock
 
 import pytest
 from arroyo.backends.abstract import Consumer
@@ -483,3 +484,74 @@ def test_synchronized_consumer_worker_crash_after_assignment() -> None:
         synchronized_consumer.poll(0.0)
 
     assert type(e.value.__cause__) is not BrokenConsumerException
+
+
+def test_synchronized_consumer_records_commit_log_wait() -> None:
+    broker: LocalBroker[KafkaPayload] = LocalBroker(MemoryMessageStorage())
+    topic = Topic("topic")
+    commit_log_topic = Topic("commit-log")
+
+    broker.create_topic(topic, partitions=2)
+    broker.create_topic(commit_log_topic, partitions=1)
+
+    consumer = broker.get_consumer("consumer")
+    producer = broker.get_producer()
+    commit_log_consumer = broker.get_consumer("commit-log-consumer")
+
+    messages = [
+        producer.produce(Partition(topic, index), KafkaPayload(None, b"", [])).result(1.0)
+        for index in range(2)
+    ]
+
+    synchronized_consumer: Consumer[KafkaPayload] = SynchronizedConsumer(
+        consumer,
+        commit_log_consumer,
+        commit_log_topic=commit_log_topic,
+        commit_log_groups={"leader"},
+    )
+
+    with closing(synchronized_consumer), mock.patch(
+        "sentry.consumers.synchronized.LAG_METRIC_INTERVAL", 0
+    ), mock.patch("sentry.consumers.synchronized.metrics") as metrics:
+        synchronized_consumer.subscribe([topic])
+        assert synchronized_consumer.poll(0) is None
+        assert synchronized_consumer.poll(0) is None
+        assert set(consumer.paused()) == {Partition(topic, 0), Partition(topic, 1)}
+
+        # Only the partition whose watermark advanced is resumed, the other
+        # one keeps waiting for the commit log.
+        wait_for_consumer(
+            commit_log_consumer,
+            producer.produce(
+                commit_log_topic,
+                commit_codec.encode(
+                    Commit(
+                        "leader",
+                        Partition(topic, 1),
+                        messages[1].next_offset,
+                        datetime.now().timestamp(),
+                        None,
+                    ),
+                ),
+            ).result(),
+        )
+
+        assert synchronized_consumer.poll(0) == messages[1]
+        assert consumer.paused() == [Partition(topic, 0)]
+
+        waits = [
+            call
+            for call in metrics.distribution.call_args_list
+            if call.args[0] == "synchronized_consumer.commit_log_wait"
+        ]
+        assert len(waits) == 1
+        assert waits[0].kwargs["tags"] == {"partition": "1"}
+
+        lag = {
+            call.kwargs["tags"]["partition"]: call.args[1]
+            for call in metrics.gauge.call_args_list
+            if call.args[0] == "synchronized_consumer.lag"
+        }
+        # Reported before the last poll, when partition 1 had one message
+        # available below the watermark.
+        assert lag == {"0": 0, "1": 1}
@@ -0,0 +1,141 @@
+from unittest import mock
+
+from sentry import deletions
+from sentry.cache import default_cache
+from sentry.deletions.base import BaseRelation, BulkModelDeletionTask, ModelRelation
+from sentry.deletions.planner import (
+    DeletionCheckpoint,
+    DeletionPlanner,
+    ReplicationLagThrottle,
+    merge_relations,
+)
+from sentry.models.environment import Environment
+from sentry.models.project import Project
+from sentry.models.projectkey import ProjectKey
+from sentry.monitors.models import (
+    CheckInStatus,
+    Monitor,
+    MonitorCheckIn,
+    MonitorEnvironment,
+    MonitorType,
+    ScheduleType,
+)
+from sentry.testutils.cases import TestCase
+
+
+def make_throttle(lag=0.0, min_batch_size=1, max_batch_size=100, sleep=None):
+    return ReplicationLagThrottle(
+        max_lag=10.0,
+        min_batch_size=min_batch_size,
+        max_batch_size=max_batch_size,
+        get_lag=lambda using: lag,
+        sleep=sleep or mock.Mock(),
+    )
+
+
+def test_merge_relations():
+    relations = [
+        ModelRelation(Monitor, {"project_id": 1}),
+        ModelRelation(ProjectKey, {"project_id": 1}, BulkModelDeletionTask),
+        BaseRelation(params={"groups": []}, task=mock.sentinel.task),
+        ModelRelation(Monitor, {"project_id": 2}),
+        ModelRelation(ProjectKey, {"project_id": 2}, BulkModelDeletionTask),
+        ModelRelation(ProjectKey, {"project_id__in": [3]}, BulkModelDeletionTask),
+    ]
+
+    merged = merge_relations(relations)
+    assert [(r.params.get("model"), r.params.get("query"), r.task) for r in merged] == [
+        (Monitor, {"project_id__in": [1, 2]}, None),
+        (ProjectKey, {"project_id__in": [1, 2]}, BulkModelDeletionTask),
+        (None, None, mock.sentinel.task),
+        (ProjectKey, {"project_id__in": [3]}, BulkModelDeletionTask),
+    ]
+
+
+def test_replication_lag_throttle():
+    sleep = mock.Mock()
+    throttle = make_throttle(min_batch_size=10, max_batch_size=40, sleep=sleep)
+
+    throttle.wait("default")
+    throttle.wait("default")
+    throttle.wait("default")
+    assert throttle.batch_size == 40
+    assert sleep.call_count == 0
+
+    throttle._get_lag = lambda using: 15.0
+    throttle.wait("default")
+    assert throttle.batch_size == 20
+    sleep.assert_called_once_with(15.0)
+
+    # Between half and the full limit the batch size is kept.
+    throttle._get_lag = lambda using: 7.0
+    throttle.wait("default")
+    assert throttle.batch_size == 20
+
+
+class DeletionPlannerTest(TestCase):
+    def create_monitor(self, project, environment):
+        monitor = Monitor.objects.create(
+            organization_id=project.organization.id,
+            project_id=project.id,
+            type=MonitorType.CRON_JOB,
+            config={"schedule": "* * * * *", "schedule_type": ScheduleType.CRONTAB},
+        )
+        monitor_environment = MonitorEnvironment.objects.create(
+            monitor=monitor, environment_id=environment.id
+        )
+        MonitorCheckIn.objects.create(
+            monitor=monitor,
+            monitor_environment=monitor_environment,
+            project_id=project.id,
+            date_added=monitor.date_added,
+            status=CheckInStatus.OK,
+        )
+        return monitor
+
+    def test_cascades_through_child_relations(self):
+        project = self.create_project()
+        environment = Environment.objects.create(
+            organization_id=project.organization_id, name="prod"
+        )
+        monitors = [self.create_monitor(project, environment) for _ in range(3)]
+        other = self.create_monitor(self.create_project(), environment)
+
+        task = deletions.get(model=Monitor, query={"project_id": project.id})
+        assert DeletionPlanner(task, time_budget=60, throttle=make_throttle()).run() is False
+
+        monitor_ids = [monitor.id for monitor in monitors]
+        assert not Monitor.objects.filter(id__in=monitor_ids).exists()
+        assert not MonitorEnvironment.objects.filter(monitor_id__in=monitor_ids).exists()
+        assert not MonitorCheckIn.objects.filter(monitor_id__in=monitor_ids).exists()
+
+        assert MonitorCheckIn.objects.filter(monitor_id=other.id).exists()
+        assert Environment.objects.filter(id=environment.id).exists()
+        assert Project.objects.filter(id=project.id).exists()
+
+    def test_resumes_from_checkpoint(self):
+        project = self.create_project()
+        ProjectKey.objects.filter(project=project).delete()
+        keys = [self.create_project_key(project) for _ in range(3)]
+
+        def get_task():
+            return deletions.get(
+                model=ProjectKey,
+                task=BulkModelDeletionTask,
+                query={"project_id": project.id},
+                transaction_id="abc",
+            )
+
+        planner = DeletionPlanner(get_task(), time_budget=60, throttle=make_throttle(lag=20.0))
+        with mock.patch.object(planner, "_expired", side_effect=[False, True]):
+            assert planner.run() is True
+
+        assert list(
+            ProjectKey.objects.filter(project=project).order_by("id").values_list("id", flat=True)
+        ) == [key.id for key in keys[1:]]
+        assert list(DeletionCheckpoint("abc").positions.values()) == [keys[0].id]
+
+        planner = DeletionPlanner(get_task(), time_budget=60, throttle=make_throttle())
+        assert planner.run() is False
+        assert not ProjectKey.objects.filter(project=project).exists()
+        assert default_cache.get("deletions:checkpoint:abc") is None
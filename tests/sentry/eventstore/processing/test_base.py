@@ -0,0 +1,22 @@
+from unittest import mock
+
+from sentry.eventstore.processing.base import EventProcessingStore, get_codec
+from sentry.utils.kvstore.encoding import KVStorageCodecWrapper
+from sentry.utils.kvstore.memory import MemoryKVStorage
+
+
+def test_codec_metrics_are_tagged_with_stage():
+    store = EventProcessingStore(KVStorageCodecWrapper(MemoryKVStorage(), get_codec("msgpack")))
+    event = {"project": 1, "event_id": "a" * 32}
+
+    with mock.patch("sentry.utils.codecs.metrics.distribution") as distribution:
+        key = store.store(event, stage="preprocess")
+        assert store.get(key, stage="save") == event
+        assert store.get(key) == event
+
+    assert [(call.args[0], call.kwargs["tags"]) for call in distribution.call_args_list] == [
+        ("eventstore.processing.codec.encode", {"codec": "msgpack", "stage": "preprocess"}),
+        ("eventstore.processing.codec.size", {"codec": "msgpack", "stage": "preprocess"}),
+        ("eventstore.processing.codec.decode", {"codec": "msgpack", "stage": "save"}),
+        ("eventstore.processing.codec.decode", {"codec": "msgpack", "stage": "unknown"}),
+    ]
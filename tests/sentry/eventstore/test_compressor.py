@@ -52,3 +52,24 @@ def test_basic():
             }
         },
     )
+
+
+def test_whole_interfaces():
+    modules = {"foo": "1.0", "bar": "2.0"}
+    _assert_roundtrip({"modules": modules, "breadcrumbs": {"values": [{"message": "hi"}]}})
+
+    data, extra_keys = deduplicate({"modules": modules, "contexts": {}}, interfaces=["modules"])
+    assert list(extra_keys.values()) == [modules]
+    assert data["contexts"] == {}
+
+
+def test_min_size():
+    data = {"modules": {"foo": "1.0"}}
+    assert deduplicate(copy.deepcopy(data), min_size=100) == (data, {})
+
+
+def test_does_not_mutate_interfaces():
+    image = {"image_addr": "0xdeadbeef", "debug_id": "1234abcdef"}
+    debug_meta = {"images": [image]}
+    deduplicate({"debug_meta": debug_meta})
+    assert debug_meta == {"images": [{"image_addr": "0xdeadbeef", "debug_id": "1234abcdef"}]}
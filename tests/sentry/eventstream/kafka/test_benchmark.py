@@ -0,0 +1,79 @@
+from unittest import mock
+
+import pytest
+
+from sentry.eventstream.kafka.backend import KafkaEventStream
+from sentry.eventstream.kafka.producer import BatchingProducer
+from sentry.testutils.helpers.kafka import InMemoryProducer
+from sentry.testutils.helpers.options import override_options
+from sentry.testutils.skips import requires_pytest_benchmark
+from sentry.utils import json
+
+
+def make_eventstream(batching: bool) -> tuple[KafkaEventStream, InMemoryProducer]:
+    eventstream = KafkaEventStream(batching=batching, max_batch_size=500, max_batch_time=60)
+    producer = InMemoryProducer()
+    if batching:
+        with mock.patch("sentry.eventstream.kafka.producer.atexit"):
+            wrapped = BatchingProducer(producer, max_batch_size=500, max_batch_time=60)
+    else:
+        wrapped = producer  # type: ignore[assignment]
+    eventstream.get_producer = lambda topic: wrapped  # type: ignore[method-assign]
+    return eventstream, producer
+
+
+def send_events(eventstream: KafkaEventStream, count: int) -> None:
+    data = {"event_id": "a" * 32, "project_id": 1, "message": "x" * 500, "tags": [["a", "b"]]}
+    headers = {
+        "Received-Timestamp": "1700000000.0",
+        "project_id": "1",
+        "is_new": "0",
+        "is_regression": "0",
+        "queue": "post_process_errors",
+    }
+    for i in range(count):
+        eventstream._send(1, "insert", extra_data=(data, {"i": i}), headers=dict(headers))
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("use_rapidjson", [False, True])
+@pytest.mark.parametrize("batching", [False, True])
+def test_send_delivers_all_messages(batching, use_rapidjson):
+    eventstream, producer = make_eventstream(batching)
+    with (
+        mock.patch("sentry.eventstream.kafka.backend.metrics") as metrics,
+        override_options({"eventstream:kafka-rapidjson": use_rapidjson}),
+    ):
+        send_events(eventstream, 1200)
+        eventstream.get_producer(eventstream.topic).flush()
+
+    assert len(producer.delivered) == 1200
+    assert producer.delivered[0].headers()[-2:] == [("operation", b"insert"), ("version", b"2")]
+    assert json.loads(producer.delivered[0].value())[2]["event_id"] == "a" * 32
+    topic = producer.delivered[0].topic()
+    latency_calls = [
+        call
+        for call in metrics.distribution.call_args_list
+        if call.args[0] == "eventstream.kafka.delivery_latency"
+    ]
+    assert len(latency_calls) == 1200
+    for call in latency_calls:
+        assert call.args[1] >= 0
+        assert call.kwargs == {"tags": {"topic": topic}, "unit": "second"}
+    if batching:
+        # One poll per batch plus the final flush
+        assert producer.polls < 10
+
+
+@requires_pytest_benchmark
+@pytest.mark.django_db
+@pytest.mark.parametrize("use_rapidjson", [False, True])
+@pytest.mark.parametrize("batching", [False, True])
+def test_benchmark_send(benchmark, batching, use_rapidjson):
+    eventstream, producer = make_eventstream(batching)
+
+    with override_options({"eventstream:kafka-rapidjson": use_rapidjson}):
+        benchmark(send_events, eventstream, 1000)
+    eventstream.get_producer(eventstream.topic).flush()
+
+    assert producer.pending == []
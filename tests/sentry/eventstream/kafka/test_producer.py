@@ -0,0 +1,63 @@
+import time
+from unittest import mock
+
+from sentry.eventstream.kafka.producer import BatchingProducer
+from sentry.testutils.helpers.kafka import InMemoryProducer
+
+
+def make_producer(**kwargs):
+    with mock.patch("sentry.eventstream.kafka.producer.atexit"):
+        return BatchingProducer(InMemoryProducer(), **kwargs)
+
+
+def test_produces_full_batches():
+    producer = make_producer(max_batch_size=3, max_batch_time=60)
+
+    for i in range(2):
+        producer.produce("events", value=f"{i}")
+    assert producer.producer.delivered == []
+    assert len(producer) == 2
+
+    producer.produce("events", value="2")
+    assert [message.value() for message in producer.producer.delivered] == ["0", "1", "2"]
+    assert producer.producer.polls == 1
+
+
+def test_buffers_per_topic():
+    producer = make_producer(max_batch_size=2, max_batch_time=60)
+
+    producer.produce("events", value="0")
+    producer.produce("transactions", value="1")
+    assert producer.producer.delivered == []
+
+    producer.produce("transactions", value="2")
+    assert [message.topic() for message in producer.producer.delivered] == [
+        "transactions",
+        "transactions",
+    ]
+
+
+def test_produces_after_batch_time():
+    producer = make_producer(max_batch_size=100, max_batch_time=0.01)
+    producer.produce("events", value="0")
+
+    deadline = time.monotonic() + 5
+    while not producer.producer.delivered:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+    assert len(producer) == 0
+
+
+def test_flush_delivers_everything():
+    callback = mock.Mock()
+    producer = make_producer(max_batch_size=100, max_batch_time=60)
+    for i in range(5):
+        producer.produce("events", value=f"{i}", on_delivery=callback)
+
+    producer.flush()
+    assert len(producer) == 0
+    assert [message.value() for message in producer.producer.delivered] == [
+        f"{i}" for i in range(5)
+    ]
+    assert callback.call_count == 5
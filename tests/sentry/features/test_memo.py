@@ -0,0 +1,144 @@
+from contextlib import contextmanager
+from unittest import mock
+
+from sentry import features
+from sentry.features.base import OrganizationFeature, ProjectFeature
+from sentry.features.memo import feature_memo, get_feature_memo
+from sentry.testutils.cases import TestCase
+from sentry.testutils.helpers.options import override_options
+
+
+@contextmanager
+def memoized():
+    with override_options({"features.memoize-checks": True}), feature_memo("test") as memo:
+        yield memo
+
+
+class CountingEntityHandler(features.FeatureHandler):
+    features = {"organizations:feature", "projects:feature"}
+
+    def __init__(self):
+        self.has_calls = 0
+        self.batch_has_calls = 0
+
+    def has(self, feature, actor, skip_entity=False):
+        self.has_calls += 1
+        return True
+
+    def batch_has(self, feature_names, actor, projects=None, organization=None):
+        self.batch_has_calls += 1
+        if projects:
+            return {
+                f"project:{project.id}": {name: project.slug != "off" for name in feature_names}
+                for project in projects
+            }
+        return {f"organization:{organization.id}": {name: True for name in feature_names}}
+
+
+class FeatureMemoTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.manager = features.FeatureManager()
+        self.manager.add("organizations:feature", OrganizationFeature)
+        self.manager.add("projects:feature", ProjectFeature)
+        self.handler = CountingEntityHandler()
+        self.manager.add_entity_handler(self.handler)
+
+    def test_has_is_memoized_within_context(self):
+        with memoized():
+            for _ in range(3):
+                assert self.manager.has("organizations:feature", self.organization)
+                assert self.manager.has("organizations:feature", self.organization, actor=self.user)
+        assert self.handler.has_calls == 2
+
+        self.manager.has("organizations:feature", self.organization)
+        assert self.handler.has_calls == 3
+
+    def test_option_disables_memo(self):
+        with override_options({"features.memoize-checks": False}), feature_memo("test") as memo:
+            assert memo is None
+            self.manager.has("organizations:feature", self.organization)
+            self.manager.has("organizations:feature", self.organization)
+        assert self.handler.has_calls == 2
+
+    def test_nested_contexts(self):
+        with memoized() as outer:
+            with memoized() as inner:
+                assert get_feature_memo() is inner
+                self.manager.has("organizations:feature", self.organization)
+            assert get_feature_memo() is outer
+            self.manager.has("organizations:feature", self.organization)
+        assert get_feature_memo() is None
+        assert self.handler.has_calls == 2
+
+    @override_options({"features.memoize-checks": True})
+    def test_decorator_uses_a_memo_per_call(self):
+        @feature_memo("test")
+        def check():
+            assert get_feature_memo() is not None
+            return self.manager.has("organizations:feature", self.organization)
+
+        assert check()
+        assert check()
+        assert get_feature_memo() is None
+        assert self.handler.has_calls == 2
+
+    def test_prefetch(self):
+        off = self.create_project(organization=self.organization, slug="off")
+        projects = [self.project, off]
+
+        with memoized():
+            self.manager.prefetch(
+                ["organizations:feature", "projects:feature"],
+                actor=self.user,
+                projects=projects,
+                organization=self.organization,
+            )
+            assert self.handler.batch_has_calls == 2
+
+            assert self.manager.has("projects:feature", self.project, actor=self.user)
+            assert not self.manager.has("projects:feature", off, actor=self.user)
+            assert self.manager.has("organizations:feature", self.organization, actor=self.user)
+        assert self.handler.has_calls == 0
+
+    def test_prefetch_skips_registered_handlers(self):
+        registered = mock.Mock(features={"projects:feature"})
+        registered.return_value = False
+        self.manager.add_handler(registered)
+
+        with memoized():
+            self.manager.prefetch(["projects:feature"], projects=[self.project])
+            assert not self.manager.has("projects:feature", self.project)
+        assert self.handler.batch_has_calls == 0
+
+    @mock.patch("sentry.features.memo.metrics")
+    def test_metrics(self, metrics):
+        with memoized():
+            for _ in range(3):
+                self.manager.has("organizations:feature", self.organization)
+
+        tags = {"scope": "test"}
+        metrics.incr.assert_any_call("features.memo.hits", amount=2, tags=tags)
+        metrics.incr.assert_any_call("features.memo.misses", amount=1, tags=tags)
+        metrics.distribution.assert_called_once_with(
+            "features.memo.handler_time", mock.ANY, tags=tags, unit="millisecond"
+        )
+
+    @mock.patch("sentry.features.memo.metrics")
+    def test_call_site_metrics(self, metrics):
+        with memoized():
+            self.manager.has("organizations:feature", self.organization, call_site="site")
+            self.manager.has("organizations:feature", self.organization)
+
+        metrics.incr.assert_any_call("features.memo.hits", amount=1, tags={"scope": "test"})
+        metrics.incr.assert_any_call("features.memo.misses", amount=1, tags={"scope": "test"})
+        tags = {"scope": "test", "call_site": "site"}
+        metrics.incr.assert_any_call("features.memo.hits", amount=0, tags=tags)
+        metrics.incr.assert_any_call("features.memo.misses", amount=1, tags=tags)
+        assert metrics.distribution.call_count == 2
+
+    @mock.patch("sentry.features.memo.metrics")
+    def test_no_metrics_without_checks(self, metrics):
+        with memoized():
+            pass
+        assert metrics.incr.call_count == 0
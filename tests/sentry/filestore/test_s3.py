@@ -0,0 +1,30 @@
+import io
+import re
+from unittest import mock
+
+from sentry.filestore.s3 import S3Boto3Storage
+
+
+class FakeObject:
+    """Stand-in for a boto3 S3 object honoring range requests."""
+
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+
+    def get(self, Range: str | None = None):
+        data = self.data
+        if Range is not None:
+            match = re.fullmatch(r"bytes=(\d+)-(\d+)", Range)
+            assert match is not None
+            data = data[int(match.group(1)) : int(match.group(2)) + 1]
+        return {"Body": io.BytesIO(data)}
+
+
+def test_read_range():
+    storage = S3Boto3Storage(bucket="bucket", access_key="key", secret_key="secret")
+    objects = {"packed": FakeObject(b"abcdefghij")}
+    storage._bucket = mock.Mock(Object=objects.__getitem__)
+
+    assert storage.read_range("packed", 0, 3) == b"abc"
+    assert storage.read_range("packed", 7, 3) == b"hij"
+    assert storage.read_range("packed", 7, 0) == b""
@@ -1,8 +1,11 @@
+from unittest import mock
+
 import pytest
 
 from sentry.grouping.api import get_default_grouping_config_dict
-from sentry.grouping.fingerprinting import FingerprintingRules, InvalidFingerprintingConfig
+from sentry.grouping.fingerprinting import FingerprintingRules, InvalidFingerprintingConfig, Match
 from sentry.testutils.pytest.fixtures import django_db_all
+from sentry.utils.canonical import CanonicalKeyDict
 from tests.sentry.grouping import with_fingerprint_input
 
 GROUPING_CONFIG = get_default_grouping_config_dict()
@@ -188,3 +191,43 @@ def test_event_hash_variant(insta_snapshot, input):
             },
         }
     )
+
+
+def test_shared_matchers_are_evaluated_once_per_event():
+    rules = FingerprintingRules.from_config_string(
+        """
+function:foo type:ValueError -> value-error
+function:foo type:TypeError  -> type-error
+function:foo                 -> foo
+"""
+    )
+    event = CanonicalKeyDict(
+        {
+            "exception": {
+                "values": [
+                    {
+                        "type": "KeyError",
+                        "stacktrace": {"frames": [{"function": "bar"}, {"function": "foo"}]},
+                    }
+                ]
+            }
+        }
+    )
+
+    with mock.patch.object(Match, "matches", autospec=True, side_effect=Match.matches) as matches:
+        assert rules.get_fingerprint_values_for_event(event) == (
+            rules.rules[2],
+            ["foo"],
+            {},
+        )
+
+    # `function:foo` is checked once per frame, `type:*` once per exception each.
+    assert [
+        (call.args[0].text, call.args[1]["function"])
+        for call in matches.call_args_list
+        if call.args[0].key == "function"
+    ] == [
+        ('function:"foo"', "bar"),
+        ('function:"foo"', "foo"),
+    ]
+    assert matches.call_count == 4
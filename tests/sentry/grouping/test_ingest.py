@@ -8,8 +8,10 @@ from sentry.grouping.ingest import (
     _calculate_background_grouping,
     _calculate_event_grouping,
     _calculate_secondary_hash,
+    get_or_create_grouphashes,
 )
 from sentry.models.group import Group
+from sentry.models.grouphash import GroupHash
 from sentry.testutils.cases import TestCase
 from sentry.testutils.skips import requires_snuba
 
@@ -165,3 +167,30 @@ class SecondaryGroupingTest(TestCase):
             mock_capture_exception.assert_called_with(secondary_grouping_error)
             # This proves the secondary grouping crash didn't crash the overall grouping process
             assert event.group
+
+
+class GetOrCreateGroupHashesTest(TestCase):
+    def test_creates_missing_hashes_only(self):
+        existing = GroupHash.objects.create(project=self.project, hash="a" * 32)
+
+        with self.assertNumQueries(3):
+            grouphashes = get_or_create_grouphashes(
+                self.project, ["b" * 32, "a" * 32, "c" * 32, "b" * 32]
+            )
+
+        assert [gh.hash for gh in grouphashes] == ["b" * 32, "a" * 32, "c" * 32, "b" * 32]
+        assert grouphashes[1].id == existing.id
+        assert grouphashes[0] is grouphashes[3]
+        assert all(gh.id is not None for gh in grouphashes)
+        assert GroupHash.objects.filter(project=self.project).count() == 3
+
+    def test_all_hashes_exist(self):
+        existing = [
+            GroupHash.objects.create(project=self.project, hash=hash)
+            for hash in ("a" * 32, "b" * 32)
+        ]
+
+        with self.assertNumQueries(1):
+            grouphashes = get_or_create_grouphashes(self.project, ["a" * 32, "b" * 32])
+
+        assert [gh.id for gh in grouphashes] == [gh.id for gh in existing]
@@ -10,6 +10,7 @@ from sentry.ingest.transaction_clusterer.datasource.redis import (
     _record_sample,
     clear_samples,
     get_active_projects,
+    get_clusterer_state,
     get_redis_client,
     get_transaction_names,
     record_transaction_name,
@@ -33,6 +34,7 @@ from sentry.testutils.helpers import Feature
 from sentry.testutils.helpers.datetime import freeze_time
 from sentry.testutils.helpers.options import override_options
 from sentry.testutils.pytest.fixtures import django_db_all
+from sentry.utils import json
 
 
 def test_multi_fanout():
@@ -86,6 +88,82 @@ def test_clusterer_doesnt_generate_invalid_rules():
     assert clusterer.get_rules() == []
 
 
+def test_incremental_input():
+    transaction_names = [f"/a/b{i}/c/d{i % 4}/e" for i in range(10)] + ["/x/y"]
+
+    clusterer = TreeClusterer(merge_threshold=3)
+    clusterer.add_input(transaction_names)
+    expected = clusterer.get_rules()
+    assert expected == ["/a/*/c/*/**", "/a/*/**"]
+
+    clusterer = TreeClusterer(merge_threshold=3)
+    for name in transaction_names:
+        clusterer.add_input([name])
+        clusterer.get_rules()
+    assert clusterer.get_rules() == expected
+
+
+def test_merged_subtrees_stay_small():
+    clusterer = TreeClusterer(merge_threshold=10)
+    clusterer.add_input(f"/users/{i}/posts/{i}" for i in range(1000))
+    assert clusterer.get_rules() == ["/users/*/posts/*/**", "/users/*/**"]
+    # root, "", "users", "*", "posts", "*"
+    assert len(clusterer) == 6
+
+
+def test_prune_low_count_branches():
+    clusterer = TreeClusterer(merge_threshold=1000, max_nodes=100)
+    clusterer.add_input(["/frequent/a", "/frequent/b"] * 50)
+    clusterer.add_input(f"/rare/{i}" for i in range(200))
+    assert len(clusterer) <= 100
+
+    edges = {edge for _, _, node_edges in clusterer.to_dict()["nodes"] for edge, _ in node_edges}
+    assert {"frequent", "a", "b"} <= edges
+
+
+def test_state_roundtrip():
+    clusterer = TreeClusterer(merge_threshold=3)
+    clusterer.add_input(["/a/b0", "/a/b1", "/a/b2", "/x/0", "/x/1"])
+    state = json.loads(json.dumps(clusterer.to_dict()))
+
+    restored = TreeClusterer.from_dict(state, merge_threshold=3)
+    assert restored.get_rules() == clusterer.get_rules() == ["/a/*/**"]
+    restored.add_input(["/x/2"])
+    assert restored.get_rules() == ["/a/*/**", "/x/*/**"]
+
+    # State built with another threshold is discarded
+    assert TreeClusterer.from_dict(state, merge_threshold=2).get_rules() == []
+
+
+def test_recent_rules():
+    clusterer = TreeClusterer(merge_threshold=3)
+    clusterer.add_input(
+        [f"/a/{i}" for i in range(3)] + [f"/b/{i}" for i in range(3)], timestamp=100
+    )
+    clusterer.add_input(["/a/3"], timestamp=200)
+
+    assert clusterer.get_rules() == ["/a/*/**", "/b/*/**"]
+    assert clusterer.get_rules(since=200) == ["/a/*/**"]
+    assert clusterer.get_rules(since=300) == []
+
+
+def test_age_drops_old_branches():
+    clusterer = TreeClusterer(merge_threshold=3)
+    clusterer.add_input(
+        [f"/a/{i}" for i in range(3)] + [f"/b/{i}" for i in range(3)], timestamp=100
+    )
+    clusterer.add_input(["/a/3"], timestamp=200)
+
+    clusterer.age(before=150)
+    assert clusterer.get_rules() == ["/a/*/**"]
+
+    # The merged node of /b is gone, so /b has to be merged again
+    clusterer.add_input(["/b/3", "/b/4"], timestamp=300)
+    assert clusterer.get_rules(since=300) == []
+    clusterer.add_input(["/b/5"], timestamp=300)
+    assert clusterer.get_rules(since=300) == ["/b/*/**"]
+
+
 @mock.patch("sentry.ingest.transaction_clusterer.datasource.redis.MAX_SET_SIZE", 5)
 def test_collection():
     org = Organization(pk=666)
@@ -369,6 +447,38 @@ def test_clusterer_only_runs_when_enough_transactions(mock_update_rules, default
     )
 
 
+@mock.patch("sentry.ingest.transaction_clusterer.tasks.MERGE_THRESHOLD", 3)
+@mock.patch("sentry.ingest.transaction_clusterer.rules.update_rules")
+@django_db_all
+def test_clusterer_incremental_state(mock_update_rules, default_project):
+    project = default_project
+
+    with override_options({"txnames.clusterer.incremental": True}):
+        _record_sample(ClustererNamespace.TRANSACTIONS, project, "/transaction/number/1")
+        _record_sample(ClustererNamespace.TRANSACTIONS, project, "/transaction/number/2")
+        cluster_projects([project])
+        assert mock_update_rules.call_args == mock.call(
+            ClustererNamespace.TRANSACTIONS, project, []
+        )
+        assert list(get_transaction_names(project)) == []
+
+        # Names from the previous run are still part of the tree
+        _record_sample(ClustererNamespace.TRANSACTIONS, project, "/transaction/number/3")
+        cluster_projects([project])
+        assert mock_update_rules.call_args == mock.call(
+            ClustererNamespace.TRANSACTIONS, project, ["/transaction/number/*/**"]
+        )
+
+        # Rules without new input in a run are not reported again
+        _record_sample(ClustererNamespace.TRANSACTIONS, project, "/other/1")
+        cluster_projects([project])
+        assert mock_update_rules.call_args == mock.call(
+            ClustererNamespace.TRANSACTIONS, project, []
+        )
+
+    assert get_clusterer_state(ClustererNamespace.TRANSACTIONS, project) is not None
+
+
 @django_db_all
 def test_get_deleted_project():
     deleted_project = Project(pk=666, organization=Organization(pk=666))
@@ -8,6 +8,7 @@ from django.core.files.base import ContentFile
 from django.db import DatabaseError
 from django.utils import timezone
 
+from sentry.models.files.abstractfile import ChunkedFileBlobIndexWrapper
 from sentry.models.files.file import File
 from sentry.models.files.fileblob import FileBlob
 from sentry.models.files.fileblobindex import FileBlobIndex
@@ -182,3 +183,45 @@ class FileTest(TestCase):
 
         f = file.getfile(prefetch=True)
         assert f.read() == random_data
+
+    def test_stream(self):
+        bytes = BytesIO(b"abcdefghijklmnopqrstuvwxyz")
+        file1 = File.objects.create(name="baz.js", type="default", size=26)
+        file1.putfile(bytes, 5)
+
+        with file1.getfile(stream=True) as fp:
+            assert fp.read(3) == b"abc"
+            assert fp.read() == b"defghijklmnopqrstuvwxyz"
+
+            fp.seek(-10, 2)
+            bytes.seek(-10, 2)
+            assert fp.tell() == bytes.tell() == 16
+            assert fp.read(7) == bytes.read(7) == b"qrstuvw"
+
+            fp.seek(1000)
+            assert fp.tell() == 1000
+            assert fp.read() == b""
+
+            with pytest.raises(IOError):
+                fp.seek(-1)
+
+        with pytest.raises(ValueError):
+            fp.read()
+
+    def test_stream_seek_only_fetches_overlapping_blobs(self):
+        file1 = File.objects.create(name="baz.js", type="default", size=26)
+        file1.putfile(BytesIO(b"abcdefghijklmnopqrstuvwxyz"), 5)
+
+        with patch.object(
+            ChunkedFileBlobIndexWrapper,
+            "_fetch_blob",
+            wraps=ChunkedFileBlobIndexWrapper._fetch_blob,
+        ) as fetch_blob:
+            with file1.getfile(stream=True) as fp:
+                fp.seek(12)
+                assert fp.read(5) == b"mnopq"
+                assert fetch_blob.call_count == 2
+
+                # Reading on sequentially from there fetches ahead.
+                assert fp.read(1) == b"r"
+                assert fetch_blob.call_count == 4
@@ -28,3 +28,14 @@ class ProjectOptionManagerTest(TestCase):
         ProjectOption.objects.create(project=self.project, key="foo", value="bar")
         result = ProjectOption.objects.get_value_bulk([self.project], "foo")
         assert result == {self.project: "bar"}
+
+    def test_preload_all_values(self):
+        other_project = self.create_project()
+        ProjectOption.objects.create(project=self.project, key="foo", value="bar")
+        ProjectOption.objects.clear_local_cache()
+
+        ProjectOption.objects.preload_all_values([self.project, other_project])
+
+        with self.assertNumQueries(0):
+            assert ProjectOption.objects.get_value(self.project, "foo") == "bar"
+            assert ProjectOption.objects.get_value(other_project, "foo") is None
@@ -1,11 +1,12 @@
 import uuid
+from concurrent.futures import Future
 from datetime import datetime, timedelta
 from typing import Any
 from unittest import mock
 
 import msgpack
 from arroyo.backends.kafka import KafkaPayload
-from arroyo.types import BrokerValue, Message, Partition, Topic
+from arroyo.types import BrokerValue, Message, Partition, Topic, Value
 from django.conf import settings
 from django.test.utils import override_settings
 
@@ -14,7 +15,11 @@ from sentry.constants import ObjectStatus
 from sentry.db.models import BoundedPositiveIntegerField
 from sentry.models.environment import Environment
 from sentry.monitors.constants import TIMEOUT, PermitCheckInStatus
-from sentry.monitors.consumers.monitor_consumer import StoreMonitorCheckInStrategyFactory
+from sentry.monitors.consumers.monitor_consumer import (
+    PrefetchedMonitors,
+    StoreMonitorCheckInStrategyFactory,
+    process_batch,
+)
 from sentry.monitors.models import (
     CheckInStatus,
     Monitor,
@@ -24,7 +29,9 @@ from sentry.monitors.models import (
     MonitorType,
     ScheduleType,
 )
+from sentry.monitors.types import CheckinItem
 from sentry.testutils.cases import TestCase
+from sentry.testutils.helpers.options import override_options
 from sentry.utils import json
 from sentry.utils.locking.manager import LockManager
 from sentry.utils.outcomes import Outcome
@@ -48,13 +55,13 @@ class MonitorConsumerTest(TestCase):
             **kwargs,
         )
 
-    def send_checkin(
+    def build_checkin(
         self,
         monitor_slug: str,
         guid: str | None = None,
         ts: datetime | None = None,
         **overrides: Any,
-    ) -> None:
+    ) -> BrokerValue[KafkaPayload]:
         if ts is None:
             ts = datetime.now()
 
@@ -79,19 +86,41 @@ class MonitorConsumerTest(TestCase):
             "sdk": "test/1.0",
         }
 
-        commit = mock.Mock()
-        partition = Partition(Topic("test"), 0)
-        StoreMonitorCheckInStrategyFactory().create_with_partitions(commit, {partition: 0}).submit(
-            Message(
-                BrokerValue(
-                    KafkaPayload(b"fake-key", msgpack.packb(wrapper), []),
-                    partition,
-                    1,
-                    ts,
-                )
-            )
+        return BrokerValue(
+            KafkaPayload(b"fake-key", msgpack.packb(wrapper), []),
+            Partition(Topic("test"), 0),
+            1,
+            ts,
         )
 
+    def send_checkin(
+        self,
+        monitor_slug: str,
+        guid: str | None = None,
+        ts: datetime | None = None,
+        **overrides: Any,
+    ) -> None:
+        value = self.build_checkin(monitor_slug, guid, ts, **overrides)
+
+        commit = mock.Mock()
+        StoreMonitorCheckInStrategyFactory().create_with_partitions(
+            commit, {value.partition: 0}
+        ).submit(Message(value))
+
+    def send_checkin_batch(self, values: list[BrokerValue[KafkaPayload]]) -> None:
+        # Process groups synchronously, worker threads would not see the
+        # test transaction.
+        def submit(fn, *args):
+            future: Future[None] = Future()
+            future.set_result(fn(*args))
+            return future
+
+        with mock.patch(
+            "sentry.monitors.consumers.monitor_consumer._checkin_worker"
+        ) as checkin_worker:
+            checkin_worker.submit.side_effect = submit
+            process_batch(Message(Value(values, {values[-1].partition: 2})))
+
     def send_clock_pulse(
         self,
         ts: datetime | None = None,
@@ -733,3 +762,88 @@ class MonitorConsumerTest(TestCase):
 
         check_accept_monitor_checkin.assert_called_with(self.project.id, monitor.slug)
         assign_monitor_seat.assert_called_with(monitor)
+
+    @override_options({"crons.consumer.bulk-checkin-processing": True})
+    @mock.patch("sentry.monitors.consumers.monitor_consumer.track_outcome")
+    def test_batch_collapses_in_progress(self, track_outcome):
+        monitor = self._create_monitor(slug="my-monitor")
+        now = datetime.now()
+
+        in_progress = self.build_checkin(monitor.slug, status="in_progress", ts=now)
+        closing = self.build_checkin(monitor.slug, guid=self.guid, ts=now + timedelta(seconds=5))
+        self.send_checkin_batch([in_progress, closing])
+
+        checkin = MonitorCheckIn.objects.get(guid=self.guid)
+        assert checkin.status == CheckInStatus.OK
+        assert checkin.duration == 5000
+        assert abs(checkin.date_added.timestamp() - now.timestamp()) < 0.001
+
+        monitor_environment = MonitorEnvironment.objects.get(id=checkin.monitor_environment_id)
+        assert monitor_environment.status == MonitorStatus.OK
+        assert monitor_environment.last_checkin == checkin.date_added
+
+        # The collapsed in-progress check-in is still accounted for
+        assert track_outcome.call_count == 1
+        assert track_outcome.call_args.kwargs["outcome"] == Outcome.ACCEPTED
+        assert track_outcome.call_args.kwargs["quantity"] == 2
+
+    @override_options({"crons.consumer.bulk-checkin-processing": True})
+    def test_batch_prefetches_monitors(self):
+        monitors = [self._create_monitor(slug=f"my-monitor-{i}") for i in range(3)]
+        for monitor in monitors:
+            self.send_checkin(monitor.slug)
+
+        with mock.patch.object(
+            Monitor.objects, "get", side_effect=AssertionError("monitor not prefetched")
+        ):
+            self.send_checkin_batch([self.build_checkin(monitor.slug) for monitor in monitors])
+
+        for monitor in monitors:
+            assert MonitorCheckIn.objects.filter(monitor=monitor).count() == 2
+
+    def test_prefetched_monitors_are_copies(self):
+        monitor = self._create_monitor(slug="my-monitor")
+        items = []
+        for environment in ("production", "staging"):
+            value = self.build_checkin(monitor.slug, environment=environment)
+            wrapper = msgpack.unpackb(value.payload.value)
+            items.append(
+                CheckinItem(
+                    ts=value.timestamp,
+                    partition=value.partition.index,
+                    message=wrapper,
+                    payload=json.loads(wrapper["payload"]),
+                )
+            )
+        monitor_environment = MonitorEnvironment.objects.ensure_environment(
+            self.project, monitor, "production"
+        )
+
+        prefetched = PrefetchedMonitors(items)
+        first = prefetched.get_monitor(self.project, monitor.slug)
+        second = prefetched.get_monitor(self.project, monitor.slug)
+        assert first is not None and second is not None
+        assert first is not second
+        assert first.config is not second.config
+
+        first.config["checkin_margin"] = 10
+        assert second.config["checkin_margin"] == 5
+
+        taken = prefetched.take_environment(first, "production")
+        assert taken is not None
+        assert taken.id == monitor_environment.id
+        assert taken.monitor is first
+        assert prefetched.take_environment(second, "production") is None
+
+    @override_options({"crons.consumer.bulk-checkin-processing": True})
+    def test_batch_keeps_unpaired_checkins(self):
+        monitor = self._create_monitor(slug="my-monitor")
+        now = datetime.now()
+
+        first = self.build_checkin(monitor.slug, status="in_progress", ts=now)
+        first_guid = self.guid
+        second = self.build_checkin(monitor.slug, status="in_progress", ts=now)
+        self.send_checkin_batch([first, second])
+
+        assert MonitorCheckIn.objects.get(guid=first_guid).status == CheckInStatus.IN_PROGRESS
+        assert MonitorCheckIn.objects.get(guid=self.guid).status == CheckInStatus.IN_PROGRESS
@@ -0,0 +1,90 @@
+import os
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+import pytest
+
+from sentry.nodestore.filesystem import segmented
+from sentry.nodestore.filesystem.segmented import SegmentedFileSystemNodeStorage
+
+
+@pytest.fixture
+def ns(tmp_path):
+    ns = SegmentedFileSystemNodeStorage(path=str(tmp_path), segment_size=256)
+    ns.bootstrap()
+    return ns
+
+
+def segment_files(ns):
+    return sorted(name for name in os.listdir(ns.path) if name.endswith(".seg"))
+
+
+def test_rotates_segments(ns):
+    for i in range(20):
+        ns.set(f"node_{i}", {"foo": "x" * 50, "i": i})
+
+    assert len(segment_files(ns)) > 1
+    result = ns.get_multi([f"node_{i}" for i in range(20)])
+    assert result == {f"node_{i}": {"foo": "x" * 50, "i": i} for i in range(20)}
+
+
+def test_overwrite_and_missing(ns):
+    ns.set("node_1", {"foo": "a"})
+    ns.set("node_1", {"foo": "b"})
+    assert ns.get("node_1") == {"foo": "b"}
+    assert ns.get("node_2") is None
+
+
+def test_rotates_segments_by_age(ns):
+    ns.segment_max_age = 0
+    ns.set("node_1", {"foo": "a"})
+    ns.set("node_2", {"foo": "b"})
+    assert len(segment_files(ns)) == 2
+
+
+def test_cleanup_drops_whole_segments(ns):
+    ns.set("node_1", {"foo": "a"})
+    ns.cleanup(datetime.now(timezone.utc) + timedelta(seconds=1))
+    assert segment_files(ns) == []
+    assert ns.get("node_1") is None
+
+    ns.set("node_2", {"foo": "b"})
+    ns.cleanup(datetime.now(timezone.utc) - timedelta(days=1))
+    assert len(segment_files(ns)) == 1
+    assert ns.get("node_2") == {"foo": "b"}
+
+
+def test_cleanup_closes_mmaps_of_other_readers(ns, monkeypatch):
+    monkeypatch.setattr(segmented, "MMAP_CHECK_INTERVAL", 3600)
+    ns.set("node_1", {"foo": "a"})
+    # Another thread or process reading from the same directory.
+    reader = SegmentedFileSystemNodeStorage(path=ns.path, segment_size=256)
+    assert reader.get("node_1") == {"foo": "a"}
+    assert len(reader._mmaps) == 1
+
+    ns.cleanup(datetime.now(timezone.utc) + timedelta(seconds=1))
+    ns.set("node_2", {"foo": "b"})
+
+    assert reader.get("node_2") == {"foo": "b"}
+    assert len(reader._mmaps) == 2
+
+    monkeypatch.setattr(segmented, "MMAP_CHECK_INTERVAL", 0)
+    assert reader.get("node_2") == {"foo": "b"}
+    assert list(reader._mmaps) == [max(reader._mmaps)]
+
+
+def test_cleanup_only_invalidates_dropped_nodes(ns):
+    ns.set("node_1", {"foo": "a"})
+    ns.segment_max_age = 0
+    ns.set("node_2", {"foo": "b"})
+
+    with mock.patch.object(ns, "_delete_cache_items") as delete_cache_items:
+        ns.cleanup(datetime.now(timezone.utc) - timedelta(days=1))
+        delete_cache_items.assert_called_once_with([])
+
+        # Drop the first segment only.
+        ns._index.execute("UPDATE segments SET updated = 0 WHERE id = 1")
+        ns.cleanup(datetime.now(timezone.utc) - timedelta(days=1))
+        delete_cache_items.assert_called_with(["node_1"])
+
+    assert ns.get("node_2") == {"foo": "b"}
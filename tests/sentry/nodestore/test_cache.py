@@ -0,0 +1,98 @@
+from unittest import mock
+
+from django.core.cache.backends.locmem import LocMemCache
+
+from sentry.nodestore.base import NodeStorage
+from sentry.nodestore.cache import LocalNodeCacheTier, SharedNodeCacheTier
+
+
+class InMemoryNodeStorage(NodeStorage):
+    def __init__(self, tiers):
+        self.nodes = {}
+        self.tiers = tiers
+        self._get_bytes_multi = mock.Mock(wraps=self._get_bytes_multi)
+
+    @property
+    def cache_tiers(self):
+        return self.tiers
+
+    def _get_bytes(self, id):
+        return self.nodes.get(id)
+
+    def _set_bytes(self, id, data, ttl=None):
+        self.nodes[id] = data
+
+    def delete(self, id):
+        self.nodes.pop(id, None)
+        self._delete_cache_item(id)
+
+
+def test_local_tier_evicts_by_size():
+    tier = LocalNodeCacheTier(max_bytes=30, ttl=60, max_item_bytes=30)
+    tier.set_many({"a": {"foo": "a"}, "b": {"foo": "b"}})
+    assert tier.currsize == 22
+    tier.set_many({"c": {"foo": "c"}})
+    assert tier.get_many(["a", "b", "c"]) == {"b": {"foo": "b"}, "c": {"foo": "c"}}
+
+
+def test_local_tier_skips_large_and_empty_items():
+    tier = LocalNodeCacheTier(max_bytes=1000, ttl=60, max_item_bytes=10)
+    tier.set_many({"a": {"foo": "x" * 20}, "b": None, "c": {}})
+    assert tier.get_many(["a", "b", "c"]) == {}
+    assert tier.currsize == 0
+
+
+def test_local_tier_expires_items():
+    now = [0.0]
+    tier = LocalNodeCacheTier(max_bytes=1000, ttl=60, timer=lambda: now[0])
+    tier.set_many({"a": {"foo": "a"}})
+    assert tier.get_many(["a"]) == {"a": {"foo": "a"}}
+    now[0] = 61.0
+    assert tier.get_many(["a"]) == {}
+
+
+def test_local_tier_returns_copies():
+    tier = LocalNodeCacheTier(max_bytes=1000, ttl=60)
+    tier.set_many({"a": {"foo": "a"}})
+    tier.get_many(["a"])["a"]["foo"] = "b"
+    assert tier.get_many(["a"]) == {"a": {"foo": "a"}}
+
+
+def test_get_multi_collapses_misses_and_promotes_hits():
+    local = LocalNodeCacheTier(max_bytes=1000, ttl=60)
+    shared = SharedNodeCacheTier(LocMemCache("nodestore-test", {}))
+    ns = InMemoryNodeStorage([local, shared])
+    ns.nodes = {"a": b'{"foo":"a"}', "b": b'{"foo":"b"}\nother\n{}', "c": b'{"foo":"c"}'}
+    shared.set_many({"a": {"foo": "a"}})
+
+    assert ns.get_multi(["a", "b", "c"]) == {
+        "a": {"foo": "a"},
+        "b": {"foo": "b"},
+        "c": {"foo": "c"},
+    }
+    ns._get_bytes_multi.assert_called_once_with(["b", "c"])
+    # Shared hits are promoted, backend reads populate every tier.
+    assert local.get_many(["a", "b", "c"]) == {
+        "a": {"foo": "a"},
+        "b": {"foo": "b"},
+        "c": {"foo": "c"},
+    }
+    assert shared.get_many(["b", "c"]) == {"b": {"foo": "b"}, "c": {"foo": "c"}}
+
+    ns._get_bytes_multi.reset_mock()
+    assert ns.get_multi(["a", "b"]) == {"a": {"foo": "a"}, "b": {"foo": "b"}}
+    ns._get_bytes_multi.assert_not_called()
+
+
+def test_delete_invalidates_all_tiers():
+    local = LocalNodeCacheTier(max_bytes=1000, ttl=60)
+    shared = SharedNodeCacheTier(LocMemCache("nodestore-test-delete", {}))
+    ns = InMemoryNodeStorage([local, shared])
+    ns.set("a", {"foo": "a"})
+    assert local.get_many(["a"]) == {"a": {"foo": "a"}}
+    assert ns.get("a") == {"foo": "a"}
+
+    ns.delete("a")
+    assert local.get_many(["a"]) == {}
+    assert shared.get_many(["a"]) == {}
+    assert ns.get("a") is None
@@ -3,10 +3,15 @@ Testsuite of backend-independent nodestore tests. Add your backend to the
 `ns` fixture to have it tested.
 """
 from contextlib import nullcontext
+from datetime import timedelta
+from unittest import mock
 
 import pytest
 
+from sentry.nodestore.base import DEDUP_NODE_PREFIX
 from sentry.nodestore.django.backend import DjangoNodeStorage
+from sentry.nodestore.filesystem.segmented import SegmentedFileSystemNodeStorage
+from sentry.testutils.helpers.options import override_options
 from tests.sentry.nodestore.bigtable.test_backend import (
     MockedBigtableNodeStorage,
     get_temporary_bigtable_nodestorage,
@@ -14,14 +19,22 @@ from tests.sentry.nodestore.bigtable.test_backend import (
 
 
 @pytest.fixture(
-    params=["bigtable-mocked", "bigtable-real", pytest.param("django", marks=pytest.mark.django_db)]
+    params=[
+        "bigtable-mocked",
+        "bigtable-real",
+        pytest.param("django", marks=pytest.mark.django_db),
+        "filesystem-segmented",
+    ]
 )
-def ns(request):
+def ns(request, tmp_path):
     # backends are returned from context managers to support teardown when required
     backends = {
         "bigtable-mocked": lambda: nullcontext(MockedBigtableNodeStorage(project="test")),
         "bigtable-real": lambda: get_temporary_bigtable_nodestorage(),
         "django": lambda: nullcontext(DjangoNodeStorage()),
+        "filesystem-segmented": lambda: nullcontext(
+            SegmentedFileSystemNodeStorage(path=str(tmp_path))
+        ),
     }
 
     ctx = backends[request.param]()
@@ -91,3 +104,114 @@ def test_set_subkeys(ns):
     ns.delete("node_1")
     assert ns.get("node_1") is None
     assert ns.get("node_1", subkey="other") is None
+
+
+DEDUPLICATION_OPTIONS = {
+    "nodestore.deduplication.interfaces": ["modules", "contexts"],
+    "nodestore.deduplication.min-size": 100,
+}
+
+
+def skip_without_ttl_support(ns):
+    if not ns.supports_ttl:
+        pytest.skip("deduplication requires a backend that expires nodes by TTL")
+
+
+def test_deduplication(ns):
+    skip_without_ttl_support(ns)
+    modules = {f"module_{i}": "1.0.0" for i in range(100)}
+    nodes = {
+        "node_1": {"message": "a", "modules": modules},
+        "node_2": {"message": "b", "modules": modules, "contexts": {"os": {"name": "Linux"}}},
+    }
+
+    with override_options(DEDUPLICATION_OPTIONS):
+        for node_id, data in nodes.items():
+            ns.set(node_id, data, ttl=timedelta(days=1))
+
+    # Read from the backend only.
+    ns.cache_tiers = []
+
+    # Small interfaces stay inline, large ones are stored once and referenced.
+    node_2 = ns._decode(ns.get_bytes("node_2"), subkey=None)
+    assert "modules" not in node_2
+    assert node_2["contexts"] == {"os": {"name": "Linux"}}
+    ((_, checksum, _),) = node_2["__nodestore_patchsets"]
+    assert ns.get(DEDUP_NODE_PREFIX + checksum) == modules
+
+    assert ns.get("node_1") == nodes["node_1"]
+    with mock.patch.object(ns, "_get_bytes_multi", wraps=ns._get_bytes_multi) as get_bytes_multi:
+        assert ns.get_multi(["node_1", "node_2"]) == nodes
+    # One call for the nodes, one for the shared node referenced by both.
+    assert [sorted(call.args[0]) for call in get_bytes_multi.call_args_list] == [
+        ["node_1", "node_2"],
+        [DEDUP_NODE_PREFIX + checksum],
+    ]
+
+
+def test_deduplication_extends_shared_nodes(ns):
+    skip_without_ttl_support(ns)
+    data = {"message": "a", "modules": {f"module_{i}": "1.0.0" for i in range(100)}}
+
+    with override_options(DEDUPLICATION_OPTIONS), mock.patch.object(
+        ns, "_set_bytes", wraps=ns._set_bytes
+    ) as set_bytes:
+        ns.set("node_1", data, ttl=timedelta(days=2))
+        # The expiry of the shared node is read from the backend.
+        del ns._dedup_expiries
+        ns.set("node_2", data, ttl=timedelta(days=1))
+        ns.set("node_3", data, ttl=timedelta(days=5))
+
+    assert [(call.args[0].split(":")[0], call.kwargs["ttl"]) for call in set_bytes.mock_calls] == [
+        ("dedup", timedelta(days=3)),
+        ("node_1", timedelta(days=2)),
+        ("node_2", timedelta(days=1)),
+        ("dedup", timedelta(days=6)),
+        ("node_3", timedelta(days=5)),
+    ]
+
+
+def test_deduplication_default_ttl(ns):
+    skip_without_ttl_support(ns)
+    data = {"message": "a", "modules": {f"module_{i}": "1.0.0" for i in range(100)}}
+
+    with override_options(DEDUPLICATION_OPTIONS):
+        ns.set("node_1", data)
+        assert ns._decode(ns.get_bytes("node_1"), subkey=None) == data
+
+        ns.default_ttl = timedelta(days=1)
+        ns.set("node_2", data)
+        assert "modules" not in ns._decode(ns.get_bytes("node_2"), subkey=None)
+
+    ns.cache_tiers = []
+    assert ns.get("node_2") == data
+
+
+def test_deduplication_requires_ttl_support(ns):
+    if ns.supports_ttl:
+        pytest.skip("backend expires nodes by TTL")
+    data = {"message": "a", "modules": {f"module_{i}": "1.0.0" for i in range(100)}}
+
+    with override_options(DEDUPLICATION_OPTIONS):
+        ns.set("node_1", data, ttl=timedelta(days=1))
+
+    assert ns._decode(ns.get_bytes("node_1"), subkey=None) == data
+
+
+def test_deduplication_missing_node(ns):
+    skip_without_ttl_support(ns)
+    data = {"message": "a", "modules": {f"module_{i}": "1.0.0" for i in range(100)}}
+
+    with override_options(DEDUPLICATION_OPTIONS):
+        ns.set("node_1", data, ttl=timedelta(days=1))
+
+    ((_, checksum, _),) = ns._decode(ns.get_bytes("node_1"), subkey=None)["__nodestore_patchsets"]
+    ns.delete(DEDUP_NODE_PREFIX + checksum)
+    ns.cache_tiers = []
+
+    with mock.patch("sentry.nodestore.base.logger") as logger:
+        assert ns.get_multi(["node_1"]) == {"node_1": {"message": "a"}}
+    logger.error.assert_called_once_with(
+        "nodestore.dedup.missing_node",
+        extra={"node_ids": [DEDUP_NODE_PREFIX + checksum], "item_ids": ["node_1"]},
+    )
@@ -164,3 +164,55 @@ class OptionsStoreTest(TestCase):
         mocked_time.return_value = 26
         store.clean_local_cache()
         assert not store._local_cache
+
+    def test_snapshot(self):
+        store, key = self.store, self.key
+        other_key = self.make_key()
+        Option.objects.create(key=key.name, value="foo")
+
+        assert store.enable_snapshot(interval=10)
+
+        with self.assertNumQueries(0), patch.object(store.cache, "get") as cache_get:
+            assert store.get(key) == "foo"
+            assert store.get(other_key) is None
+            assert cache_get.call_count == 0
+
+        # Writes of this process are visible immediately
+        store.set(other_key, "bar", UpdateChannel.CLI)
+        assert store.get(other_key) == "bar"
+        store.delete(key)
+        assert store.get(key) is None
+
+    @patch("sentry.options.store.time")
+    def test_snapshot_reloads_changed_options(self, mocked_time):
+        mocked_time.return_value = 0
+        store, key = self.store, self.key
+        other_key = self.make_key()
+        Option.objects.create(key=key.name, value="foo")
+        Option.objects.create(key=other_key.name, value="bar")
+        assert store.enable_snapshot(interval=10)
+
+        # Another process changes options
+        writer = OptionsStore(cache=store.cache)
+        writer.set(key, "baz", UpdateChannel.CLI)
+        writer.delete(other_key)
+
+        # Changes are picked up on the next check
+        assert store.get(key) == "foo"
+        assert store.get(other_key) == "bar"
+        mocked_time.return_value = 11
+        assert store.get(key) == "baz"
+        assert store.get(other_key) is None
+
+        # Nothing is reloaded while the version is unchanged
+        mocked_time.return_value = 22
+        with self.assertNumQueries(0):
+            assert store.get(key) == "baz"
+
+    def test_snapshot_manager_defaults(self):
+        self.manager.register("snapshot.option", default="default")
+        self.store.enable_snapshot(interval=10)
+
+        with patch.object(self.store, "set_cache") as set_cache:
+            assert self.manager.get("snapshot.option") == "default"
+            assert set_cache.call_count == 0
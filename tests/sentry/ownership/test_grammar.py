@@ -7,6 +7,7 @@ from sentry.ownership.grammar import (
     convert_codeowners_syntax,
     convert_schema_to_rules_text,
     dump_schema,
+    load_compiled_schema,
     load_schema,
     parse_code_owners,
     parse_rules,
@@ -506,6 +507,38 @@ def test_matcher_test_tags_without_tag_data(data):
     assert not Matcher("tags.bar", "barval").test(data)
 
 
+@pytest.mark.parametrize(
+    "data",
+    [
+        {},
+        {"tags": [["foo", "bar"], ["baz", "qux"]]},
+        {"tags": [["foo", "bar baz"]], "request": {"url": "http://google.com/search"}},
+        {
+            "stacktrace": {
+                "frames": [
+                    {"filename": "src/sentry/app.py", "module": "foo.bar"},
+                    {"filename": "frontend/app.ts", "abs_path": "/frontend/app.ts"},
+                    {"filename": "static/app.js"},
+                ]
+            }
+        },
+    ],
+)
+def test_compiled_schema_matches_rules(data):
+    rules = parse_rules(fixture_data)
+    compiled = load_compiled_schema(dump_schema(rules))
+
+    assert compiled.get_matching_rules(data) == [rule for rule in rules if rule.test(data)]
+
+
+def test_compiled_schema_is_cached_by_key():
+    schema = dump_schema(parse_rules(fixture_data))
+    compiled = load_compiled_schema(schema, cache_key=("test", 1))
+    assert load_compiled_schema(schema, cache_key=("test", 1)) is compiled
+    assert load_compiled_schema(schema, cache_key=("test", 2)) is not compiled
+    assert load_compiled_schema(schema) is not load_compiled_schema(schema)
+
+
 def _assert_matcher(matcher: Matcher, path_details, expected):
     """Helper function to reduce repeated code"""
     frames = {"stacktrace": {"frames": path_details}}
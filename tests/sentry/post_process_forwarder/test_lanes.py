@@ -0,0 +1,111 @@
+import time
+from datetime import datetime
+from threading import Event
+from unittest import mock
+
+import pytest
+from arroyo.backends.kafka import KafkaPayload
+from arroyo.processing.strategies.abstract import MessageRejected
+from arroyo.types import BrokerValue, Message, Partition, Topic
+
+from sentry.post_process_forwarder.lanes import RunTaskInLanes
+
+topic = Topic("events")
+
+
+def make_message(partition: int, offset: int, group_id: bytes) -> Message[KafkaPayload]:
+    return Message(
+        BrokerValue(
+            KafkaPayload(None, b"", [("group_id", group_id)]),
+            Partition(topic, partition),
+            offset,
+            datetime.now(),
+        )
+    )
+
+
+def lane_key(message: Message[KafkaPayload]) -> bytes:
+    return dict(message.payload.headers)["group_id"]
+
+
+def wait_for_commits(strategy, next_step, count: int) -> None:
+    deadline = time.time() + 5
+    while next_step.submit.call_count < count:
+        assert time.time() < deadline
+        strategy.poll()
+        time.sleep(0.01)
+
+
+def committed(next_step) -> list[tuple[int, int]]:
+    return [
+        (partition.index, offset)
+        for call in next_step.submit.call_args_list
+        for partition, offset in call.args[0].committable.items()
+    ]
+
+
+def test_slow_partition_does_not_hold_back_others():
+    blocked = Event()
+
+    def process(message: Message[KafkaPayload]) -> None:
+        if message.committable == {Partition(topic, 0): 1}:
+            assert blocked.wait(5)
+
+    next_step = mock.Mock()
+    strategy = RunTaskInLanes(process, lane_key, 4, 100, next_step)
+
+    strategy.submit(make_message(0, 0, b"1"))
+    strategy.submit(make_message(0, 1, b"2"))
+    for offset in range(3):
+        strategy.submit(make_message(1, offset, b"3"))
+
+    wait_for_commits(strategy, next_step, 3)
+    assert committed(next_step) == [(1, 1), (1, 2), (1, 3)]
+
+    blocked.set()
+    wait_for_commits(strategy, next_step, 5)
+    assert committed(next_step)[3:] == [(0, 1), (0, 2)]
+
+    strategy.close()
+    strategy.join()
+    next_step.close.assert_called_once()
+
+
+def test_messages_of_a_group_run_in_order():
+    processed = []
+
+    def process(message: Message[KafkaPayload]) -> None:
+        time.sleep(0.001)
+        processed.append((lane_key(message), message.value.offset))
+
+    next_step = mock.Mock()
+    strategy = RunTaskInLanes(process, lane_key, 4, 1000, next_step)
+    for offset in range(200):
+        strategy.submit(make_message(offset % 3, offset, b"%d" % (offset % 7)))
+
+    strategy.close()
+    strategy.join()
+
+    assert len(processed) == 200
+    for group_id in {group_id for group_id, _ in processed}:
+        offsets = [offset for key, offset in processed if key == group_id]
+        assert offsets == sorted(offsets)
+
+
+def test_rejects_when_full():
+    blocked = Event()
+    next_step = mock.Mock()
+    strategy = RunTaskInLanes(lambda message: blocked.wait(5), lane_key, 2, 2, next_step)
+
+    strategy.submit(make_message(0, 0, b"1"))
+    strategy.submit(make_message(0, 1, b"2"))
+    with pytest.raises(MessageRejected):
+        strategy.submit(make_message(0, 2, b"3"))
+
+    blocked.set()
+    wait_for_commits(strategy, next_step, 2)
+    strategy.submit(make_message(0, 2, b"3"))
+
+    strategy.close()
+    strategy.join()
+    assert committed(next_step) == [(0, 1), (0, 2), (0, 3)]
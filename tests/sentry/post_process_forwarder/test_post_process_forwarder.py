@@ -159,3 +159,6 @@ class PostProcessForwarderTest(TestCase):
 
     def test_multiprocess_post_process_forwarder(self) -> None:
         self.run_post_process_forwarder_streaming_consumer(ppf_mode="multiprocess")
+
+    def test_partitioned_post_process_forwarder(self) -> None:
+        self.run_post_process_forwarder_streaming_consumer(ppf_mode="partitioned")
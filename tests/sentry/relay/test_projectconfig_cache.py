@@ -24,3 +24,60 @@ def test_read_write():
     my_key = "fake-dsn-1"
     cache.set_many({my_key: "my-value"})
     assert cache.get(my_key) == "my-value"
+
+
+@django_db_all
+def test_exists_many():
+    cache = redis.RedisProjectConfigCache()
+    cache.set_many({"fake-dsn-1": "a", "fake-dsn-2": {"disabled": True}})
+
+    assert cache.exists_many(["fake-dsn-1", "fake-dsn-2", "fake-dsn-3"]) == {
+        "fake-dsn-1",
+        "fake-dsn-2",
+    }
+    assert cache.exists_many([]) == set()
+
+
+@django_db_all
+def test_get_many():
+    cache = redis.RedisProjectConfigCache()
+    cache.set_many({"fake-dsn-1": {"a": 1}, "fake-dsn-2": {"b": 2}})
+
+    assert cache.get_many(["fake-dsn-1", "fake-dsn-2", "fake-dsn-3"]) == {
+        "fake-dsn-1": {"a": 1},
+        "fake-dsn-2": {"b": 2},
+    }
+    assert cache.get_many([]) == {}
+
+
+@django_db_all
+def test_get_many_local_cache(monkeypatch):
+    cache = redis.RedisProjectConfigCache()
+    cache.set_many({"fake-dsn-1": {"a": 1}})
+    assert cache.get("fake-dsn-1") == {"a": 1}
+
+    # Unchanged configs are served without decompressing them again
+    decompress = mock.Mock(side_effect=redis.zstandard.decompress)
+    monkeypatch.setattr(redis.zstandard, "decompress", decompress)
+    assert cache.get("fake-dsn-1") == {"a": 1}
+    assert decompress.call_count == 0
+
+    # A new config changes the version and invalidates the local entry
+    cache.set_many({"fake-dsn-1": {"a": 2}})
+    assert cache.get("fake-dsn-1") == {"a": 2}
+    assert decompress.call_count == 1
+
+    cache.delete_many(["fake-dsn-1"])
+    assert cache.get("fake-dsn-1") is None
+
+
+@django_db_all
+def test_get_many_without_local_cache(monkeypatch):
+    cache = redis.RedisProjectConfigCache(local_cache_size=0)
+    cache.set_many({"fake-dsn-1": {"a": 1}})
+
+    decompress = mock.Mock(side_effect=redis.zstandard.decompress)
+    monkeypatch.setattr(redis.zstandard, "decompress", decompress)
+    assert cache.get("fake-dsn-1") == {"a": 1}
+    assert cache.get("fake-dsn-1") == {"a": 1}
+    assert decompress.call_count == 2
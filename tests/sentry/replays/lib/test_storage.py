@@ -0,0 +1,131 @@
+import uuid
+from unittest import mock
+
+from sentry.replays.lib.storage import (
+    PackedSegmentLocation,
+    RecordingSegmentStorageMeta,
+    SimpleStorageBlob,
+    StorageBlob,
+    attach_packed_segment_locations,
+    delete_packed_segments,
+    pack_segments,
+    packed_segment_index,
+    storage_kv,
+    store_packed_segments,
+)
+from sentry.replays.tasks import delete_replay_recording
+from sentry.testutils.cases import TestCase
+from sentry.testutils.helpers.options import override_options
+
+
+def make_segment(segment_id: int, replay_id: str | None = None) -> RecordingSegmentStorageMeta:
+    return RecordingSegmentStorageMeta(
+        project_id=1,
+        replay_id=replay_id or uuid.uuid4().hex,
+        segment_id=segment_id,
+        retention_days=30,
+    )
+
+
+def test_pack_segments():
+    segments = [(make_segment(0), b"hello"), (make_segment(1), b""), (make_segment(2), b"world")]
+    value, locations = pack_segments("packed", segments)
+
+    assert value == b"helloworld"
+    for (segment, data), (located_segment, location) in zip(segments, locations):
+        assert located_segment is segment
+        assert location.key == "packed"
+        assert value[location.offset : location.offset + location.length] == data
+
+
+def test_get_range_uses_backend_range_reads():
+    storage = mock.Mock()
+    storage.read_range.return_value = b"bc"
+
+    with mock.patch("sentry.replays.lib.storage.get_storage", return_value=storage):
+        assert SimpleStorageBlob().get_range("key", 1, 2) == b"bc"
+
+    storage.read_range.assert_called_once_with("key", 1, 2)
+    storage.open.assert_not_called()
+
+
+class PackedSegmentsTestCase(TestCase):
+    @override_options({"replay.storage.packed-uploads.lookup-enabled": True})
+    def test_packed_segments_are_read_with_range_requests(self):
+        blob = StorageBlob()
+        replay_id = uuid.uuid4().hex
+        segments = [make_segment(i, replay_id) for i in range(3)]
+        store_packed_segments(30, [(segment, b"[%d]" % segment.segment_id) for segment in segments])
+
+        # An unpacked segment of the same replay is read from its own object.
+        unpacked = make_segment(3, replay_id)
+        blob.set(unpacked, b"[]")
+
+        segments = [make_segment(i, replay_id) for i in range(4)]
+        attach_packed_segment_locations(segments)
+        assert segments[3].packed is None
+
+        with mock.patch.object(storage_kv, "get", wraps=storage_kv.get) as get:
+            for segment in segments[:3]:
+                assert blob.get(segment) == b"[%d]" % segment.segment_id
+            assert get.call_count == 0
+        assert blob.get(segments[3]) == b"[]"
+
+    @override_options({"replay.storage.packed-uploads.lookup-enabled": True})
+    def test_deleted_segments_are_erased(self):
+        blob = StorageBlob()
+        replay_id = uuid.uuid4().hex
+        other = make_segment(0)
+        segments = [make_segment(i, replay_id) for i in range(2)]
+        key = store_packed_segments(
+            30, [(segments[0], b"[0]"), (other, b"[x]"), (segments[1], b"[1]")]
+        )
+
+        attach_packed_segment_locations(segments)
+        delete_packed_segments(segments)
+
+        # The bytes of the deleted segments are gone, the other segment is still readable.
+        assert storage_kv.get(key) == b"\x00\x00\x00[x]\x00\x00\x00"
+        attach_packed_segment_locations([other])
+        assert blob.get(other) == b"[x]"
+
+        segments = [make_segment(i, replay_id) for i in range(2)]
+        attach_packed_segment_locations(segments)
+        assert [segment.packed for segment in segments] == [None, None]
+
+    def test_delete_replay_recording(self):
+        replay_id = uuid.uuid4().hex
+        segments = [make_segment(i, replay_id) for i in range(2)]
+        key = store_packed_segments(30, [(segment, b"[0]") for segment in segments])
+
+        with mock.patch(
+            "sentry.replays.tasks.fetch_segments_metadata",
+            return_value=[make_segment(i, replay_id) for i in range(2)],
+        ):
+            delete_replay_recording(1, replay_id)
+
+        assert storage_kv.get(key) == b"\x00" * 6
+        attach_packed_segment_locations(segments, force=True)
+        assert [segment.packed for segment in segments] == [None, None]
+
+    @override_options({"replay.storage.packed-uploads.lookup-enabled": True})
+    def test_retried_segments_use_their_latest_location(self):
+        segment = make_segment(0)
+        store_packed_segments(30, [(segment, b"[0]"), (make_segment(1), b"[1]")])
+        second = store_packed_segments(30, [(segment, b"[0]"), (make_segment(1), b"[1]")])
+
+        attach_packed_segment_locations([segment])
+        assert segment.packed == PackedSegmentLocation(key=second, offset=0, length=3)
+
+    @override_options({"replay.storage.packed-uploads.lookup-enabled": False})
+    def test_lookup_disabled(self):
+        segment = make_segment(0)
+        store_packed_segments(30, [(segment, b"[0]"), (make_segment(1), b"[1]")])
+
+        with mock.patch.object(packed_segment_index, "get_many") as get_many:
+            attach_packed_segment_locations([segment])
+        assert get_many.call_count == 0
+        assert segment.packed is None
+
+        attach_packed_segment_locations([segment], force=True)
+        assert segment.packed is not None
@@ -8,7 +8,10 @@ from sentry.replays.consumers.recording_buffered import (
     BufferCommitFailed,
     RecordingBuffer,
     commit_uploads,
+    partition_packed_uploads,
 )
+from sentry.replays.lib.storage import RecordingSegmentStorageMeta
+from sentry.testutils.helpers.options import override_options
 
 
 def test_recording_buffer_commit_default():
@@ -145,3 +148,63 @@ def test_commit_uploads_failure(_do_upload):
 
     with pytest.raises(BufferCommitFailed):
         commit_uploads([{}])  # type: ignore[typeddict-item]
+
+
+def make_upload(key, value, retention_days=30, video=False):
+    _, project_id, replay_id, segment_id = key.removesuffix(".video").split("/")
+    segment = RecordingSegmentStorageMeta(
+        project_id=int(project_id),
+        replay_id=replay_id,
+        segment_id=int(segment_id),
+        retention_days=retention_days,
+    )
+    return {"key": key, "value": value, "segment": None if video else segment}
+
+
+@override_options({"replay.storage.packed-uploads.max-segment-size": 10})
+def test_partition_packed_uploads():
+    """Assert small segments are packed by retention period."""
+    uploads = [
+        make_upload("30/1/a/0", b"a"),
+        make_upload("30/1/a/1", b"b"),
+        make_upload("30/1/a/2", b"c" * 11),
+        make_upload("30/1/a/1.video", b"d", video=True),
+        make_upload("90/1/b/0", b"e", retention_days=90),
+    ]
+
+    individual, packed = partition_packed_uploads(uploads)  # type: ignore[arg-type]
+    assert {
+        retention_days: [upload["key"] for upload in uploads]
+        for retention_days, uploads in packed.items()
+    } == {30: ["30/1/a/0", "30/1/a/1"]}
+    assert [upload["key"] for upload in individual] == ["30/1/a/2", "30/1/a/1.video", "90/1/b/0"]
+
+
+@override_options({"replay.storage.packed-uploads.enabled": True})
+@patch("sentry.replays.consumers.recording_buffered.store_packed_segments")
+@patch("sentry.replays.consumers.recording_buffered._do_upload")
+def test_commit_uploads_packed(_do_upload, store_packed_segments):
+    """Assert small segments are uploaded in a single packed object."""
+    uploads = [
+        make_upload("30/1/a/0", b"a"),
+        make_upload("30/1/a/1", b"b"),
+        make_upload("30/1/a/1.video", b"c", video=True),
+    ]
+    commit_uploads(uploads)  # type: ignore[arg-type]
+
+    store_packed_segments.assert_called_once_with(
+        30, [(uploads[0]["segment"], b"a"), (uploads[1]["segment"], b"b")]
+    )
+    assert _do_upload.call_count == 1
+
+
+@override_options({"replay.storage.packed-uploads.enabled": True})
+@patch("sentry.replays.consumers.recording_buffered.store_packed_segments")
+def test_commit_uploads_packed_failure(store_packed_segments):
+    """Assert a failed packed upload fails the batch."""
+    store_packed_segments.side_effect = ValueError("")
+
+    with pytest.raises(BufferCommitFailed):
+        commit_uploads(
+            [make_upload("30/1/a/0", b"a"), make_upload("30/1/a/1", b"b")]  # type: ignore[list-item]
+        )
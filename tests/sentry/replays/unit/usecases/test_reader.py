@@ -0,0 +1,70 @@
+import uuid
+import zlib
+from unittest import mock
+
+import zstandard
+
+from sentry.replays.lib.storage import RecordingSegmentStorageMeta
+from sentry.replays.usecases import reader
+
+
+def make_segments(count: int) -> list[RecordingSegmentStorageMeta]:
+    replay_id = uuid.uuid4().hex
+    return [
+        RecordingSegmentStorageMeta(
+            project_id=1, replay_id=replay_id, segment_id=i, retention_days=30
+        )
+        for i in range(count)
+    ]
+
+
+def test_download_segments_streams_in_order():
+    """Test segments are yielded in order regardless of their encoding."""
+    segments = make_segments(25)
+    blobs = {}
+    for segment in segments:
+        data = b'[{"segment":%d,"data":"%s"}]' % (segment.segment_id, b"x" * 100000)
+        if segment.segment_id % 3 == 0:
+            blobs[segment.segment_id] = zlib.compress(data)
+        elif segment.segment_id % 3 == 1:
+            blobs[segment.segment_id] = zstandard.ZstdCompressor().compress(data)
+        else:
+            blobs[segment.segment_id] = data
+    blobs[7] = None
+
+    with mock.patch.object(reader, "storage") as storage:
+        storage.get.side_effect = lambda segment: blobs[segment.segment_id]
+        result = b"".join(reader.download_segments(segments))
+
+    expected = [
+        b"[]" if blob is None else reader.decompress(blob) for _, blob in sorted(blobs.items())
+    ]
+    assert result == b"[" + b",".join(expected) + b"]"
+
+
+def test_download_segments_uses_segment_cache():
+    """Test repeated downloads are served from the segment cache."""
+    segments = make_segments(3)
+
+    with mock.patch.object(reader, "storage") as storage:
+        storage.get.side_effect = lambda segment: zlib.compress(b"[%d]" % segment.segment_id)
+        assert b"".join(reader.download_segments(segments)) == b"[[0],[1],[2]]"
+        assert storage.get.call_count == 3
+
+        assert b"".join(reader.download_segments(segments)) == b"[[0],[1],[2]]"
+        assert storage.get.call_count == 3
+
+
+def test_download_segments_does_not_cache_large_segments():
+    """Test segments exceeding the size limit are streamed but not cached."""
+    segments = make_segments(1)
+    data = b"[" + b"0" * 1000 + b"]"
+
+    with (
+        mock.patch.object(reader, "storage") as storage,
+        mock.patch.object(reader.segment_cache, "max_segment_bytes", 100),
+    ):
+        storage.get.return_value = zlib.compress(data)
+        assert b"".join(reader.download_segments(segments)) == b"[" + data + b"]"
+        assert b"".join(reader.download_segments(segments)) == b"[" + data + b"]"
+        assert storage.get.call_count == 2
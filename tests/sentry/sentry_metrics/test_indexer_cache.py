@@ -1,10 +1,17 @@
+import threading
 from datetime import timedelta
+from unittest import mock
 
 import pytest
 from django.conf import settings
 from django.utils import timezone
 
-from sentry.sentry_metrics.indexer.cache import StringIndexerCache
+from sentry.sentry_metrics.indexer.cache import (
+    CachingIndexer,
+    LocalIndexerCache,
+    StringIndexerCache,
+)
+from sentry.sentry_metrics.indexer.mock import RawSimpleIndexer
 from sentry.sentry_metrics.use_case_id_registry import UseCaseID
 from sentry.testutils.helpers.options import override_options
 from sentry.utils.cache import cache
@@ -240,3 +247,91 @@ def test_is_valid_timestamp() -> None:
 
     assert not indexer_cache._is_valid_timestamp(str(stale_ts))
     assert indexer_cache._is_valid_timestamp(str(new_ts))
+
+
+def test_local_cache_in_front_of_both_directions() -> None:
+    raw_indexer = RawSimpleIndexer()
+    id = raw_indexer.record(UseCaseID.SESSIONS, 1, "hello")
+    caching_indexer = CachingIndexer(
+        indexer_cache, raw_indexer, local_cache=LocalIndexerCache(maxsize=100, ttl=60)
+    )
+
+    with override_options(
+        {
+            "sentry-metrics.indexer.read-new-cache-namespace": False,
+            "sentry-metrics.indexer.write-new-cache-namespace": False,
+        }
+    ):
+        cache.clear()
+        assert caching_indexer.resolve(UseCaseID.SESSIONS, 1, "hello") == id
+        assert caching_indexer.resolve(UseCaseID.SESSIONS, 1, "missing") is None
+
+        with (
+            mock.patch.object(caching_indexer, "_resolve") as resolve,
+            mock.patch.object(raw_indexer, "reverse_resolve") as reverse_resolve,
+            mock.patch.object(raw_indexer, "bulk_reverse_resolve") as bulk_reverse_resolve,
+        ):
+            assert caching_indexer.resolve(UseCaseID.SESSIONS, 1, "hello") == id
+            # Resolving also populated the reverse direction.
+            assert caching_indexer.reverse_resolve(UseCaseID.SESSIONS, 1, id) == "hello"
+            assert caching_indexer.bulk_reverse_resolve(UseCaseID.SESSIONS, 1, [id]) == {
+                id: "hello"
+            }
+            assert resolve.call_count == 0
+            assert reverse_resolve.call_count == 0
+            assert bulk_reverse_resolve.call_count == 0
+
+            # Negative results are not cached.
+            resolve.return_value = None
+            assert caching_indexer.resolve(UseCaseID.SESSIONS, 1, "missing") is None
+            assert resolve.call_count == 1
+
+
+def test_local_cache_evicts_least_recently_used() -> None:
+    local_cache = LocalIndexerCache(maxsize=2, ttl=60)
+    local_cache.set(("resolve", "sessions", 1, "a"), 1)
+    local_cache.set(("resolve", "sessions", 1, "b"), 2)
+    assert local_cache.get(("resolve", "sessions", 1, "a")) == 1
+
+    with mock.patch("sentry.sentry_metrics.indexer.cache.metrics.incr") as incr:
+        local_cache.set(("resolve", "sessions", 1, "c"), 3)
+
+    incr.assert_called_once_with(
+        "sentry_metrics.indexer.local_cache.evictions", tags={"use_case": "sessions"}
+    )
+    assert local_cache.get(("resolve", "sessions", 1, "a")) == 1
+    assert local_cache.get(("resolve", "sessions", 1, "b")) is None
+
+
+def test_local_cache_coalesces_concurrent_misses() -> None:
+    local_cache = LocalIndexerCache(maxsize=100, ttl=60)
+    key = ("resolve", "sessions", 1, "a")
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def fetch() -> int:
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return 1
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(local_cache.get_or_fetch(key, fetch)))
+    leader.start()
+    started.wait(5)
+
+    follower = threading.Thread(target=lambda: results.append(local_cache.get_or_fetch(key, fetch)))
+    with mock.patch("sentry.sentry_metrics.indexer.cache.metrics.incr") as incr:
+        follower.start()
+        # Wait until the follower has joined the in-flight call.
+        for _ in range(500):
+            if any(c.args[0].endswith("coalesced") for c in incr.call_args_list):
+                break
+            threading.Event().wait(0.01)
+        release.set()
+        leader.join(5)
+        follower.join(5)
+
+    assert results == [1, 1]
+    assert len(calls) == 1
@@ -1,8 +1,10 @@
 import pytest
 from django.test import override_settings
 
+from sentry.features.memo import get_feature_memo
 from sentry.silo.base import SiloLimit, SiloMode
 from sentry.tasks.base import instrumented_task
+from sentry.testutils.helpers.options import override_options
 
 
 @instrumented_task(name="test.tasks.test_base.region_task", silo_mode=SiloMode.REGION)
@@ -15,6 +17,23 @@ def control_task(param):
     return f"Control task {param}"
 
 
+@instrumented_task(name="test.tasks.test_base.memo_task", memoize_features=True)
+def memo_task():
+    return get_feature_memo()
+
+
+@instrumented_task(name="test.tasks.test_base.plain_task")
+def plain_task():
+    return get_feature_memo()
+
+
+@override_options({"features.memoize-checks": True})
+def test_task_memoize_features():
+    assert memo_task() is not None
+    assert plain_task() is None
+    assert get_feature_memo() is None
+
+
 @override_settings(SILO_MODE=SiloMode.REGION)
 def test_task_silo_limit_call_region():
     result = region_task("hi")
@@ -14,10 +14,12 @@ from sentry.relay.projectconfig_debounce_cache.redis import RedisProjectConfigDe
 from sentry.tasks.relay import (
     _schedule_invalidate_project_config,
     build_project_config,
+    compute_configs,
     invalidate_project_config,
     schedule_build_project_config,
     schedule_invalidate_project_config,
 )
+from sentry.testutils.factories import Factories
 from sentry.testutils.hybrid_cloud import simulated_transaction_watermarks
 from sentry.testutils.pytest.fixtures import django_db_all
 
@@ -93,6 +95,7 @@ def redis_cache(monkeypatch):
     monkeypatch.setattr("sentry.relay.projectconfig_cache.set_many", cache.set_many)
     monkeypatch.setattr("sentry.relay.projectconfig_cache.delete_many", cache.delete_many)
     monkeypatch.setattr("sentry.relay.projectconfig_cache.get", cache.get)
+    monkeypatch.setattr("sentry.relay.projectconfig_cache.exists_many", cache.exists_many)
 
     return cache
 
@@ -540,3 +543,32 @@ def test_invalidate_hierarchy(
     assert len(calls) == 1
     cache = redis_cache.get(default_projectkey)
     assert cache["disabled"] is False
+
+
+@django_db_all
+def test_compute_configs_org_only_cached_keys(default_organization, redis_cache, django_cache):
+    projects = [Factories.create_project(organization=default_organization) for _ in range(3)]
+    public_keys = [
+        key.public_key
+        for project in projects
+        for key in ProjectKey.objects.filter(project_id=project.id)
+    ]
+    assert len(public_keys) == 3
+    redis_cache.set_many({public_key: "dummy" for public_key in public_keys[:2]})
+
+    with mock.patch(
+        "sentry.relay.config._get_browser_performance_profiles", return_value=[]
+    ) as get_profiles:
+        configs = compute_configs(organization_id=default_organization.id)
+        # Organization-wide parts are computed once per run
+        assert get_profiles.call_count == 1
+
+        # Nothing is memoized across runs
+        compute_configs(project_id=projects[0].id)
+        assert get_profiles.call_count == 2
+
+    assert configs.keys() == set(public_keys[:2])
+    assert {config["projectId"] for config in configs.values()} == {
+        projects[0].id,
+        projects[1].id,
+    }
@@ -0,0 +1,98 @@
+import time
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+from sentry.tsdb.aggregator import TSDBWriteAggregator
+from sentry.tsdb.base import ONE_HOUR, TSDBModel
+from sentry.tsdb.inmemory import InMemoryTSDB
+
+
+def make_aggregator(**kwargs):
+    backend = InMemoryTSDB(rollups=((10, 30), (ONE_HOUR, 24)))
+    with mock.patch("sentry.tsdb.aggregator.atexit"):
+        return TSDBWriteAggregator(backend, **kwargs)
+
+
+def test_coalesces_increments_per_bucket():
+    aggregator = make_aggregator(window=60)
+    now = datetime(2024, 1, 1, 12, 0, 5, tzinfo=timezone.utc)
+
+    for i in range(3):
+        aggregator.incr_multi(
+            [(TSDBModel.project, 1), (TSDBModel.group, 2)],
+            timestamp=now + timedelta(seconds=i),
+            environment_id=3,
+        )
+    aggregator.incr_multi([(TSDBModel.group, 2, {"count": 5})], timestamp=now)
+
+    with mock.patch.object(
+        aggregator.backend, "incr_multi", wraps=aggregator.backend.incr_multi
+    ) as incr_multi:
+        aggregator.flush()
+
+    # One backend call per environment.
+    assert incr_multi.call_count == 2
+
+    start = now - timedelta(minutes=1)
+    assert aggregator.backend.get_sums(TSDBModel.project, [1], start, now, rollup=10) == {1: 3}
+    assert aggregator.backend.get_sums(TSDBModel.group, [2], start, now, rollup=10) == {2: 8}
+    assert aggregator.backend.get_sums(
+        TSDBModel.group, [2], start, now, rollup=10, environment_id=3
+    ) == {2: 3}
+    assert aggregator.backend.get_sums(TSDBModel.group, [2], start, now, rollup=ONE_HOUR) == {2: 8}
+
+
+def test_dedupes_distinct_values():
+    aggregator = make_aggregator(window=60)
+    now = datetime(2024, 1, 1, 12, 0, 5, tzinfo=timezone.utc)
+
+    for value in ["a", "b", "a", "a"]:
+        aggregator.record_multi(
+            [(TSDBModel.users_affected_by_group, 1, [value])], timestamp=now, environment_id=3
+        )
+    assert aggregator._entries == 2
+
+    aggregator.flush()
+    assert aggregator.backend.get_distinct_counts_totals(
+        TSDBModel.users_affected_by_group, [1], now - timedelta(minutes=1), now, rollup=10
+    ) == {1: 2}
+
+
+def test_flushes_when_full():
+    aggregator = make_aggregator(window=60, max_entries=2)
+
+    with mock.patch.object(aggregator, "flush", wraps=aggregator.flush) as flush:
+        aggregator.incr_multi([(TSDBModel.project, 1)])
+        aggregator.incr_multi([(TSDBModel.project, 1)])
+        assert flush.call_count == 0
+        aggregator.incr_multi([(TSDBModel.project, 2)])
+        assert flush.call_count == 1
+
+    assert aggregator._entries == 0
+
+
+def test_flushes_after_window():
+    aggregator = make_aggregator(window=0)
+    aggregator.incr_multi([(TSDBModel.project, 1)])
+    assert aggregator._entries == 0
+
+
+def test_flushes_in_background_after_window():
+    aggregator = make_aggregator(window=0.05)
+    aggregator.incr_multi([(TSDBModel.project, 1)])
+
+    deadline = time.monotonic() + 5
+    while aggregator._entries:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_rereads_limits():
+    max_entries = [100]
+    aggregator = make_aggregator(window=60, max_entries=lambda: max_entries[0])
+    aggregator.incr_multi([(TSDBModel.project, 1)])
+    assert aggregator._entries == 1
+
+    max_entries[0] = 1
+    aggregator.incr_multi([(TSDBModel.project, 2)])
+    assert aggregator._entries == 0
@@ -0,0 +1,90 @@
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from sentry.testutils.helpers.options import override_options
+from sentry.testutils.skips import requires_pytest_benchmark
+from sentry.tsdb.base import ONE_DAY, ONE_HOUR, ONE_MINUTE, TSDBModel
+from sentry.tsdb.redis import RedisTSDB
+from sentry.utils.dates import to_datetime
+
+
+@pytest.fixture
+def db():
+    with override_options(
+        {"redis.clusters": {"tsdb": {"hosts": {i - 6: {"db": i} for i in range(6, 9)}}}}
+    ):
+        db = RedisTSDB(
+            rollups=((10, 30), (ONE_MINUTE, 120), (ONE_HOUR, 24), (ONE_DAY, 30)),
+            vnodes=64,
+            cluster="tsdb",
+        )
+    yield db
+    with db.cluster.all() as client:
+        client.flushdb()
+
+
+def get_range_by_field(db, model, keys, start, end, rollup=None, environment_id=None):
+    """
+    The previous implementation of `RedisTSDB.get_range`, issuing one ``HGET``
+    per ``(key, timestamp)`` pair. Kept as a baseline for the benchmark.
+    """
+    rollup, series = db.get_optimal_rollup_series(start, end, rollup)
+    _series = [to_datetime(item) for item in series]
+
+    results = []
+    cluster, _ = db.get_cluster(environment_id)
+    with cluster.map() as client:
+        for key in keys:
+            for timestamp in _series:
+                hash_key, hash_field = db.make_counter_key(
+                    model, rollup, timestamp, key, environment_id
+                )
+                results.append((timestamp.timestamp(), key, client.hget(hash_key, hash_field)))
+
+    results_by_key = defaultdict(dict)
+    for epoch, key, count in results:
+        results_by_key[key][epoch] = int(count.value or 0)
+
+    return {key: sorted(points.items()) for key, points in results_by_key.items()}
+
+
+def populate(db, num_keys: int, end: datetime) -> list[int]:
+    keys = list(range(1, num_keys + 1))
+    db.incr_multi(
+        [
+            (TSDBModel.group, key, {"timestamp": end - timedelta(days=day), "count": key})
+            for key in keys
+            for day in range(0, 30, 3)
+        ]
+    )
+    return keys
+
+
+@pytest.mark.parametrize("num_keys", [1, 100])
+def test_get_range_matches_per_field_reads(db, num_keys):
+    end = datetime.now(timezone.utc)
+    start = end - timedelta(days=29)
+    # Keys without any counts are included as well.
+    keys = populate(db, num_keys, end) + [num_keys + 1]
+
+    expected = get_range_by_field(db, TSDBModel.group, keys, start, end)
+    assert db.get_range(TSDBModel.group, keys, start, end) == expected
+    assert db.get_sums(TSDBModel.group, keys, start, end) == {
+        key: sum(count for _, count in points) for key, points in expected.items()
+    }
+
+
+@requires_pytest_benchmark
+@pytest.mark.parametrize("num_keys", [10, 100, 1000])
+@pytest.mark.parametrize("implementation", ["hget", "hmget"])
+def test_benchmark_get_range(db, benchmark, num_keys, implementation):
+    end = datetime.now(timezone.utc)
+    start = end - timedelta(days=29)
+    keys = populate(db, num_keys, end)
+
+    if implementation == "hget":
+        benchmark(get_range_by_field, db, TSDBModel.group, keys, start, end)
+    else:
+        benchmark(db.get_range, TSDBModel.group, keys, start, end)
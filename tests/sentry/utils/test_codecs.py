@@ -1,6 +1,17 @@
+from unittest import mock
+
 import pytest
 
-from sentry.utils.codecs import BytesCodec, JSONCodec, ZlibCodec, ZstdCodec
+from sentry.utils.canonical import CanonicalKeyDict
+from sentry.utils.codecs import (
+    BytesCodec,
+    InstrumentedCodec,
+    JSONCodec,
+    MsgpackCodec,
+    VersionedCodec,
+    ZlibCodec,
+    ZstdCodec,
+)
 
 
 @pytest.mark.parametrize(
@@ -22,3 +33,78 @@ def test_codec_chaining() -> None:
 
     assert codec.encode([1, 2, 3]) == b"[1,2,3]"
     assert codec.decode(b"[1,2,3]") == [1, 2, 3]
+
+
+def test_zstd_codec_dictionary() -> None:
+    dictionary = b'{"event_id":"","platform":"python","sdk":{"name":"sentry.python"}}' * 4
+    codec = ZstdCodec(dictionary=dictionary)
+    value = b'{"event_id":"abc","platform":"python","sdk":{"name":"sentry.python"}}'
+
+    encoded = codec.encode(value)
+    assert len(encoded) < len(ZstdCodec().encode(value))
+    assert codec.decode(encoded) == value
+
+
+def test_msgpack_codec() -> None:
+    codec = MsgpackCodec()
+    value = {"foo": ["bar", 1, 1.5, None, True], "baz": {"qux": "\N{SNOWMAN}"}}
+
+    assert codec.decode(codec.encode(value)) == value
+
+
+def test_msgpack_codec_mappings() -> None:
+    codec = MsgpackCodec()
+    value = CanonicalKeyDict({"exception": {"values": []}, "tags": []}, legacy=False)
+
+    assert codec.decode(codec.encode(value)) == dict(value)
+    assert codec.decode(codec.encode({"nested": value})) == {"nested": dict(value)}
+
+
+def test_versioned_codec() -> None:
+    legacy = JSONCodec() | BytesCodec()
+    codecs = {1: MsgpackCodec(), 2: MsgpackCodec() | ZstdCodec()}
+    value = {"foo": "bar"}
+
+    encoded = VersionedCodec(codecs, 2, legacy=legacy).encode(value)
+    assert encoded[:2] == b"\x00\x02"
+
+    # Values are decoded with the codec they were written with, and values
+    # without a header with the legacy codec.
+    for version in (None, 1, 2):
+        reader = VersionedCodec(codecs, version, legacy=legacy)
+        assert reader.decode(encoded) == value
+        assert reader.decode(b'{"foo":"bar"}') == value
+        assert reader.decode(VersionedCodec(codecs, 1, legacy=legacy).encode(value)) == value
+
+    assert VersionedCodec(codecs, None, legacy=legacy).encode(value) == b'{"foo":"bar"}'
+
+
+@mock.patch("sentry.utils.codecs.metrics")
+def test_versioned_codec_falls_back_to_legacy(metrics) -> None:
+    codec = VersionedCodec({1: MsgpackCodec()}, 1, legacy=JSONCodec() | BytesCodec())
+    value = {"big": 2**70}
+
+    encoded = codec.encode(value)
+    assert encoded == b'{"big":1180591620717411303424}'
+    assert codec.decode(encoded) == value
+    metrics.incr.assert_called_once_with(
+        "codecs.versioned.fallback", tags={"version": "1", "error": mock.ANY}
+    )
+
+
+def test_instrumented_codec() -> None:
+    codec = InstrumentedCodec(BytesCodec(), "codec", "bytes", get_tags=lambda: {"stage": "save"})
+
+    with mock.patch("sentry.utils.codecs.metrics.distribution") as distribution:
+        assert codec.decode(codec.encode("hello")) == "hello"
+
+    assert [call.args[0] for call in distribution.call_args_list] == [
+        "codec.encode",
+        "codec.size",
+        "codec.decode",
+    ]
+    assert distribution.call_args_list[1].args[1] == 5
+    assert all(
+        call.kwargs["tags"] == {"codec": "bytes", "stage": "save"}
+        for call in distribution.call_args_list
+    )
@@ -47,6 +47,19 @@ class JSONTest(TestCase):
         res = enum.a
         self.assertEqual(json.dumps(res), "1")
 
+    def test_rapid_json(self):
+        res = {
+            "id": uuid.uuid4(),
+            "timestamp": datetime.datetime(day=1, month=1, year=2011),
+            "values": [1, 2.5, "foo", None, True],
+            "tags": {"foo"},
+        }
+        assert json.loads(json.dumps(res, use_rapid_json=True)) == json.loads(json.dumps(res))
+
+    def test_rapid_json_fallback(self):
+        self.assertEqual(json.dumps(float("inf"), use_rapid_json=True), "null")
+        self.assertEqual(json.dumps({1: "foo"}, use_rapid_json=True), '{"1":"foo"}')
+
     def test_translation(self):
         self.assertEqual(json.dumps(_("word")), '"word"')
 
@@ -240,6 +240,31 @@ class StandardIntervalTestBase(SnubaTestCase, RuleTestCase):
         self.assertDoesNotPass(environment_rule, event, is_new=True)
         assert mock_get_rate.call_count == 0
 
+    def test_rate_is_shared_between_rules(self):
+        event = self.add_event(
+            data={
+                "fingerprint": ["something_random"],
+                "user": {"id": uuid4().hex},
+            },
+            project_id=self.project.id,
+            timestamp=before_now(minutes=1),
+        )
+        low_rule = self.get_rule(
+            data={"interval": "1h", "value": 0}, rule=Rule(environment_id=None)
+        )
+        high_rule = self.get_rule(
+            data={"interval": "1h", "value": 5}, rule=Rule(environment_id=None)
+        )
+
+        with (
+            self.options({"rules.condition-cache.ttl": 60}),
+            patch.object(self.rule_cls, "query", wraps=low_rule.query) as query,
+        ):
+            self.assertPasses(low_rule, event, is_new=False)
+            self.assertDoesNotPass(high_rule, event, is_new=False)
+
+        assert query.call_count == 1
+
 
 class EventFrequencyConditionTestCase(StandardIntervalTestBase):
     __test__ = Abstract(__module__, __qualname__)